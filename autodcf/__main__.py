@@ -0,0 +1,5 @@
+import sys
+
+from autodcf.cli import main
+
+sys.exit(main())
@@ -0,0 +1,237 @@
+"""Persistent cache of DCF forecasts and valuations, keyed on content.
+
+Results are keyed on a SHA-256 hash of the company's statement values and the DCF's assumptions, so a DCF built
+anew from unchanged fundamentals and assumptions (e.g. in a nightly rerun) finds the result stored by the last run.
+Results are stored in a SQLite database on local disk.
+"""
+import hashlib
+import json
+import sqlite3
+import time
+
+import numpy as np
+
+from autodcf.company.statement_table import BalanceSheetTable, CashFlowsTable, IncomeStatementTable
+from autodcf.models._kernel import LINE_ITEMS
+from autodcf.models.dcf import VALUATIONS
+from autodcf.models.discount_curve import DiscountCurve
+from autodcf.models.terminal_value import TerminalValue
+
+# Bump to invalidate every stored result when the way results are computed changes.
+CACHE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    forecast BLOB NOT NULL,
+    valuation TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_company ON results (company);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+CREATE TABLE IF NOT EXISTS total (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL);
+INSERT OR IGNORE INTO total VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+    UPDATE total SET size = size + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+    UPDATE total SET size = size - OLD.size;
+END;
+"""
+
+
+def _canonical(value):
+    """Convert assumption to a JSON-serializable value that is equal for equal assumptions."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, TerminalValue):
+        return {'method': type(value).__name__,
+                'parameters': {name: _canonical(parameter) for name, parameter in value.parameters.items()}}
+    if isinstance(value, DiscountCurve):
+        return {'rates': _canonical(value.rates), 'mid_year': value.mid_year}
+    arr = np.asarray(value, dtype=float)
+    return arr.tolist() if arr.ndim else float(arr)
+
+
+def _digest(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def company_fingerprint(company):
+    """Stable hash of the values of a company and its statements.
+
+    Args:
+        company (autodcf.company.Company): Company to hash.
+
+    Returns:
+        fingerprint (str): Hex digest that is equal for companies with equal values, in any process.
+    """
+    data = {'fully_diluted_shares': float(company.fully_diluted_shares),
+            'price_per_share': float(company.price_per_share)}
+    for name, statement, table_class in (('balance_sheet', company.balance_sheet, BalanceSheetTable),
+                                         ('cash_flows', company.cash_flows, CashFlowsTable),
+                                         ('income_statement', company.income_statement, IncomeStatementTable)):
+        data[name] = [float(getattr(statement, field)) for field in table_class.fields]
+    return _digest(data)
+
+
+def fingerprint(dcf, company=None):
+    """Stable hash of a DCF's company values and assumptions.
+
+    Args:
+        dcf (autodcf.models.DCF): DCF to hash.
+        company (str, optional): Fingerprint of dcf's company, if already computed.
+
+    Returns:
+        fingerprint (str): Hex digest that is equal for DCFs valuing equal companies under equal assumptions.
+    """
+    assumptions = {name: _canonical(value) for name, value in dcf.batch_assumptions().items()}
+    return _digest({'version': CACHE_VERSION,
+                    'company': company or company_fingerprint(dcf.company),
+                    'assumptions': assumptions})
+
+
+class ResultCache:
+    """SQLite cache of DCF forecasts and valuations on local disk.
+
+    When the stored results take more than max_bytes, the least recently used results are evicted.
+
+    Args:
+        path (str): Path of SQLite database. Created if it does not exist. Use ':memory:' for a cache that is not
+            persisted.
+        max_bytes (int, optional): Maximum size of stored results in bytes. Defaults to 256 MB.
+
+    Example:
+        >>> cache = ResultCache('valuations.sqlite')
+        >>> cache.valuation(dcf)['equity_value_per_share']
+    """
+
+    def __init__(self, path, max_bytes=256 * 2 ** 20):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @property
+    def stats(self):
+        """Counts of hits, misses and evictions since cache was opened, and entries and bytes currently stored."""
+        entries, = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()
+        return dict(self._stats, entries=entries, bytes=self._size())
+
+    def _size(self):
+        """Total size of stored results, kept up to date by triggers on inserts and deletes."""
+        return self._connection.execute('SELECT size FROM total').fetchone()[0]
+
+    def get(self, dcf):
+        """Get stored result of dcf.
+
+        Args:
+            dcf (autodcf.models.DCF): DCF to look up.
+
+        Returns:
+            Dictionary mapping VALUATIONS and forecast (read-only array laid out as DCF.forecast_array()) to stored
+            results, or None if there are none.
+        """
+        key = fingerprint(dcf)
+        row = self._connection.execute('SELECT forecast, valuation FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._stats['misses'] += 1
+            return None
+        self._stats['hits'] += 1
+        with self._connection:
+            self._connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+        result = json.loads(row[1])
+        result['forecast'] = np.frombuffer(row[0], dtype=float).reshape(-1, len(LINE_ITEMS))
+        return result
+
+    def put(self, dcf):
+        """Compute and store result of dcf, replacing any stored result.
+
+        Returns:
+            Dictionary mapping VALUATIONS and forecast to results.
+        """
+        company = company_fingerprint(dcf.company)
+        key = fingerprint(dcf, company=company)
+        result = {name: getattr(dcf, name) for name in VALUATIONS}
+        forecast = dcf.forecast_array().copy()
+        valuation = json.dumps(result)
+        blob = forecast.tobytes()
+        with self._connection:
+            # Delete rather than replace, so the delete trigger keeps the total size up to date.
+            self._connection.execute('DELETE FROM results WHERE key = ?', (key,))
+            self._connection.execute('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                                     (key, company, blob, valuation, len(blob) + len(valuation) + len(key),
+                                      time.time()))
+        self._evict()
+        forecast.flags.writeable = False
+        result['forecast'] = forecast
+        return result
+
+    def valuation(self, dcf):
+        """Get result of dcf from cache, computing and storing it on a miss.
+
+        Returns:
+            Dictionary mapping VALUATIONS and forecast to results.
+        """
+        result = self.get(dcf)
+        return self.put(dcf) if result is None else result
+
+    def _evict(self):
+        """Evict least recently used results until stored results fit in max_bytes."""
+        size = self._size()
+        if size <= self._max_bytes:
+            return
+        evicted = []
+        for key, row_size in self._connection.execute('SELECT key, size FROM results ORDER BY accessed'):
+            if size <= self._max_bytes:
+                break
+            evicted.append((key,))
+            size -= row_size
+        with self._connection:
+            self._connection.executemany('DELETE FROM results WHERE key = ?', evicted)
+        self._stats['evictions'] += len(evicted)
+
+    def invalidate(self, dcf=None, company=None):
+        """Drop stored results.
+
+        Args:
+            dcf (autodcf.models.DCF, optional): Drop result of this DCF.
+            company (autodcf.company.Company, optional): Drop results of every DCF of a company with these values.
+
+        Returns:
+            count (int): Number of results dropped.
+        """
+        with self._connection:
+            if dcf is not None:
+                cursor = self._connection.execute('DELETE FROM results WHERE key = ?', (fingerprint(dcf),))
+            elif company is not None:
+                cursor = self._connection.execute('DELETE FROM results WHERE company = ?',
+                                                  (company_fingerprint(company),))
+            else:
+                raise ValueError("Give dcf or company to invalidate. Use clear() to drop every result.")
+        return cursor.rowcount
+
+    def clear(self):
+        """Drop every stored result."""
+        with self._connection:
+            self._connection.execute('DELETE FROM results')
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,279 @@
+"""Command line interface for valuing many companies from flat files.
+
+Each input row holds one company's most recent fundamentals (the args of :class:`autodcf.company.Company` and of
+the statement classes, e.g. fully_diluted_shares, cash, sales, capex) and one set of assumptions (sales_growth,
+discount_rate, terminal_growth_rate, change_in_nwc_to_change_in_sales and tax_rate, plus an optional window).
+Rows are valued as in :class:`autodcf.models.SimpleDCF`, with ratios to sales taken from the row's statements, or as
+in :class:`autodcf.models.DCF` for any of cogs_to_sales, sga_to_sales, rd_to_sales, da_to_sales, interest_to_sales
+and capex_to_sales given as columns.
+
+Inputs are read and valued in chunks and results are written as soon as each chunk is valued, in input order, so
+memory use depends on chunk size rather than input size.
+
+Example:
+    $ autodcf universe.parquet --label ticker --jobs 4 > valuations.jsonl
+    $ cat companies.csv | autodcf --format csv --output-format csv
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from autodcf.company.company_table import CompanyTable
+from autodcf.models.portfolio import COMPANY_FIELDS, RESULT_FIELDS, SCENARIO_FIELDS, company_arrays, value_rows
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+EXTENSIONS = {'.jsonl': 'jsonl',
+              '.ndjson': 'jsonl',
+              '.json': 'jsonl',
+              '.csv': 'csv',
+              '.parquet': 'parquet',
+              '.pq': 'parquet'}
+
+RATIO_FIELDS = tuple(field for field in COMPANY_FIELDS if field.endswith('_to_sales'))
+
+# Values of optional statement columns, used for rows that leave them out.
+DEFAULTS = {field: value for _, table_class in CompanyTable.tables for field, value in table_class.defaults.items()}
+
+
+def _numeric_fields():
+    fields = list(CompanyTable.fields)
+    for _, table_class in CompanyTable.tables:
+        fields.extend(table_class.fields)
+    return fields + list(SCENARIO_FIELDS) + list(RATIO_FIELDS) + ['window']
+
+
+NUMERIC_FIELDS = frozenset(_numeric_fields())
+
+
+def infer_format(path, fmt=None):
+    """Get format of path from its extension, unless fmt is given. Standard streams default to jsonl."""
+    if fmt is not None:
+        return fmt
+    if path == '-':
+        return 'jsonl'
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError("Cannot tell format of {0}. Use --format.".format(path))
+    return EXTENSIONS[extension]
+
+
+def _records_to_columns(records):
+    """Convert list of dicts into dict of lists, with None for missing values."""
+    names = dict.fromkeys(name for record in records for name in record)
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def _record_chunks(records, chunk_size):
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield _records_to_columns(chunk)
+
+
+def read_chunks(path, fmt, chunk_size):
+    """Read input in chunks.
+
+    Parquet files need random access, so Parquet read from stdin is read into memory whole before the first chunk.
+
+    Args:
+        path (str): Path of input file, or - for stdin.
+        fmt (str): One of jsonl, csv and parquet.
+        chunk_size (int): Maximum rows per chunk.
+
+    Yields:
+        Dictionary mapping column name to values of rows in chunk.
+    """
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow. Install it with `pip install pyarrow`.")
+        source = io.BytesIO(sys.stdin.buffer.read()) if path == '-' else path
+        for batch in pyarrow.parquet.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield {name: column.to_numpy(zero_copy_only=False)
+                   for name, column in zip(batch.schema.names, batch.columns)}
+        return
+    f = sys.stdin if path == '-' else open(path, newline='')
+    try:
+        if fmt == 'jsonl':
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for chunk in _record_chunks(records, chunk_size):
+            yield chunk
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _floats(values):
+    """Convert column to float array. Missing values (None or empty strings) become NaN."""
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return values.astype(float)
+    return np.array([np.nan if value is None or value == '' else value for value in values], dtype=float)
+
+
+def value_chunk(columns, window=5, label=None, start=0):
+    """Value each row of chunk.
+
+    Args:
+        columns (dict): Mapping of column name to values of rows in chunk.
+        window (int, optional): Window used for rows with no window column. Defaults to 5.
+        label (str, optional): Name of column with row labels. Defaults to position in input.
+        start (int, optional): Position of first row of chunk in input. Defaults to 0.
+
+    Returns:
+        Tuple of labels and dictionary mapping RESULT_FIELDS to arrays with one value per row.
+    """
+    n = len(next(iter(columns.values())))
+    numeric = {name: _floats(values) for name, values in columns.items() if name in NUMERIC_FIELDS and name != label}
+    missing = [field for field in SCENARIO_FIELDS if field not in numeric]
+    if missing:
+        raise ValueError("Missing assumption columns {0}.".format(missing))
+    for field, default in DEFAULTS.items():
+        if field in numeric:
+            # Rows without an optional column get its default, as they would in a chunk where no row has it.
+            numeric[field] = np.where(np.isnan(numeric[field]), default, numeric[field])
+    companies = company_arrays(CompanyTable.from_columns(numeric))
+    for field in RATIO_FIELDS:
+        if field in numeric:
+            companies[field] = np.where(np.isnan(numeric[field]), companies[field], numeric[field])
+    scenarios = {field: numeric[field] for field in SCENARIO_FIELDS}
+    windows = numeric.get('window', np.full(n, np.nan))
+    windows = np.where(np.isnan(windows), window, windows)
+    fractional = ~np.isfinite(windows) | (windows != np.round(windows))
+    if fractional.any():
+        raise ValueError("Window must be a whole number of years. Given {0}.".format(windows[fractional][0]))
+    windows = windows.astype(int)
+    results = {field: np.empty(n) for field in RESULT_FIELDS}
+    for w in np.unique(windows):
+        rows = windows == w
+        valued = value_rows({field: arr[rows] for field, arr in companies.items()},
+                            {field: arr[rows] for field, arr in scenarios.items()},
+                            int(w))
+        for field in RESULT_FIELDS:
+            results[field][rows] = valued[field]
+    labels = list(columns[label]) if label is not None else list(range(start, start + n))
+    return labels, results
+
+
+def _value_chunk(payload):
+    """Value one chunk. Runs in worker processes."""
+    return value_chunk(*payload)
+
+
+def _payloads(paths, fmt, chunk_size, window, label):
+    start = 0
+    for path in paths:
+        for columns in read_chunks(path, infer_format(path, fmt), chunk_size):
+            yield columns, window, label, start
+            start += len(next(iter(columns.values())))
+
+
+def value_chunks(payloads, jobs=1):
+    """Value chunks in input order, with at most 2 * jobs chunks in flight when jobs > 1."""
+    if jobs == 1:
+        for payload in payloads:
+            yield _value_chunk(payload)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for payload in payloads:
+            pending.append(executor.submit(_value_chunk, payload))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _json_label(label):
+    """Encode label as JSON. Row positions are formatted directly since encoding every row is slow."""
+    if isinstance(label, np.generic):
+        label = label.item()
+    return str(label) if type(label) is int else json.dumps(label)
+
+
+def _json_floats(values):
+    """Encode float array as JSON, one string per value, with null for values that are not finite."""
+    encoded = list(map(repr, values.tolist()))
+    for i in np.flatnonzero(~np.isfinite(values)):
+        encoded[i] = 'null'
+    return encoded
+
+
+def write_chunks(chunks, f, fmt, label_name):
+    """Write valued chunks to f as they arrive, flushing after each chunk."""
+    writer = None
+    keys = [json.dumps(key) for key in (label_name,) + RESULT_FIELDS]
+    template = '{' + ', '.join(key + ': %s' for key in keys) + '}\n'
+    for labels, results in chunks:
+        columns = [results[field] for field in RESULT_FIELDS]
+        if fmt == 'csv':
+            if writer is None:
+                writer = csv.writer(f)
+                writer.writerow((label_name,) + RESULT_FIELDS)
+            writer.writerows(zip(labels, *[column.tolist() for column in columns]))
+        else:
+            rows = zip(map(_json_label, labels), *[_json_floats(column) for column in columns])
+            f.write(''.join(template % row for row in rows))
+        f.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='autodcf',
+                                     description='Value companies with discounted cash flow analysis.')
+    parser.add_argument('inputs', nargs='*', default=['-'],
+                        help='JSON Lines, CSV or Parquet files with one company and set of assumptions per row. '
+                             'Defaults to stdin (-).')
+    parser.add_argument('--format', choices=FORMATS, help='Format of inputs. Defaults to format given by extension '
+                                                          '(jsonl for stdin).')
+    parser.add_argument('-o', '--output', default='-', help='Output file. Defaults to stdout (-).')
+    parser.add_argument('--output-format', choices=('jsonl', 'csv'),
+                        help='Format of output. Defaults to format given by extension of output (jsonl for stdout).')
+    parser.add_argument('--label', help='Column with row labels (e.g. ticker). Defaults to row position.')
+    parser.add_argument('--window', type=int, default=5, help='Window for rows without window column. Defaults to 5.')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='Rows valued at once. Defaults to 10,000.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes. Defaults to 1.')
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1 or args.jobs < 1:
+        parser.error('--chunk-size and --jobs must be at least 1.')
+    return args
+
+
+def main(argv=None):
+    """Run command line interface.
+
+    Returns:
+        status (int): Exit status. 0 on success and 1 if input could not be valued.
+    """
+    args = parse_args(argv)
+    try:
+        output_format = args.output_format or ('jsonl' if args.output == '-' else infer_format(args.output))
+        if output_format == 'parquet':
+            raise ValueError("Output must be jsonl or csv.")
+        chunks = value_chunks(_payloads(args.inputs, args.format, args.chunk_size, args.window, args.label),
+                              jobs=args.jobs)
+        f = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+        try:
+            write_chunks(chunks, f, output_format, args.label or 'row')
+        finally:
+            if f is not sys.stdout:
+                f.close()
+    except BrokenPipeError:
+        # Output was closed early (e.g. piped to head). Point stdout at devnull so flushing at exit does not fail.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (ValueError, KeyError, ImportError, OSError) as e:
+        sys.stderr.write('autodcf: error: {0}\n'.format(e))
+        return 1
+    return 0
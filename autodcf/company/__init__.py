@@ -2,3 +2,6 @@ from autodcf.company.balance_sheet import BalanceSheet  # noqa:F401
 from autodcf.company.cash_flows import CashFlows  # noqa:F401
 from autodcf.company.income_statement import IncomeStatement  # noqa:F401
 from autodcf.company.company import Company  # noqa:F401
+from autodcf.company.statement_table import BalanceSheetTable, CashFlowsTable, IncomeStatementTable  # noqa:F401
+from autodcf.company.statement_history import StatementHistory  # noqa:F401
+from autodcf.company.company_table import CompanyTable  # noqa:F401
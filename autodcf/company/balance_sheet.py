@@ -1,5 +1,59 @@
 import datetime
 
+# Metrics derived from the line items of a balance sheet, in the order of BalanceSheet.derived_metrics().
+DERIVED_METRICS = ('current_assets',
+                   'long_term_assets',
+                   'assets',
+                   'current_liabilites',
+                   'long_term_liabilities',
+                   'liabilities',
+                   'net_debt',
+                   'equity',
+                   'debt_to_equity')
+
+# Line items summed into each total, in the order they are added.
+TOTAL_LINE_ITEMS = {'current_assets': ('cash', 'short_term_investments', 'net_receivables', 'inventory',
+                                       'other_current_assets'),
+                    'long_term_assets': ('ppe', 'goodwill', 'intangible_assets', 'other_lt_assets'),
+                    'current_liabilites': ('accounts_payable', 'accrued_liabilities', 'short_term_debt',
+                                           'current_part_lt_debt', 'other_current_liabilities'),
+                    'long_term_liabilities': ('other_lt_liabilities', 'long_term_debt', 'deferred_lt_liabilities',
+                                              'minority_interest')}
+
+
+def sum_line_items(line_item, total):
+    """Sum the line items of one total in TOTAL_LINE_ITEMS.
+
+    Args:
+        line_item (callable): Function getting value of line item by name (e.g. 'cash'), as a float or array.
+        total (str): Name of total (e.g. 'current_assets').
+    """
+    names = TOTAL_LINE_ITEMS[total]
+    value = line_item(names[0])
+    for name in names[1:]:
+        value = value + line_item(name)
+    return value
+
+
+def sum_totals(line_item):
+    """Sum line items into every total, each line item once.
+
+    Used by both :class:`BalanceSheet` and :class:`autodcf.company.BalanceSheetTable`, so totals are summed the same
+    way for one balance sheet and for many.
+
+    Args:
+        line_item (callable): Function getting value of line item by name (e.g. 'cash'), as a float or array.
+
+    Returns:
+        Dictionary mapping current_assets, long_term_assets, assets, current_liabilites, long_term_liabilities,
+        liabilities and equity to values.
+    """
+    totals = {total: sum_line_items(line_item, total) for total in TOTAL_LINE_ITEMS}
+    totals['assets'] = totals['current_assets'] + totals['long_term_assets']
+    totals['liabilities'] = totals['current_liabilites'] + totals['long_term_liabilities']
+    totals['equity'] = totals['assets'] - totals['liabilities']
+    return totals
+
 
 class BalanceSheet:
     """Balance sheet for specific company at specific point in time.
@@ -28,8 +82,34 @@ class BalanceSheet:
         date (datetime.datetime, optional): Date balance sheet was released.
         other_lt_liability_debt_multiplier (float, optional): Long-term liabilities that are long-term debt.
             Should be between 0 and 1 inclusive. Defaults to 0.
+
+    Note:
+        Totals (current_assets through equity) are summed once, on first access, and kept. Line items are
+        read-only, so the totals never go stale.
     """
 
+    __slots__ = ('_cash',
+                 '_short_term_investments',
+                 '_net_receivables',
+                 '_inventory',
+                 '_other_current_assets',
+                 '_ppe',
+                 '_goodwill',
+                 '_intangible_assets',
+                 '_other_lt_assets',
+                 '_accounts_payable',
+                 '_accrued_liabilities',
+                 '_short_term_debt',
+                 '_current_part_lt_debt',
+                 '_other_current_liabilities',
+                 '_long_term_debt',
+                 '_other_lt_liabilities',
+                 '_deferred_lt_liabilities',
+                 '_minority_interest',
+                 '_other_lt_liability_debt_multiplier',
+                 '_date',
+                 '_totals')
+
     def __init__(self,
                  cash,
                  short_term_investments,
@@ -80,6 +160,7 @@ class BalanceSheet:
         # Options
         self._other_lt_liability_debt_multiplier = other_lt_liability_debt_multiplier
         self._date = date
+        self._totals = None
 
     @property
     def cash(self):
@@ -178,49 +259,46 @@ class BalanceSheet:
         minority interest."""
         return self._other_lt_liabilities
 
+    def _calculate_totals(self):
+        """Sum line items into totals, each line item once."""
+        return sum_totals(lambda name: getattr(self, '_' + name))
+
+    def _cached_totals(self):
+        """Totals of line items, summed on first call."""
+        # Summed in a separate method, since a lambda using self here would slow down every cached call.
+        if self._totals is None:
+            self._totals = self._calculate_totals()
+        return self._totals
+
     @property
     def current_assets(self):
         """Total value of current assets at date of filing."""
-        return sum((self.cash,
-                    self.short_term_investments,
-                    self.net_receivables,
-                    self.inventory,
-                    self.other_current_assets))
+        return self._cached_totals()['current_assets']
 
     @property
     def long_term_assets(self):
         """Total value of long-term assets at date of filing."""
-        return sum((self.ppe,
-                    self.goodwill,
-                    self.intangible_assets,
-                    self.other_lt_assets))
+        return self._cached_totals()['long_term_assets']
 
     @property
     def assets(self):
         """Total value of assets at date of filing."""
-        return self.current_assets + self.long_term_assets
+        return self._cached_totals()['assets']
 
     @property
     def current_liabilites(self):
         """Total amount of current liabilities at date of filing."""
-        return sum((self.accounts_payable,
-                    self.accrued_liabilities,
-                    self.short_term_debt,
-                    self.current_part_lt_debt,
-                    self.other_current_liabilities))
+        return self._cached_totals()['current_liabilites']
 
     @property
     def long_term_liabilities(self):
         """Total amount of long-term liabilities at date of filing."""
-        return sum((self.other_lt_liabilities,
-                    self.long_term_debt,
-                    self.deferred_lt_liabilities,
-                    self.minority_interest))
+        return self._cached_totals()['long_term_liabilities']
 
     @property
     def liabilities(self):
         """Total amount of liabilities at date of filing."""
-        return self.current_liabilites + self.long_term_liabilities
+        return self._cached_totals()['liabilities']
 
     @property
     def net_debt(self):
@@ -232,12 +310,26 @@ class BalanceSheet:
     @property
     def equity(self):
         """Total assets minus total liabilities at date of filing."""
-        return self.assets - self.liabilities
+        return self._cached_totals()['equity']
 
     @property
     def debt_to_equity(self):
         """float: Ratio of total liabilities to shareholder equity."""
-        return self.liabilities / self.equity
+        totals = self._cached_totals()
+        return totals['liabilities'] / totals['equity']
+
+    def derived_metrics(self):
+        """Get every metric in DERIVED_METRICS.
+
+        Use :meth:`autodcf.company.BalanceSheetTable.derived_metrics` for many balance sheets at once.
+
+        Returns:
+            Dictionary mapping DERIVED_METRICS to values.
+        """
+        metrics = dict(self._cached_totals())
+        metrics['net_debt'] = self.net_debt
+        metrics['debt_to_equity'] = metrics['liabilities'] / metrics['equity']
+        return {name: metrics[name] for name in DERIVED_METRICS}
 
     @property
     def date(self):
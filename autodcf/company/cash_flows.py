@@ -8,6 +8,8 @@ class CashFlows:
         capex (Union[int, float]): Capital expenditures for cash flow period.
     """
 
+    __slots__ = ('_capex',)
+
     def __init__(self,
                  capex):
         self._capex = capex
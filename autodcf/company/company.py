@@ -21,6 +21,12 @@ class Company:
         income_statement (autodcf.company.IncomeStatement): Most recent income statement of company.
     """
 
+    __slots__ = ('_fully_diluted_shares',
+                 '_price_per_share',
+                 '_balance_sheet',
+                 '_cash_flows',
+                 '_income_statement')
+
     def __init__(self,
                  fully_diluted_shares,
                  price_per_share,
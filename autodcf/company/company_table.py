@@ -0,0 +1,139 @@
+import numpy as np
+
+from autodcf.company.company import Company
+from autodcf.company.statement_table import BalanceSheetTable, CashFlowsTable, IncomeStatementTable
+
+
+class CompanyTable:
+    """Many companies stored as columnar statement tables.
+
+    Every column holds one value per company. :class:`autodcf.company.Company` objects (and their statements) are
+    only built when a single company is accessed by position.
+
+    Args:
+        fully_diluted_shares (Iterable): Fully diluted shares of each company.
+        price_per_share (Iterable): Price per share of each company.
+        balance_sheets (autodcf.company.BalanceSheetTable): Most recent balance sheet of each company.
+        cash_flows (autodcf.company.CashFlowsTable): Most recent cash flows of each company.
+        income_statements (autodcf.company.IncomeStatementTable): Most recent income statement of each company.
+        labels (Iterable, optional): Label (e.g. ticker) of each company. Defaults to position.
+    """
+
+    tables = (('balance_sheets', BalanceSheetTable),
+              ('cash_flows', CashFlowsTable),
+              ('income_statements', IncomeStatementTable))
+    fields = ('fully_diluted_shares', 'price_per_share')
+
+    def __init__(self,
+                 fully_diluted_shares,
+                 price_per_share,
+                 balance_sheets,
+                 cash_flows,
+                 income_statements,
+                 labels=None):
+        self._fully_diluted_shares = np.ascontiguousarray(fully_diluted_shares, dtype=float)
+        self._price_per_share = np.ascontiguousarray(price_per_share, dtype=float)
+        self._balance_sheets = balance_sheets
+        self._cash_flows = cash_flows
+        self._income_statements = income_statements
+        n = len(self._fully_diluted_shares)
+        self._labels = np.arange(n) if labels is None else np.asarray(labels)
+        lengths = {len(self._price_per_share), len(balance_sheets), len(cash_flows), len(income_statements),
+                   len(self._labels)}
+        if lengths != {n}:
+            raise ValueError("All columns must have the same length. Got lengths {0}.".format(sorted(lengths | {n})))
+
+    @classmethod
+    def from_columns(cls, columns, labels=None):
+        """Build table from flat mapping of column name to values.
+
+        Column names are the args of :class:`autodcf.company.Company` (fully_diluted_shares and price_per_share)
+        and of the statement classes (e.g. cash, sales, capex, end_date). Columns not used by any of them are
+        ignored.
+
+        Args:
+            columns (Mapping): Mapping of column name to values with one value per company.
+            labels (Iterable, optional): Label of each company. Defaults to position.
+
+        Returns:
+            table (CompanyTable): Table of companies.
+        """
+        missing = [field for field in cls.fields if field not in columns]
+        if missing:
+            raise ValueError("Missing columns {0} for {1}.".format(missing, cls.__name__))
+        kwargs = {field: columns[field] for field in cls.fields}
+        for name, table_class in cls.tables:
+            table_columns = {field: columns[field] for field in table_class.fields + table_class.date_fields
+                             if field in columns}
+            kwargs[name] = table_class(**table_columns)
+        return cls(labels=labels, **kwargs)
+
+    @classmethod
+    def from_companies(cls, companies, labels=None):
+        """Build table from company objects.
+
+        Args:
+            companies (Iterable[autodcf.company.Company]): Companies to store.
+            labels (Iterable, optional): Label of each company. Defaults to position.
+
+        Returns:
+            table (CompanyTable): Table of companies.
+        """
+        companies = list(companies)
+        return cls(fully_diluted_shares=[company.fully_diluted_shares for company in companies],
+                   price_per_share=[company.price_per_share for company in companies],
+                   balance_sheets=BalanceSheetTable.from_statements(c.balance_sheet for c in companies),
+                   cash_flows=CashFlowsTable.from_statements(c.cash_flows for c in companies),
+                   income_statements=IncomeStatementTable.from_statements(c.income_statement for c in companies),
+                   labels=labels)
+
+    @property
+    def labels(self):
+        """Array of company labels."""
+        return self._labels
+
+    @property
+    def fully_diluted_shares(self):
+        return self._fully_diluted_shares
+
+    @property
+    def price_per_share(self):
+        return self._price_per_share
+
+    @property
+    def balance_sheets(self):
+        return self._balance_sheets
+
+    @property
+    def cash_flows(self):
+        return self._cash_flows
+
+    @property
+    def income_statements(self):
+        return self._income_statements
+
+    def __len__(self):
+        return len(self._fully_diluted_shares)
+
+    def __getitem__(self, key):
+        """Get company by position, or new table by slice, boolean mask or integer array."""
+        if isinstance(key, (int, np.integer)):
+            return self.company(key)
+        return type(self)(fully_diluted_shares=self._fully_diluted_shares[key],
+                          price_per_share=self._price_per_share[key],
+                          balance_sheets=self._balance_sheets[key],
+                          cash_flows=self._cash_flows[key],
+                          income_statements=self._income_statements[key],
+                          labels=self._labels[key])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.company(i)
+
+    def company(self, i):
+        """Build company object for row i."""
+        return Company(fully_diluted_shares=self._fully_diluted_shares[i].item(),
+                       price_per_share=self._price_per_share[i].item(),
+                       balance_sheet=self._balance_sheets[i],
+                       cash_flows=self._cash_flows[i],
+                       income_statement=self._income_statements[i])
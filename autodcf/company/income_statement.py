@@ -31,6 +31,18 @@ class IncomeStatement:
         end_date (datetime.datetime): Last day of period for income statement.
     """
 
+    __slots__ = ('_sales',
+                 '_cogs',
+                 '_sga',
+                 '_rd',
+                 '_nonrecurring_cost',
+                 '_interest',
+                 '_tax',
+                 '_depreciation',
+                 '_amortization',
+                 '_start_date',
+                 '_end_date')
+
     def __init__(self,
                  sales,
                  cogs,
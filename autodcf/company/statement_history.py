@@ -0,0 +1,134 @@
+import numpy as np
+
+from autodcf.company.balance_sheet import BalanceSheet
+from autodcf.company.cash_flows import CashFlows
+from autodcf.company.income_statement import IncomeStatement
+from autodcf.company.statement_table import BalanceSheetTable, CashFlowsTable, IncomeStatementTable
+
+TABLES = {BalanceSheet: BalanceSheetTable,
+          IncomeStatement: IncomeStatementTable,
+          CashFlows: CashFlowsTable}
+
+DATE_FIELDS = {BalanceSheetTable: 'date',
+               IncomeStatementTable: 'end_date'}
+
+
+def _datetime64(date):
+    """Convert datetime, date string or numpy datetime64 to datetime64[us]."""
+    return np.datetime64(date, 'us')
+
+
+class StatementHistory:
+    """Statements of one company over many periods, stored in a statement table sorted by date.
+
+    Balance sheets are indexed on date and income statements on end_date. Cash flow statements carry no date, so
+    dates must be given for them.
+
+    Args:
+        table (autodcf.company.StatementTable): Statements to index.
+        dates (Iterable, optional): Date of each statement. Defaults to the table's date (balance sheets) or
+            end_date (income statements).
+    """
+
+    def __init__(self, table, dates=None):
+        if dates is None:
+            if type(table) not in DATE_FIELDS:
+                raise ValueError("Dates must be given for {0}.".format(type(table).__name__))
+            dates = table[DATE_FIELDS[type(table)]]
+        dates = np.asarray(dates, dtype='datetime64[us]')
+        if dates.shape != (len(table),):
+            raise ValueError("Expected {0} dates, got {1}.".format(len(table), dates.shape))
+        if np.isnat(dates).any():
+            raise ValueError("Every statement in history must have a date.")
+        order = np.argsort(dates, kind='stable')
+        self._table = table[order]
+        self._dates = dates[order]
+
+    @classmethod
+    def from_statements(cls, statements, dates=None):
+        """Build history from statement objects.
+
+        Args:
+            statements (Iterable): Statements of a single kind.
+            dates (Iterable, optional): Date of each statement. Required for cash flow statements.
+
+        Returns:
+            history (StatementHistory): History of statements sorted by date.
+        """
+        statements = list(statements)
+        if not statements:
+            raise ValueError("Cannot build history from no statements.")
+        return cls(TABLES[type(statements[0])].from_statements(statements), dates=dates)
+
+    @property
+    def table(self):
+        """Statement table sorted by date."""
+        return self._table
+
+    @property
+    def dates(self):
+        """Sorted datetime64 array of statement dates."""
+        return self._dates
+
+    def __len__(self):
+        return len(self._dates)
+
+    def __getitem__(self, key):
+        """Get column of values by name (sorted by date) or statement by position."""
+        return self._table[key]
+
+    @property
+    def latest(self):
+        """Most recent statement."""
+        return self._table[len(self) - 1]
+
+    def asof_index(self, date):
+        """Position of most recent statement dated on or before date, or -1 if there is none."""
+        return int(np.searchsorted(self._dates, _datetime64(date), side='right')) - 1
+
+    def asof(self, date):
+        """Get most recent statement dated on or before date.
+
+        Args:
+            date (Union[datetime.datetime, str, np.datetime64]): Date to look up.
+
+        Returns:
+            statement: Statement object.
+
+        Raises:
+            KeyError: If there are no statements on or before date.
+        """
+        i = self.asof_index(date)
+        if i < 0:
+            raise KeyError("No statement on or before {0}.".format(date))
+        return self._table[i]
+
+    def between(self, start=None, end=None):
+        """Get history of statements dated from start through end inclusive.
+
+        Args:
+            start (Union[datetime.datetime, str, np.datetime64], optional): First date. Defaults to earliest.
+            end (Union[datetime.datetime, str, np.datetime64], optional): Last date. Defaults to latest.
+
+        Returns:
+            history (StatementHistory): History of statements in range.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self._dates, _datetime64(start), side='left'))
+        hi = len(self) if end is None else int(np.searchsorted(self._dates, _datetime64(end), side='right'))
+        return type(self)(self._table[lo:hi], dates=self._dates[lo:hi])
+
+    def values(self, name):
+        """Get values of a line item or derived metric (e.g. net_debt) for every period, sorted by date."""
+        return self._table[name] if name in self._table.columns else getattr(self._table, name)
+
+    def ratio(self, numerator, denominator):
+        """Ratio of two line items or derived metrics for every period.
+
+        Args:
+            numerator (str): Name of line item or derived metric (e.g. cogs).
+            denominator (str): Name of line item or derived metric (e.g. sales).
+
+        Returns:
+            Numpy array with one ratio per period, sorted by date.
+        """
+        return self.values(numerator) / self.values(denominator)
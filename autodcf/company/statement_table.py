@@ -0,0 +1,227 @@
+import datetime
+
+import numpy as np
+
+from autodcf.company.balance_sheet import DERIVED_METRICS, BalanceSheet, sum_line_items, sum_totals
+from autodcf.company.cash_flows import CashFlows
+from autodcf.company.income_statement import IncomeStatement
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_NAT = np.iinfo(np.int64).min
+
+
+def _to_datetime(val):
+    """Convert numpy datetime64 to datetime.datetime, or None if not a time."""
+    return None if np.isnat(val) else val.astype('datetime64[us]').item()
+
+
+def _to_datetime64(values):
+    """Convert list of naive datetime.datetime (or None) to datetime64[us] array.
+
+    Counting microseconds from the epoch in Python is about 10 times faster than converting each datetime with
+    numpy. Any other values (e.g. dates or timezone-aware datetimes) are converted by numpy.
+    """
+    try:
+        micros = [_NAT if value is None else (value - _EPOCH) // _MICROSECOND for value in values]
+    except TypeError:
+        return np.array(values, dtype='datetime64[us]')
+    return np.array(micros, dtype=np.int64).view('datetime64[us]')
+
+
+class StatementTable:
+    """Many statements of one kind stored as one contiguous array per line item.
+
+    Line items are float64 arrays and dates are datetime64 arrays (NaT where a statement has no date), so a table
+    of n statements takes about 8 bytes per value instead of a Python object per statement. Statement objects are
+    only built when a single row is accessed.
+
+    Subclasses set statement_class, fields (names of numeric args of statement_class), date_fields and defaults
+    (values used for args that are not given).
+
+    Args:
+        **columns: Values of each line item with one value per statement.
+    """
+
+    statement_class = None
+    fields = ()
+    date_fields = ()
+    defaults = {}
+
+    def __init__(self, **columns):
+        unknown = set(columns) - set(self.fields) - set(self.date_fields)
+        if unknown:
+            raise ValueError("Unknown columns {0} for {1}.".format(sorted(unknown), type(self).__name__))
+        missing = [field for field in self.fields if field not in columns and field not in self.defaults]
+        if missing:
+            raise ValueError("Missing columns {0} for {1}.".format(missing, type(self).__name__))
+        length = len(next(iter(columns.values()))) if columns else 0
+        self._columns = {}
+        for field in self.fields:
+            self._columns[field] = self._column(columns.get(field, self.defaults.get(field)), length, float)
+        for field in self.date_fields:
+            self._columns[field] = self._column(columns.get(field), length, 'datetime64[us]')
+
+    @staticmethod
+    def _column(values, length, dtype):
+        """Convert values to contiguous array of given length, broadcasting scalars."""
+        if values is None or np.ndim(values) == 0:
+            return np.full(length, 'NaT' if values is None else values, dtype=dtype)
+        arr = np.ascontiguousarray(values, dtype=dtype)
+        if arr.shape != (length,):
+            raise ValueError("All columns must have the same length. Expected {0}, got {1}.".format(
+                length, arr.shape))
+        return arr
+
+    @classmethod
+    def from_statements(cls, statements):
+        """Build table from statement objects.
+
+        Args:
+            statements (Iterable): Statements of type statement_class.
+
+        Returns:
+            table (StatementTable): Table with one row per statement.
+        """
+        statements = list(statements)
+        columns = {field: [getattr(statement, field) for statement in statements] for field in cls.fields}
+        for field in cls.date_fields:
+            columns[field] = _to_datetime64([getattr(statement, field) for statement in statements])
+        return cls(**columns)
+
+    @property
+    def columns(self):
+        """Mapping of line item name to array of values."""
+        return self._columns
+
+    def __len__(self):
+        return len(self._columns[self.fields[0]])
+
+    def __getitem__(self, key):
+        """Get column by name, statement by position, or new table by slice, boolean mask or integer array."""
+        if isinstance(key, str):
+            return self._columns[key]
+        if isinstance(key, (int, np.integer)):
+            return self.statement(key)
+        return type(self)(**{field: column[key] for field, column in self._columns.items()})
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.statement(i)
+
+    def statement(self, i):
+        """Build statement object for row i."""
+        kwargs = {field: self._columns[field][i].item() for field in self.fields}
+        for field in self.date_fields:
+            date = _to_datetime(self._columns[field][i])
+            if date is not None:
+                kwargs[field] = date
+        return self.statement_class(**kwargs)
+
+
+class BalanceSheetTable(StatementTable):
+    """Columnar table of :class:`autodcf.company.BalanceSheet`."""
+
+    statement_class = BalanceSheet
+    fields = ('cash',
+              'short_term_investments',
+              'net_receivables',
+              'inventory',
+              'other_current_assets',
+              'ppe',
+              'goodwill',
+              'intangible_assets',
+              'other_lt_assets',
+              'accounts_payable',
+              'accrued_liabilities',
+              'short_term_debt',
+              'current_part_lt_debt',
+              'long_term_debt',
+              'other_current_liabilities',
+              'other_lt_liabilities',
+              'deferred_lt_liabilities',
+              'minority_interest',
+              'other_lt_liability_debt_multiplier')
+    date_fields = ('date',)
+    defaults = {'other_lt_liability_debt_multiplier': 0.0}
+
+    @property
+    def current_assets(self):
+        return sum_line_items(self._columns.__getitem__, 'current_assets')
+
+    @property
+    def long_term_assets(self):
+        return sum_line_items(self._columns.__getitem__, 'long_term_assets')
+
+    @property
+    def assets(self):
+        return self.current_assets + self.long_term_assets
+
+    @property
+    def current_liabilites(self):
+        return sum_line_items(self._columns.__getitem__, 'current_liabilites')
+
+    @property
+    def long_term_liabilities(self):
+        return sum_line_items(self._columns.__getitem__, 'long_term_liabilities')
+
+    @property
+    def liabilities(self):
+        return self.current_liabilites + self.long_term_liabilities
+
+    @property
+    def net_debt(self):
+        c = self._columns
+        return (c['short_term_debt'] + c['long_term_debt']
+                + c['other_lt_liabilities'] * c['other_lt_liability_debt_multiplier']  # noqa: W503
+                - c['cash'] - c['short_term_investments'])  # noqa: W503
+
+    @property
+    def equity(self):
+        return self.assets - self.liabilities
+
+    @property
+    def debt_to_equity(self):
+        return self.liabilities / self.equity
+
+    def derived_metrics(self):
+        """Get every metric in DERIVED_METRICS for every balance sheet at once.
+
+        Each total is summed once and reused by the totals built on it, so this is much faster than reading each
+        property in turn. For many :class:`autodcf.company.BalanceSheet` objects, build a table with
+        :meth:`from_statements` first.
+
+        Returns:
+            Dictionary mapping DERIVED_METRICS to arrays with one value per balance sheet.
+        """
+        metrics = sum_totals(self._columns.__getitem__)
+        metrics['net_debt'] = self.net_debt
+        metrics['debt_to_equity'] = metrics['liabilities'] / metrics['equity']
+        return {name: metrics[name] for name in DERIVED_METRICS}
+
+
+class IncomeStatementTable(StatementTable):
+    """Columnar table of :class:`autodcf.company.IncomeStatement`."""
+
+    statement_class = IncomeStatement
+    fields = ('sales',
+              'cogs',
+              'sga',
+              'rd',
+              'depreciation',
+              'amortization',
+              'nonrecurring_cost',
+              'interest',
+              'tax')
+    date_fields = ('start_date', 'end_date')
+
+    @property
+    def da(self):
+        return self._columns['depreciation'] + self._columns['amortization']
+
+
+class CashFlowsTable(StatementTable):
+    """Columnar table of :class:`autodcf.company.CashFlows`."""
+
+    statement_class = CashFlows
+    fields = ('capex',)
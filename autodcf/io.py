@@ -0,0 +1,116 @@
+"""Bulk loading of company fundamentals from flat files.
+
+Files hold one row per company, with one column per arg of :class:`autodcf.company.Company` (fully_diluted_shares
+and price_per_share) and of the statement classes (e.g. cash, sales, capex, end_date). Columns are read straight
+into the arrays of a :class:`autodcf.company.CompanyTable`, so no per-row objects are created while loading.
+
+Parquet files, and CSV files when pyarrow is installed, are read with pyarrow. Otherwise CSV files are read with
+pandas. pyarrow is only imported once a file is read.
+"""
+import numpy as np
+
+from autodcf.company.company_table import CompanyTable
+
+
+def _pyarrow():
+    """Import pyarrow with its CSV and Parquet modules, or get None if pyarrow is not installed."""
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:  # pragma: no cover
+        return None
+    return pyarrow
+
+
+def _columns():
+    """Names of numeric and date columns used by CompanyTable."""
+    numeric = list(CompanyTable.fields)
+    dates = []
+    for _, table_class in CompanyTable.tables:
+        numeric.extend(table_class.fields)
+        dates.extend(table_class.date_fields)
+    return numeric, dates
+
+
+def _from_arrow(table, label):
+    """Build CompanyTable from pyarrow table.
+
+    Arrow columns are released as soon as they are converted, so at most one column is held twice.
+    """
+    import pyarrow
+    numeric, dates = _columns()
+    arrow_columns = dict(zip(table.column_names, table.columns))
+    labels = None if label is None else arrow_columns.pop(label).to_numpy(zero_copy_only=False)
+    del table
+    columns = {}
+    for name in list(arrow_columns):
+        column = arrow_columns.pop(name)
+        if name in numeric:
+            columns[name] = column.cast(pyarrow.float64()).to_numpy()
+        elif name in dates:
+            if pyarrow.types.is_string(column.type) or pyarrow.types.is_large_string(column.type):
+                columns[name] = np.asarray(column.to_numpy(zero_copy_only=False), dtype='datetime64[us]')
+            else:
+                columns[name] = column.cast(pyarrow.timestamp('us')).to_numpy()
+        del column
+    return CompanyTable.from_columns(columns, labels=labels)
+
+
+def read_csv(path, label=None):
+    """Read companies from CSV file.
+
+    Args:
+        path (Union[str, file-like]): Path to (or buffer of) CSV file with header row.
+        label (str, optional): Name of column with company labels (e.g. ticker). Defaults to row position.
+
+    Returns:
+        companies (autodcf.company.CompanyTable): Table of companies.
+    """
+    numeric, dates = _columns()
+    wanted = set(numeric) | set(dates) | ({label} if label else set())
+    pyarrow = _pyarrow()
+    if pyarrow is not None:
+        column_types = {name: pyarrow.float64() for name in numeric}
+        column_types.update({name: pyarrow.timestamp('us') for name in dates})
+        if label is not None:
+            column_types[label] = pyarrow.string()
+        options = pyarrow.csv.ConvertOptions(column_types=column_types)
+        table = pyarrow.csv.read_csv(path, convert_options=options)
+        table = table.select([name for name in table.column_names if name in wanted])
+        return _from_arrow(table, label)
+
+    import pandas as pd
+    dtypes = {name: 'float64' for name in numeric}
+    dtypes.update({name: str for name in dates})
+    if label is not None:
+        dtypes[label] = str
+    frame = pd.read_csv(path, usecols=lambda name: name in wanted, dtype=dtypes)
+    columns = {}
+    for name in frame.columns:
+        if name in dates:
+            columns[name] = pd.to_datetime(frame[name]).to_numpy().astype('datetime64[us]')
+        elif name != label:
+            columns[name] = frame[name].to_numpy()
+    labels = None if label is None else frame[label].to_numpy()
+    return CompanyTable.from_columns(columns, labels=labels)
+
+
+def read_parquet(path, label=None):
+    """Read companies from Parquet file. Requires pyarrow.
+
+    Args:
+        path (str): Path to Parquet file.
+        label (str, optional): Name of column with company labels (e.g. ticker). Defaults to row position.
+
+    Returns:
+        companies (autodcf.company.CompanyTable): Table of companies.
+    """
+    pyarrow = _pyarrow()
+    if pyarrow is None:
+        raise ImportError("Reading Parquet files requires pyarrow. Install it with `pip install pyarrow`.")
+    numeric, dates = _columns()
+    wanted = set(numeric) | set(dates) | ({label} if label else set())
+    schema = pyarrow.parquet.read_schema(path)
+    table = pyarrow.parquet.read_table(path, columns=[name for name in schema.names if name in wanted])
+    return _from_arrow(table, label)
@@ -1,2 +1,11 @@
 from autodcf.models.dcf import DCF  # noqa:F401
 from autodcf.models.simple_dcf import SimpleDCF  # noqa:F401
+from autodcf.models.batch_dcf import BatchDCF  # noqa:F401
+from autodcf.models.monte_carlo import MonteCarloDCF  # noqa:F401
+from autodcf.models.portfolio import PortfolioRunner  # noqa:F401
+from autodcf.models.instrumentation import Instrumentation  # noqa:F401
+from autodcf.models.discount_curve import DiscountCurve  # noqa:F401
+from autodcf.models.reverse_dcf import ReverseDCF  # noqa:F401
+from autodcf.models.scenario_store import ScenarioStore  # noqa:F401
+from autodcf.models.multi_stage_dcf import MultiStageDCF  # noqa:F401
+from autodcf.models.weighted_dcf import WeightedDCF  # noqa:F401
@@ -0,0 +1,258 @@
+"""Array kernel for DCF forecasts.
+
+Forecasts are laid out as float64 arrays of shape (scenarios, window + 2, line items). Row 0 is the most recent
+historical period and row i is the (i - 1)th forecasted period, matching the -1, 0, ..., window index used by
+:meth:`autodcf.models.DCF.forecast`. Columns follow the order of :data:`LINE_ITEMS`.
+"""
+import numpy as np
+
+LINE_ITEMS = ('Sales',
+              'COGS',
+              'Gross Profit',
+              'SG&A',
+              'Operating Profit',
+              'R&D',
+              'EBITDA',
+              'D&A',
+              'EBIT',
+              'Interest',
+              'EBT',
+              'Taxes',
+              'Net Income',
+              'Capex',
+              'Change in NWC',
+              'FCF',
+              'Discounted FCF')
+
+(SALES, COGS, GROSS_PROFIT, SGA, OPERATING_PROFIT, RD, EBITDA, DA, EBIT, INTEREST, EBT, TAXES, NET_INCOME, CAPEX,
+ CHANGE_IN_NWC, FCF, DISCOUNTED_FCF) = range(len(LINE_ITEMS))
+
+
+def as_column(val):
+    """Reshape scalar or one value per scenario into a (scenarios, 1) float array."""
+    return np.reshape(np.asarray(val, dtype=float), (-1, 1))
+
+
+def as_row(val):
+    """Reshape scalar or per-period values for a single scenario into a (1, periods) float array."""
+    return np.reshape(np.asarray(val, dtype=float), (1, -1))
+
+
+def as_rows(val):
+    """Reshape per-scenario or per-scenario-per-period values into a 2-D float array.
+
+    Scalars and 1-D arrays are treated as one value per scenario and broadcast across periods. 2-D arrays are
+    assumed to already be laid out as (scenarios, periods).
+    """
+    arr = np.asarray(val, dtype=float)
+    return arr if arr.ndim == 2 else np.reshape(arr, (-1, 1))
+
+
+def fade(explicit, target, fade_years):
+    """Extend per-period values with a fade period that moves linearly from their last value to target.
+
+    Args:
+        explicit (np.ndarray): Values of the explicit periods with shape (scenarios, periods).
+        target (np.ndarray): Value reached in the last period of the fade with shape (scenarios, 1).
+        fade_years (int): Number of periods in the fade.
+
+    Returns:
+        Numpy array with shape (scenarios, periods + fade_years).
+    """
+    last = explicit[:, -1:]
+    weights = np.arange(1, fade_years + 1) / max(fade_years, 1)
+    return np.concatenate((explicit, last + (target - last) * weights), axis=1)
+
+
+def discount_factors(discount_rate, window, mid_year=False):
+    """Discount factors for periods 0 through window at flat discount rates.
+
+    Args:
+        discount_rate (Union[np.ndarray, float]): Discount rates with shape (scenarios, 1), or a single rate.
+        window (int): Number of periods until terminal year.
+        mid_year (bool, optional): Discount cash flows of periods 1 through window from the middle of the period
+            instead of its end. Defaults to False.
+
+    Returns:
+        Numpy array with shape (scenarios, window + 1), or (window + 1,) for a single rate.
+    """
+    periods = np.arange(window + 1)
+    if mid_year:
+        periods = np.maximum(periods - 0.5, 0)
+    return 1 / (1 + discount_rate) ** periods
+
+
+def calculate_sales(f, sales, sales_growth):
+    """Fill Sales.
+
+    Args:
+        f (np.ndarray): Forecast array to fill in place.
+        sales (np.ndarray): Most recent sales with shape (scenarios, 1).
+        sales_growth (np.ndarray): Sales growth with shape (scenarios, 1) or (scenarios, window + 1).
+    """
+    n, periods = f.shape[:2]
+    f[:, 0, SALES] = sales[:, 0]
+    f[:, 1:, SALES] = sales * np.cumprod(1 + np.broadcast_to(sales_growth, (n, periods - 1)), axis=1)
+
+
+def calculate_operating_lines(f, cogs_to_sales, sga_to_sales, rd_to_sales, da_to_sales, interest_to_sales):
+    """Fill lines from COGS through EBT from Sales."""
+    s = f[:, :, SALES]
+    f[:, :, COGS] = s * cogs_to_sales
+    f[:, :, GROSS_PROFIT] = s - f[:, :, COGS]
+    f[:, :, SGA] = s * sga_to_sales
+    f[:, :, OPERATING_PROFIT] = f[:, :, GROSS_PROFIT] - f[:, :, SGA]
+    f[:, :, RD] = s * rd_to_sales
+    f[:, :, EBITDA] = f[:, :, OPERATING_PROFIT] - f[:, :, RD]
+    f[:, :, DA] = s * da_to_sales
+    f[:, :, EBIT] = f[:, :, EBITDA] - f[:, :, DA]
+    f[:, :, INTEREST] = s * interest_to_sales
+    f[:, :, EBT] = f[:, :, EBIT] - f[:, :, INTEREST]
+
+
+def calculate_taxes(f, tax, tax_rate):
+    """Fill Taxes and Net Income from EBT. Taxes in the historical period are the taxes actually paid."""
+    f[:, :, TAXES] = f[:, :, EBT] * tax_rate
+    f[:, 0, TAXES] = tax[:, 0]
+    f[:, :, NET_INCOME] = f[:, :, EBT] - f[:, :, TAXES]
+
+
+def calculate_cash_flows(f, capex_to_sales, change_in_nwc_to_change_in_sales):
+    """Fill Capex, Change in NWC and FCF."""
+    s = f[:, :, SALES]
+    f[:, :, CAPEX] = s * capex_to_sales
+    # ΔSales * ΔNWC/ΔSales = ΔNWC
+    f[:, 0, CHANGE_IN_NWC] = 0.0
+    f[:, 1:, CHANGE_IN_NWC] = np.diff(s, axis=1) * change_in_nwc_to_change_in_sales
+    f[:, :, FCF] = f[:, :, NET_INCOME] + f[:, :, DA] - f[:, :, CAPEX] - f[:, :, CHANGE_IN_NWC]
+
+
+def discount_cash_flows(f, discount_factors):
+    """Fill Discounted FCF. There is no discounted cash flow for the historical period.
+
+    Args:
+        f (np.ndarray): Forecast array to fill in place.
+        discount_factors (np.ndarray): Discount factors for periods 0 through window with shape (scenarios,
+            window + 1) or (1, window + 1).
+    """
+    f[:, 0, DISCOUNTED_FCF] = np.nan
+    f[:, 1:, DISCOUNTED_FCF] = f[:, 1:, FCF] * discount_factors
+
+
+def forecast_array(sales,
+                   tax,
+                   sales_growth,
+                   discount_factors,
+                   window,
+                   cogs_to_sales,
+                   sga_to_sales,
+                   rd_to_sales,
+                   da_to_sales,
+                   interest_to_sales,
+                   tax_rate,
+                   capex_to_sales,
+                   change_in_nwc_to_change_in_sales,
+                   out=None):
+    """Compute forecasts for every scenario at once.
+
+    Args:
+        sales (np.ndarray): Most recent sales with shape (scenarios, 1).
+        tax (np.ndarray): Most recent taxes paid with shape (scenarios, 1).
+        sales_growth (np.ndarray): Sales growth with shape (scenarios, 1) or (scenarios, window + 1).
+        discount_factors (np.ndarray): Discount factors for periods 0 through window with shape (scenarios,
+            window + 1) or (1, window + 1), e.g. from :func:`discount_factors`.
+        window (int): Number of years until terminal year.
+        cogs_to_sales (np.ndarray): COGS as % of sales with shape (scenarios, 1) or (scenarios, window + 2).
+        sga_to_sales (np.ndarray): SG&A as % of sales, shaped like cogs_to_sales.
+        rd_to_sales (np.ndarray): R&D as % of sales, shaped like cogs_to_sales.
+        da_to_sales (np.ndarray): D&A as % of sales, shaped like cogs_to_sales.
+        interest_to_sales (np.ndarray): Interest as % of sales, shaped like cogs_to_sales.
+        tax_rate (np.ndarray): Tax rate, shaped like cogs_to_sales.
+        capex_to_sales (np.ndarray): Capex as % of sales, shaped like cogs_to_sales.
+        change_in_nwc_to_change_in_sales (np.ndarray): Change in NWC per change in sales with shape
+            (scenarios, 1) or (scenarios, window + 1).
+        out (np.ndarray, optional): Array with shape (scenarios, window + 2, len(LINE_ITEMS)) to write forecast into.
+
+    Returns:
+        Numpy array with shape (scenarios, window + 2, len(LINE_ITEMS)).
+    """
+    if out is None:
+        inputs = (sales, tax, sales_growth, discount_factors, cogs_to_sales, sga_to_sales, rd_to_sales, da_to_sales,
+                  interest_to_sales, tax_rate, capex_to_sales, change_in_nwc_to_change_in_sales)
+        n = np.broadcast(*[arr[:, :1] for arr in inputs]).shape[0]
+        out = np.empty((n, window + 2, len(LINE_ITEMS)))
+    calculate_sales(out, sales, sales_growth)
+    calculate_operating_lines(out, cogs_to_sales, sga_to_sales, rd_to_sales, da_to_sales, interest_to_sales)
+    calculate_taxes(out, tax, tax_rate)
+    calculate_cash_flows(out, capex_to_sales, change_in_nwc_to_change_in_sales)
+    discount_cash_flows(out, discount_factors)
+    return out
+
+
+def cash_flow_gradient(forecast, adjoint, sales_growth, tax_rate, change_in_nwc_to_change_in_sales):
+    """Derivatives of a weighted sum of forecasted free cash flows with respect to per-period assumptions.
+
+    Every forecasted line is linear in sales and in each ratio to sales, so derivatives are exact. Derivatives with
+    respect to sales growth are accumulated backwards through the periods, so every derivative is computed in one
+    pass over the forecast.
+
+    Args:
+        forecast (np.ndarray): Forecast from :func:`forecast_array`.
+        adjoint (np.ndarray): Weight of free cash flow of each forecasted period in the sum (e.g. its discount factor)
+            with shape (scenarios, window + 1).
+        sales_growth (np.ndarray): Sales growth with shape (scenarios, 1) or (scenarios, window + 1).
+        tax_rate (np.ndarray): Tax rate with shape (scenarios, 1) or (scenarios, window + 2).
+        change_in_nwc_to_change_in_sales (np.ndarray): Change in NWC per change in sales with shape (scenarios, 1)
+            or (scenarios, window + 1).
+
+    Returns:
+        Dictionary mapping names of per-period assumptions to derivatives with shape (scenarios, window + 1), one
+        for the value of the assumption in each forecasted period.
+    """
+    f = forecast[:, 1:]
+    n, periods = f.shape[:2]
+    sales = f[:, :, SALES]
+    tax_rate = np.broadcast_to(tax_rate, (n, periods + 1))[:, 1:]
+    nwc = np.broadcast_to(change_in_nwc_to_change_in_sales, (n, periods))
+    after_tax_sales = adjoint * sales * (1 - tax_rate)
+    gradient = {'cogs_to_sales': -after_tax_sales,
+                'sga_to_sales': -after_tax_sales,
+                'rd_to_sales': -after_tax_sales,
+                'da_to_sales': adjoint * sales * tax_rate,
+                'interest_to_sales': -after_tax_sales,
+                'tax_rate': -adjoint * f[:, :, EBT],
+                'capex_to_sales': -adjoint * sales,
+                'change_in_nwc_to_change_in_sales': -adjoint * np.diff(forecast[:, :, SALES], axis=1)}
+    # Sales times the derivative of the sum with respect to sales, period by period. FCF of a period is its margin
+    # times its sales (FCF + Change in NWC) less change in NWC, and the next period's change in NWC subtracts this
+    # period's sales.
+    weighted = adjoint * (f[:, :, FCF] + f[:, :, CHANGE_IN_NWC] - nwc * sales)
+    weighted[:, :-1] += adjoint[:, 1:] * nwc[:, 1:] * sales[:, :-1]
+    # Sales growth of a period scales sales of that period and every later period.
+    growth = np.broadcast_to(sales_growth, (n, periods))
+    gradient['sales_growth'] = np.cumsum(weighted[:, ::-1], axis=1)[:, ::-1] / (1 + growth)
+    return gradient
+
+
+def discounted_window_cash_flow(forecast):
+    """Sum of discounted free cash flows over the window for each scenario."""
+    return forecast[:, 1:, DISCOUNTED_FCF].sum(axis=1)
+
+
+def discounted_terminal_cash_flow(forecast, terminal_discount_rate, terminal_growth_rate, compounding):
+    """Discounted value of cash flows after the window for each scenario.
+
+    Args:
+        forecast (np.ndarray): Forecast from :func:`forecast_array`.
+        terminal_discount_rate (np.ndarray): Discount rate after terminal year with shape (scenarios, 1).
+        terminal_growth_rate (np.ndarray): Perpetual growth rate with shape (scenarios, 1).
+        compounding (Union[np.ndarray, float]): Growth of one unit over the window at the discount rate, i.e.
+            (1 + discount_rate) ** window for a flat rate, with shape (scenarios,) or a single value.
+
+    Returns:
+        Numpy array with shape (scenarios,).
+    """
+    last_fcf = forecast[:, -1, DISCOUNTED_FCF]
+    terminal_discount_minus_growth = (terminal_discount_rate - terminal_growth_rate)[:, 0]
+    tv_discounted_to_window = last_fcf * (1 + terminal_growth_rate[:, 0]) / terminal_discount_minus_growth
+    return tv_discounted_to_window / compounding
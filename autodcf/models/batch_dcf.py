@@ -0,0 +1,276 @@
+from autodcf.models import _kernel
+from autodcf.models._base import AbstractDCF
+from autodcf.models.discount_curve import DiscountCurve
+from autodcf.models.terminal_value import PerpetuityGrowth
+
+
+class BatchDCF(AbstractDCF):
+    """Class for valuing one company under many sets of DCF assumptions at once.
+
+    Takes the same assumptions as :class:`autodcf.models.DCF`, but every assumption other than window may be an
+    array. Scalars apply to every scenario and 1-D arrays hold one value per scenario. For the _to_sales args and
+    tax_rate, 2-D arrays hold one row per scenario with one column for each of the window + 2 periods in the forecast
+    (the most recent historical period followed by the forecasted periods). For sales_growth and
+    change_in_nwc_to_change_in_sales, 2-D arrays have window + 1 columns, one for each forecasted period.
+
+    All scenarios are computed together as NumPy arrays, so valuation outputs are arrays with one value per scenario.
+
+    Args:
+        company (autodcf.company.Company): Company to do DCF analysis for.
+        sales_growth (Union[np.ndarray, float]): Sales growth per scenario or per scenario and period.
+        discount_rate (Union[np.ndarray, float, autodcf.models.DiscountCurve]): Rate at which cash flow should be
+            discounted, or curve of discount rates shared by every scenario.
+        terminal_growth_rate (Union[np.ndarray, float]): Rate at which sales are estimated to grow after returning to
+            normal profit levels.
+        window (int): Number of years until company returns to normal profit margins (terminal year).
+        cogs_to_sales (Union[np.ndarray, float]): COGS as % of sales.
+        sga_to_sales (Union[np.ndarray, float]): SGA as % of sales.
+        rd_to_sales (Union[np.ndarray, float]): R&D as % of sales.
+        da_to_sales (Union[np.ndarray, float]): Depreciation & amortization as % of sales.
+        interest_to_sales (Union[np.ndarray, float]): Interest as % of sales.
+        tax_rate (Union[np.ndarray, float]): Tax rate.
+        capex_to_sales (Union[np.ndarray, float]): Capex as % of sales.
+        change_in_nwc_to_change_in_sales (Union[np.ndarray, float]): Ratio of how much net working capital must
+            change to increase sales by 1 unit.
+        terminal_discount_rate (Union[np.ndarray, float], optional): Rate at which cash flows after the terminal year
+            should be discounted. Defaults to discount_rate (or the last rate of a discount curve).
+        terminal_value (autodcf.models.terminal_value.TerminalValue, optional): Method of valuing cash flows after
+            the terminal year, with parameters given as single values or one value per scenario. Defaults to
+            perpetuity growth.
+        mid_year (bool, optional): Discount cash flows of periods 1 through window from the middle of the period
+            instead of its end. Defaults to the convention of discount_rate if it is a curve, otherwise False.
+    """
+
+    line_items = _kernel.LINE_ITEMS
+
+    def __init__(self,
+                 company,
+                 sales_growth,
+                 discount_rate,
+                 terminal_growth_rate,
+                 window,
+                 cogs_to_sales,
+                 sga_to_sales,
+                 rd_to_sales,
+                 da_to_sales,
+                 interest_to_sales,
+                 tax_rate,
+                 capex_to_sales,
+                 change_in_nwc_to_change_in_sales,
+                 terminal_discount_rate=None,
+                 terminal_value=None,
+                 mid_year=None):
+        if isinstance(discount_rate, DiscountCurve):
+            if mid_year is not None and bool(mid_year) != discount_rate.mid_year:
+                raise ValueError("Mid-year convention {0} differs from that of discount curve {1!r}.".format(
+                    mid_year, discount_rate))
+            mid_year = discount_rate.mid_year
+        self._mid_year = bool(mid_year)
+        self._company = company
+        self._sales_growth = _kernel.as_rows(sales_growth)
+        self._discount_rate = (discount_rate if isinstance(discount_rate, DiscountCurve)
+                               else _kernel.as_column(discount_rate))
+        self._terminal_growth_rate = _kernel.as_column(terminal_growth_rate)
+        self._window = window
+        self._cogs_to_sales = _kernel.as_rows(cogs_to_sales)
+        self._sga_to_sales = _kernel.as_rows(sga_to_sales)
+        self._rd_to_sales = _kernel.as_rows(rd_to_sales)
+        self._da_to_sales = _kernel.as_rows(da_to_sales)
+        self._interest_to_sales = _kernel.as_rows(interest_to_sales)
+        self._tax_rate = _kernel.as_rows(tax_rate)
+        self._capex_to_sales = _kernel.as_rows(capex_to_sales)
+        self._change_in_nwc_to_change_in_sales = _kernel.as_rows(change_in_nwc_to_change_in_sales)
+        if terminal_discount_rate is None:
+            terminal_discount_rate = (discount_rate.terminal_rate if isinstance(discount_rate, DiscountCurve)
+                                      else self._discount_rate)
+        self._terminal_discount_rate = _kernel.as_column(terminal_discount_rate)
+        self._terminal_value = PerpetuityGrowth() if terminal_value is None else terminal_value
+        self._cache = {}
+        self._cache_key = None
+
+    @property
+    def company(self):
+        """Company object to do DCF for."""
+        return self._company
+
+    @property
+    def sales_growth(self):
+        """Numpy array of sales growth for each scenario."""
+        return self._sales_growth
+
+    @property
+    def discount_rate(self):
+        """Numpy array of discount rates for each scenario, or discount curve shared by every scenario."""
+        return self._discount_rate
+
+    @property
+    def mid_year(self):
+        """Whether cash flows of periods 1 through window are discounted from the middle of the period."""
+        return self._mid_year
+
+    @property
+    def terminal_discount_rate(self):
+        """Numpy array of discount rates after terminal year for each scenario."""
+        return self._terminal_discount_rate
+
+    @property
+    def terminal_value(self):
+        """Method of valuing cash flows after terminal year."""
+        return self._terminal_value
+
+    @property
+    def terminal_growth_rate(self):
+        """Numpy array of rates at which sales are expected to grow perpetually for each scenario."""
+        return self._terminal_growth_rate
+
+    @property
+    def window(self):
+        """Periods of normal sales growth until terminal growth rate takes over."""
+        return self._window
+
+    @property
+    def cogs_to_sales(self):
+        """Cost of goods sold as a percentage of sales."""
+        return self._cogs_to_sales
+
+    @property
+    def sga_to_sales(self):
+        """Selling, general, and administrative costs as a percentage of sales."""
+        return self._sga_to_sales
+
+    @property
+    def rd_to_sales(self):
+        """Research and development costs as a percentage of sales."""
+        return self._rd_to_sales
+
+    @property
+    def da_to_sales(self):
+        """Depreciation and amortization as a percentage of sales."""
+        return self._da_to_sales
+
+    @property
+    def interest_to_sales(self):
+        """Interest expense as a percentage of sales."""
+        return self._interest_to_sales
+
+    @property
+    def tax_rate(self):
+        """Effective tax rate for company."""
+        return self._tax_rate
+
+    @property
+    def capex_to_sales(self):
+        """Capital expenditures as a percentage of sales."""
+        return self._capex_to_sales
+
+    @property
+    def change_in_nwc_to_change_in_sales(self):
+        """How much net working capital is expected to need to increase for each dollar increase in sales."""
+        return self._change_in_nwc_to_change_in_sales
+
+    @property
+    def n_scenarios(self):
+        """Number of scenarios being valued."""
+        return self.forecast().shape[0]
+
+    def _cached(self, name, func):
+        """Get result of func from cache, computing it if cache is empty or company values changed."""
+        income_statement = self.company.income_statement
+        key = income_statement.sales, income_statement.tax
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+        try:
+            return self._cache[name]
+        except KeyError:
+            result = self._cache[name] = func()
+            return result
+
+    def forecast(self):
+        """Get forecasts for every scenario.
+
+        Returns:
+            forecast (np.ndarray): Array with shape (scenarios, window + 2, len(line_items)). The second axis runs
+                from the most recent historical period through the terminal year and the third axis follows
+                :attr:`line_items`.
+        """
+        return self._cached('forecast', self._build_forecast)
+
+    def _build_forecast(self):
+        income_statement = self.company.income_statement
+        return _kernel.forecast_array(sales=_kernel.as_column(income_statement.sales),
+                                      tax=_kernel.as_column(income_statement.tax),
+                                      sales_growth=self.sales_growth,
+                                      discount_factors=self._discount_factors(),
+                                      window=self.window,
+                                      cogs_to_sales=self.cogs_to_sales,
+                                      sga_to_sales=self.sga_to_sales,
+                                      rd_to_sales=self.rd_to_sales,
+                                      da_to_sales=self.da_to_sales,
+                                      interest_to_sales=self.interest_to_sales,
+                                      tax_rate=self.tax_rate,
+                                      capex_to_sales=self.capex_to_sales,
+                                      change_in_nwc_to_change_in_sales=self.change_in_nwc_to_change_in_sales)
+
+    def _discount_factors(self):
+        """Discount factors for periods 0 through window with shape (scenarios, window + 1) or (1, window + 1)."""
+        if isinstance(self.discount_rate, DiscountCurve):
+            return self.discount_rate.factors(self.window)[None, :]
+        return _kernel.discount_factors(self.discount_rate, self.window, mid_year=self.mid_year)
+
+    def _compounding(self):
+        """Growth of one unit over the window at the discount rate, for each scenario."""
+        if isinstance(self.discount_rate, DiscountCurve):
+            return self.discount_rate.compounding(self.window)
+        return (1 + self.discount_rate[:, 0]) ** self.window
+
+    @property
+    def discounted_window_cash_flow(self):
+        """Sum of discounted cash flows from window for each scenario."""
+        return self._cached('discounted_window_cash_flow',
+                            lambda: _kernel.discounted_window_cash_flow(self.forecast()))
+
+    @property
+    def discounted_terminal_cash_flow(self):
+        """Discounted cash flows after window for each scenario."""
+        return self._cached('discounted_terminal_cash_flow',
+                            lambda: self.terminal_value.discounted_value(self.forecast(),
+                                                                         self.terminal_discount_rate[:, 0],
+                                                                         self.terminal_growth_rate[:, 0],
+                                                                         self._compounding()))
+
+    @property
+    def enterprise_value(self):
+        """Enterprise value for each scenario."""
+        return self.discounted_window_cash_flow + self.discounted_terminal_cash_flow
+
+    @property
+    def equity_value(self):
+        """Total equity value of firm for each scenario."""
+        return self.enterprise_value - self.company.balance_sheet.net_debt
+
+    @property
+    def equity_value_per_share(self):
+        """Equity value divided by total number of shares outstanding for each scenario."""
+        return self.equity_value / self.company.fully_diluted_shares
+
+    @property
+    def absolute_upside_per_share(self):
+        return self.equity_value_per_share - self.company.price_per_share
+
+    @property
+    def percent_upside_per_share(self):
+        return self.absolute_upside_per_share / self.company.price_per_share
+
+    def valuation(self):
+        """Get valuation outputs for every scenario.
+
+        Returns:
+            Dictionary mapping enterprise_value, equity_value and equity_value_per_share to numpy arrays with one
+            value per scenario.
+        """
+        enterprise_value = self.enterprise_value
+        equity_value = enterprise_value - self.company.balance_sheet.net_debt
+        return {'enterprise_value': enterprise_value,
+                'equity_value': equity_value,
+                'equity_value_per_share': equity_value / self.company.fully_diluted_shares}
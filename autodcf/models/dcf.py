@@ -1,9 +1,73 @@
 import numpy as np
-import pandas as pd
 
+from autodcf.models import _kernel, instrumentation
 from autodcf.models._base import AbstractDCF
+from autodcf.models._kernel import LINE_ITEMS
+from autodcf.models.batch_dcf import BatchDCF
+from autodcf.models.discount_curve import DiscountCurve
+from autodcf.models.terminal_value import PerpetuityGrowth
 from datetime import datetime
 
+PER_PERIOD_ASSUMPTIONS = ('sales_growth',
+                          'cogs_to_sales',
+                          'sga_to_sales',
+                          'rd_to_sales',
+                          'da_to_sales',
+                          'interest_to_sales',
+                          'tax_rate',
+                          'capex_to_sales',
+                          'change_in_nwc_to_change_in_sales')
+
+# Forecast stages in the order they run. Each stage only reads lines filled by itself or earlier stages.
+STAGES = ('_calculate_sales',
+          '_calculate_operating_lines',
+          '_calculate_taxes',
+          '_calculate_cash_flows',
+          '_discount_cash_flows')
+
+# First forecast stage that reads each assumption. Changing an assumption recomputes that stage and every stage after
+# it. Assumptions mapped to None are only read by the terminal value.
+FIRST_STAGE = {'sales_growth': '_calculate_sales',
+               'cogs_to_sales': '_calculate_operating_lines',
+               'sga_to_sales': '_calculate_operating_lines',
+               'rd_to_sales': '_calculate_operating_lines',
+               'da_to_sales': '_calculate_operating_lines',
+               'interest_to_sales': '_calculate_operating_lines',
+               'tax_rate': '_calculate_taxes',
+               'capex_to_sales': '_calculate_cash_flows',
+               'change_in_nwc_to_change_in_sales': '_calculate_cash_flows',
+               'discount_rate': '_discount_cash_flows',
+               'terminal_discount_rate': None,
+               'terminal_growth_rate': None,
+               'terminal_value': None}
+
+# Terminal value of DCFs that are not given another method.
+PERPETUITY_GROWTH = PerpetuityGrowth()
+
+VALUATIONS = ('enterprise_value',
+              'equity_value',
+              'equity_value_per_share',
+              'absolute_upside_per_share',
+              'percent_upside_per_share')
+
+
+def _valuation_from_enterprise_value(company, enterprise_value, value):
+    """Convert enterprise value (scalar or array) into the valuation named by value."""
+    if value not in VALUATIONS:
+        raise ValueError("Value must be one of {0}. Given {1}.".format(VALUATIONS, value))
+    if value == 'enterprise_value':
+        return enterprise_value
+    equity_value = enterprise_value - company.balance_sheet.net_debt
+    if value == 'equity_value':
+        return equity_value
+    equity_value_per_share = equity_value / company.fully_diluted_shares
+    if value == 'equity_value_per_share':
+        return equity_value_per_share
+    absolute_upside_per_share = equity_value_per_share - company.price_per_share
+    if value == 'absolute_upside_per_share':
+        return absolute_upside_per_share
+    return absolute_upside_per_share / company.price_per_share
+
 
 class DCF(AbstractDCF):
     """Class for flexible DCF.
@@ -18,7 +82,8 @@ class DCF(AbstractDCF):
         sales_growth (Union[Iterable, float]): Iterable of sales growth numbers to iterate over or constant growth rate.
             Values are in order, so first value in iterable applies to next sales period and
             last value applies to last sales period in DCF. Note, if you want to have 5% sales growth, use 0.05.
-        discount_rate (float): Rate at which cash flow should be discounted.
+        discount_rate (Union[float, autodcf.models.DiscountCurve]): Rate at which cash flow should be discounted, or
+            curve of discount rates (e.g. per-year rates or mid-year convention).
         terminal_growth_rate (float): Rate at which sales are estimated to grow after returning to normal profit levels.
         window (int): Number of years until company returns to normal profit margins (terminal year).
         cogs_to_sales (Union[Iterable, float]): COGS as % of sales.
@@ -31,6 +96,17 @@ class DCF(AbstractDCF):
         capex_to_sales (Union[Iterable, float]): Capex as % of sales.
         change_in_nwc_to_change_in_sales (float): Ratio of how much net working capital must change to increase sales by
             1 unit.
+        terminal_discount_rate (float, optional): Rate at which cash flows after the terminal year should be
+            discounted. Defaults to discount_rate (or the last rate of a discount curve).
+        terminal_value (autodcf.models.terminal_value.TerminalValue, optional): Method of valuing cash flows after
+            the terminal year, e.g. :class:`autodcf.models.terminal_value.ExitMultiple`. Defaults to perpetuity
+            growth.
+
+    Note:
+        The forecast and the valuation built on it are computed once and cached. Setting an assumption, or changing
+        the sales or tax of the company's income statement, only recomputes the parts of the forecast that depend on
+        it. For example, setting discount_rate only recomputes discounted cash flows and terminal value, and setting
+        terminal_growth_rate only recomputes terminal value.
     """
 
     def __init__(self,
@@ -47,7 +123,8 @@ class DCF(AbstractDCF):
                  tax_rate,
                  capex_to_sales,
                  change_in_nwc_to_change_in_sales,
-                 terminal_discount_rate=None):
+                 terminal_discount_rate=None,
+                 terminal_value=None):
         self._company = company
         self._sales_growth = sales_growth
         self._discount_rate = discount_rate
@@ -61,142 +138,318 @@ class DCF(AbstractDCF):
         self._tax_rate = tax_rate
         self._capex_to_sales = capex_to_sales
         self._change_in_nwc_to_change_in_sales = change_in_nwc_to_change_in_sales
-        self._forecast = pd.DataFrame(index=np.arange(-1, self.window + 1))
-        self._terminal_discount_rate = discount_rate if terminal_discount_rate is None else terminal_discount_rate
+        self._terminal_discount_rate = terminal_discount_rate
+        self._terminal_value = terminal_value
+        self._instrumentation = None
+        self._invalidate()
 
     @property
     def company(self):
         """Company object to do DCF for."""
         return self._company
 
+    @company.setter
+    def company(self, val):
+        self._company = val
+        self._invalidate()
+
     @property
     def sales_growth(self):
         """Numpy array of sales growth for each year until end of window."""
         return self._sales_growth
 
+    @sales_growth.setter
+    def sales_growth(self, val):
+        self._sales_growth = val
+        self._invalidate('sales_growth')
+
     @property
     def discount_rate(self):
         """Discount rate to discount cash flow at."""
         return self._discount_rate
 
+    @discount_rate.setter
+    def discount_rate(self, val):
+        self._discount_rate = val
+        self._invalidate('discount_rate')
+
+    @property
+    def discount_curve(self):
+        """:class:`autodcf.models.DiscountCurve` of discount rate. Flat curves are shared by DCFs with the same rate."""
+        if isinstance(self.discount_rate, DiscountCurve):
+            return self.discount_rate
+        return DiscountCurve.flat(self.discount_rate)
+
     @property
     def terminal_discount_rate(self):
-        """Discount rate after terminal year."""
+        """Discount rate after terminal year. Defaults to the discount rate (or last rate of a discount curve)."""
+        if self._terminal_discount_rate is None:
+            if isinstance(self.discount_rate, DiscountCurve):
+                return self.discount_rate.terminal_rate
+            return self.discount_rate
         return self._terminal_discount_rate
 
+    @terminal_discount_rate.setter
+    def terminal_discount_rate(self, val):
+        self._terminal_discount_rate = val
+        self._invalidate('terminal_discount_rate')
+
+    @property
+    def terminal_value(self):
+        """Method of valuing cash flows after terminal year. Defaults to perpetuity growth."""
+        return PERPETUITY_GROWTH if self._terminal_value is None else self._terminal_value
+
+    @terminal_value.setter
+    def terminal_value(self, val):
+        self._terminal_value = val
+        self._invalidate('terminal_value')
+
     @property
     def terminal_growth_rate(self):
         """Rate at which sales are expected to grow perpetually."""
         return self._terminal_growth_rate
 
+    @terminal_growth_rate.setter
+    def terminal_growth_rate(self, val):
+        self._terminal_growth_rate = val
+        self._invalidate('terminal_growth_rate')
+
     @property
     def window(self):
         """Periods of normal sales growth until terminal growth rate takes over."""
         return self._window
 
+    @window.setter
+    def window(self, val):
+        self._window = val
+        self._invalidate()
+
     @property
     def cogs_to_sales(self):
         """Cost of goods sold as a percentage of sales."""
         return self._cogs_to_sales
 
+    @cogs_to_sales.setter
+    def cogs_to_sales(self, val):
+        self._cogs_to_sales = val
+        self._invalidate('cogs_to_sales')
+
     @property
     def sga_to_sales(self):
         """Selling, general, and administrative costs as a percentage of sales."""
         return self._sga_to_sales
 
+    @sga_to_sales.setter
+    def sga_to_sales(self, val):
+        self._sga_to_sales = val
+        self._invalidate('sga_to_sales')
+
     @property
     def rd_to_sales(self):
         """Research and development costs as a percentage of sales."""
         return self._rd_to_sales
 
+    @rd_to_sales.setter
+    def rd_to_sales(self, val):
+        self._rd_to_sales = val
+        self._invalidate('rd_to_sales')
+
     @property
     def da_to_sales(self):
         """Depreciation and amortization as a percentage of sales."""
         return self._da_to_sales
 
+    @da_to_sales.setter
+    def da_to_sales(self, val):
+        self._da_to_sales = val
+        self._invalidate('da_to_sales')
+
     @property
     def interest_to_sales(self):
         """Interest expense as a percentage of sales."""
         return self._interest_to_sales
 
+    @interest_to_sales.setter
+    def interest_to_sales(self, val):
+        self._interest_to_sales = val
+        self._invalidate('interest_to_sales')
+
     @property
     def tax_rate(self):
         """Effective tax rate for company."""
         return self._tax_rate
 
+    @tax_rate.setter
+    def tax_rate(self, val):
+        self._tax_rate = val
+        self._invalidate('tax_rate')
+
     @property
     def capex_to_sales(self):
         """Capital expenditures as a percentage of sales."""
         return self._capex_to_sales
 
+    @capex_to_sales.setter
+    def capex_to_sales(self, val):
+        self._capex_to_sales = val
+        self._invalidate('capex_to_sales')
+
     @property
     def change_in_nwc_to_change_in_sales(self):
         """How much net working capital is expected to need to increase for each dollar increase in sales."""
         return self._change_in_nwc_to_change_in_sales
 
-    def _calculate_sales(self):
-        """Calculate sales for window of growth.
+    @change_in_nwc_to_change_in_sales.setter
+    def change_in_nwc_to_change_in_sales(self, val):
+        self._change_in_nwc_to_change_in_sales = val
+        self._invalidate('change_in_nwc_to_change_in_sales')
 
-        Returns:
-            Numpy array with sales from each period in order.
+    @property
+    def instrumentation(self):
+        """:class:`autodcf.models.Instrumentation` recording stage timings of this DCF, or None (the default).
+
+        If None, stages are recorded by the innermost active instrumentation of the thread (if any).
         """
-        sales_growth = np.repeat(self.sales_growth, self.window + 1) if isinstance(self.sales_growth,
-                                                                                   float) else self.sales_growth
-        initial_sales = self.company.income_statement.sales
-        return np.concatenate(([initial_sales], initial_sales * np.cumprod(1 + sales_growth)))
+        return self._instrumentation
 
-    def _multiply_by_sales_percent(self, percent_of_sales):
-        """Find values for stat in all periods given percent of sales stat accounts for.
+    @instrumentation.setter
+    def instrumentation(self, val):
+        self._instrumentation = val
 
-        Returns:
-            Pandas series with statistic multiplied by forecast Sales values.
-        """
-        return self._forecast['Sales'] * percent_of_sales
+    def _recorder(self):
+        """Instrumentation to record stages in, or None if instrumentation is off."""
+        if self._instrumentation is not None:
+            return self._instrumentation
+        return instrumentation.current() if instrumentation.enabled else None
+
+    def _invalidate(self, assumption=None):
+        """Drop cached results that depend on assumption.
 
-    def _calculate_free_cash_flow(self):
-        """Calculate free cash flow for each period.
+        Args:
+            assumption (str, optional): Name of assumption that changed. If None, drop all cached results.
+        """
+        if assumption is None:
+            self._forecast_buffer = None
+            self._valid_stages = 0
+            self._cache = {}
+            self._company_values = None
+            return
+        self._cache.pop('discounted_terminal_cash_flow', None)
+        self._cache.pop('gradient', None)
+        stage = FIRST_STAGE[assumption]
+        if stage is not None:
+            self._invalidate_from(stage)
+
+    def _invalidate_from(self, stage):
+        """Mark stage and every stage after it as needing to be recomputed."""
+        self._valid_stages = min(self._valid_stages, STAGES.index(stage))
+        for name in ('forecast', 'discounted_window_cash_flow', 'discounted_terminal_cash_flow', 'gradient'):
+            self._cache.pop(name, None)
+
+    def _check_company(self):
+        """Invalidate stages that read company values if those values have changed since last check."""
+        income_statement = self.company.income_statement
+        values = income_statement.sales, income_statement.tax
+        if values != self._company_values:
+            if self._company_values is None or values[0] != self._company_values[0]:
+                self._invalidate_from('_calculate_sales')
+            else:
+                self._invalidate_from('_calculate_taxes')
+            self._company_values = values
+
+    def _cached(self, name, func):
+        """Get result of func from cache, computing it if it is not cached.
+
+        Args:
+            name (str): Name of cached result.
+            func (Callable): Function with no arguments that computes result.
 
         Returns:
-            Pandas Series with free cash flow for each period in forecast.
+            Result of func.
         """
-        return self._forecast['Net Income'] + self._forecast['D&A'] - self._forecast['Capex'] - self._forecast[
-            'Change in NWC']
+        self._check_company()
+        try:
+            return self._cache[name]
+        except KeyError:
+            recorder = self._recorder()
+            if recorder is None:
+                result = self._cache[name] = func()
+            else:
+                with recorder.timer(func.__name__):
+                    result = self._cache[name] = func()
+            return result
+
+    def _calculate_sales(self, f):
+        _kernel.calculate_sales(f,
+                                sales=_kernel.as_column(self.company.income_statement.sales),
+                                sales_growth=_kernel.as_row(self.sales_growth))
+
+    def _calculate_operating_lines(self, f):
+        _kernel.calculate_operating_lines(f,
+                                          cogs_to_sales=_kernel.as_row(self.cogs_to_sales),
+                                          sga_to_sales=_kernel.as_row(self.sga_to_sales),
+                                          rd_to_sales=_kernel.as_row(self.rd_to_sales),
+                                          da_to_sales=_kernel.as_row(self.da_to_sales),
+                                          interest_to_sales=_kernel.as_row(self.interest_to_sales))
+
+    def _calculate_taxes(self, f):
+        _kernel.calculate_taxes(f,
+                                tax=_kernel.as_column(self.company.income_statement.tax),
+                                tax_rate=_kernel.as_row(self.tax_rate))
+
+    def _calculate_cash_flows(self, f):
+        _kernel.calculate_cash_flows(f,
+                                     capex_to_sales=_kernel.as_row(self.capex_to_sales),
+                                     change_in_nwc_to_change_in_sales=_kernel.as_row(
+                                         self.change_in_nwc_to_change_in_sales))
+
+    def _discount_cash_flows(self, f):
+        _kernel.discount_cash_flows(f, discount_factors=self.discount_curve.factors(self.window))
+
+    def forecast_array(self):
+        """Get forecast as a float64 numpy array.
+
+        Only the stages of the forecast that depend on assumptions changed since the last call are recomputed.
+        The returned array is read-only and is updated in place when the forecast is recomputed, so copy it to keep
+        a snapshot.
 
-    def _discount_cash_flows(self):
-        """Discount cash flows at given discount rate."""
-        discount_factors = np.array([1 / (1 + self.discount_rate) ** i for i in range(self.window + 1)])
-        return self._forecast.loc[0:, 'FCF'] * discount_factors
+        Returns:
+            forecast (np.ndarray): Array with shape (window + 2, len(LINE_ITEMS)). Rows run from the most recent
+                historical period through the terminal year and columns follow LINE_ITEMS.
+        """
+        self._check_company()
+        if self._forecast_buffer is None:
+            self._forecast_buffer = np.empty((1, self.window + 2, len(LINE_ITEMS)))
+        recorder = self._recorder() if self._valid_stages < len(STAGES) else None
+        for i in range(self._valid_stages, len(STAGES)):
+            if recorder is None:
+                getattr(self, STAGES[i])(self._forecast_buffer)
+            else:
+                with recorder.timer(STAGES[i]):
+                    getattr(self, STAGES[i])(self._forecast_buffer)
+            self._valid_stages = i + 1
+        forecast = self._forecast_buffer[0]
+        forecast.flags.writeable = False
+        return forecast
 
     def forecast(self):
         """Get pandas dataframe with all info needed to complete forecast.
 
+        The dataframe is built once until inputs change, and each call returns a copy of it, so changing the
+        returned dataframe does not change later results.
+
         Returns:
             forecast (pd.DataFrame): Pandas data frame with forecasted future income statements and discounted
                 free cash flows.
         """
-        self._forecast['Year'] = np.arange(datetime.now().year - 1, datetime.now().year + self.window + 1)
-        self._forecast['Sales'] = self._calculate_sales()
-        self._forecast['COGS'] = self._multiply_by_sales_percent(self.cogs_to_sales)
-        self._forecast['Gross Profit'] = self._forecast['Sales'] - self._forecast['COGS']
-        self._forecast['SG&A'] = self._multiply_by_sales_percent(self.sga_to_sales)
-        self._forecast['Operating Profit'] = self._forecast['Gross Profit'] - self._forecast['SG&A']
-        self._forecast['R&D'] = self._multiply_by_sales_percent(self.rd_to_sales)
-        self._forecast['EBITDA'] = self._forecast['Operating Profit'] - self._forecast['R&D']
-        self._forecast['D&A'] = self._multiply_by_sales_percent(self.da_to_sales)
-        self._forecast['EBIT'] = self._forecast['EBITDA'] - self._forecast['D&A']  # noqa:E501
-        self._forecast['Interest'] = self._multiply_by_sales_percent(self.interest_to_sales)
-        self._forecast['EBT'] = self._forecast['EBIT'] - self._forecast['Interest']
-        self._forecast['Taxes'] = self._forecast['EBT'] * self.tax_rate
-        self._forecast.loc[-1, 'Taxes'] = self.company.income_statement.tax
-        self._forecast['Net Income'] = self._forecast['EBT'] - self._forecast['Taxes']
-        self._forecast['Capex'] = self._multiply_by_sales_percent(self.capex_to_sales)
-        # ΔSales * ΔNWC/ΔSales = ΔNWC
-        change_in_sales = np.diff(self._forecast['Sales'])
-        future_changes_nwc = change_in_sales * self.change_in_nwc_to_change_in_sales
-        self._forecast['Change in NWC'] = np.concatenate(([0.0], future_changes_nwc))
-        self._forecast['FCF'] = self._calculate_free_cash_flow()
-        self._forecast['Discounted FCF'] = self._discount_cash_flows()
-        return self._forecast
+        return self._cached('forecast', self._build_forecast).copy()
+
+    def _build_forecast(self):
+        """Build forecast dataframe from forecast array."""
+        import pandas as pd
+        forecast = pd.DataFrame(self.forecast_array().copy(), index=np.arange(-1, self.window + 1), columns=LINE_ITEMS)
+        forecast.insert(0, 'Year', np.arange(datetime.now().year - 1, datetime.now().year + self.window + 1))
+        return forecast
 
     @property
     def enterprise_value(self):
@@ -216,17 +469,21 @@ class DCF(AbstractDCF):
     @property
     def discounted_terminal_cash_flow(self):
         """Sum of discounted cash flows after window."""
-        f = self.forecast()
-        last_fcf = f.loc[self.window, 'Discounted FCF']
-        terminal_discount_minus_growth = (self.terminal_discount_rate - self.terminal_growth_rate)
-        tv_discounted_to_window = last_fcf * (1 + self.terminal_growth_rate) / terminal_discount_minus_growth
-        return tv_discounted_to_window / (1 + self.discount_rate) ** self.window
+        return self._cached('discounted_terminal_cash_flow', self._calculate_discounted_terminal_cash_flow)
+
+    def _calculate_discounted_terminal_cash_flow(self):
+        return self.terminal_value.discounted_value(self.forecast_array(),
+                                                    self.terminal_discount_rate,
+                                                    self.terminal_growth_rate,
+                                                    self.discount_curve.compounding(self.window))
 
     @property
     def discounted_window_cash_flow(self):
         """Add up discounted cash flows from window."""
-        f = self.forecast()
-        return f.loc[0:, 'Discounted FCF'].sum()
+        return self._cached('discounted_window_cash_flow', self._calculate_discounted_window_cash_flow)
+
+    def _calculate_discounted_window_cash_flow(self):
+        return self.forecast_array()[1:, _kernel.DISCOUNTED_FCF].sum()
 
     @property
     def absolute_upside_per_share(self):
@@ -235,3 +492,179 @@ class DCF(AbstractDCF):
     @property
     def percent_upside_per_share(self):
         return self.absolute_upside_per_share / self.company.price_per_share
+
+    def gradient(self, value='enterprise_value'):
+        """Get derivatives of valuation with respect to every assumption.
+
+        Derivatives are exact and computed in closed form in one backward pass over the cached forecast, so the cost
+        does not grow with the number of assumptions. The gradient is cached with the forecast, so getting it for
+        several valuations (e.g. enterprise_value and equity_value_per_share) computes it once.
+
+        Args:
+            value (str, optional): Valuation to differentiate. One of enterprise_value, equity_value,
+                equity_value_per_share, absolute_upside_per_share and percent_upside_per_share. Defaults to
+                enterprise_value.
+
+        Returns:
+            Dictionary mapping assumption names to derivatives. Per-period assumptions (e.g. sales_growth) map to
+            arrays with one derivative for the value in each forecasted period, years 0 through window. The
+            derivative with respect to an assumption held constant across periods is their sum. discount_rate maps
+            to a float, or to an array with one derivative per rate for discount curves with one rate per period,
+            and includes the effect through the terminal discount rate unless terminal_discount_rate is set.
+            terminal_discount_rate and terminal_growth_rate map to floats.
+        """
+        if value not in VALUATIONS:
+            raise ValueError("Value must be one of {0}. Given {1}.".format(VALUATIONS, value))
+        if not isinstance(self.terminal_value, PerpetuityGrowth):
+            raise ValueError("Gradient is only available for perpetuity growth terminal value. Given {0}.".format(
+                self.terminal_value))
+        gradient = self._cached('gradient', self._calculate_gradient)
+        if value in ('enterprise_value', 'equity_value'):
+            scale = 1.0
+        elif value == 'percent_upside_per_share':
+            scale = 1 / (self.company.fully_diluted_shares * self.company.price_per_share)
+        else:
+            scale = 1 / self.company.fully_diluted_shares
+        return {name: derivative * scale for name, derivative in gradient.items()}
+
+    def _calculate_gradient(self):
+        """Derivatives of enterprise value with respect to every assumption."""
+        forecast = self.forecast_array()
+        curve = self.discount_curve
+        compounding = curve.compounding(self.window)
+        terminal_discount_minus_growth = self.terminal_discount_rate - self.terminal_growth_rate
+        # Enterprise value weighs free cash flow of each period by its discount factor. The last period is also
+        # weighed by the terminal value, which is proportional to it.
+        adjoint = np.array(curve.factors(self.window))
+        adjoint[-1] *= 1 + (1 + self.terminal_growth_rate) / (terminal_discount_minus_growth * compounding)
+        gradient = {name: derivative[0] for name, derivative in _kernel.cash_flow_gradient(
+            forecast[None],
+            adjoint[None],
+            sales_growth=_kernel.as_row(self.sales_growth),
+            tax_rate=_kernel.as_row(self.tax_rate),
+            change_in_nwc_to_change_in_sales=_kernel.as_row(self.change_in_nwc_to_change_in_sales)).items()}
+        discounted = forecast[1:, _kernel.DISCOUNTED_FCF]
+        terminal = self.discounted_terminal_cash_flow
+        gradient['terminal_growth_rate'] = (discounted[-1] * (1 + self.terminal_discount_rate)
+                                            / (terminal_discount_minus_growth ** 2 * compounding))  # noqa: W503
+        gradient['terminal_discount_rate'] = -terminal / terminal_discount_minus_growth
+        gradient['discount_rate'] = self._discount_rate_gradient(discounted,
+                                                                 terminal,
+                                                                 gradient['terminal_discount_rate'])
+        return gradient
+
+    def _discount_rate_gradient(self, discounted, terminal, terminal_discount_rate_gradient):
+        """Derivatives of enterprise value with respect to the discount rate, or to each rate of a discount curve.
+
+        The rate of period k divides the discount factor of period k and every later period, and divides terminal
+        value twice (once through the discounted last cash flow and once through compounding). Under the mid-year
+        convention, period k's own discount factor is multiplied back by the square root of 1 plus its rate.
+        """
+        curve = self.discount_curve
+        window = self.window
+        rates = np.broadcast_to(curve.rates, (window,)) if curve.is_flat else curve.rates[:window]
+        later_discounted = np.cumsum(discounted[::-1])[::-1][1:]
+        gradient = -(later_discounted + 2 * terminal)
+        if curve.mid_year:
+            gradient += 0.5 * discounted[1:]
+            gradient[-1] += 0.5 * terminal
+        gradient /= 1 + rates
+        follows = self._terminal_discount_rate is None
+        if curve.is_flat:
+            return gradient.sum() + (terminal_discount_rate_gradient if follows else 0.0)
+        curve_gradient = np.zeros(len(curve.rates))
+        curve_gradient[:window] = gradient
+        if follows:
+            curve_gradient[-1] += terminal_discount_rate_gradient
+        return curve_gradient
+
+    def batch_assumptions(self):
+        """Get assumptions of DCF as keyword arguments for :class:`autodcf.models.BatchDCF` with one scenario.
+
+        Per-period assumptions are laid out as single rows so they apply to every scenario when other assumptions
+        are replaced by arrays of values.
+
+        Returns:
+            Dictionary mapping BatchDCF argument names to values.
+        """
+        assumptions = {name: _kernel.as_row(getattr(self, name)) for name in PER_PERIOD_ASSUMPTIONS}
+        assumptions['discount_rate'] = self.discount_rate
+        assumptions['terminal_growth_rate'] = self.terminal_growth_rate
+        # None keeps the terminal discount rate following the discount rate when that is varied.
+        assumptions['terminal_discount_rate'] = self._terminal_discount_rate
+        assumptions['terminal_value'] = self._terminal_value
+        assumptions['window'] = self.window
+        # Kept when the discount curve is replaced by arrays of rates.
+        assumptions['mid_year'] = self.discount_curve.mid_year
+        return assumptions
+
+    def sensitivity_table(self,
+                          row_values,
+                          column_values,
+                          row='discount_rate',
+                          column='terminal_growth_rate',
+                          value='equity_value_per_share'):
+        """Get two-way sensitivity table of valuation to a pair of assumptions.
+
+        All other assumptions are held at their current values. Varying discount rate against terminal growth rate
+        with a perpetuity growth terminal value reuses the cached free cash flows and evaluates discounting and
+        terminal value in closed form across the grid. Any other pair of assumptions (e.g. cogs_to_sales against
+        sales_growth) is valued with a single :class:`autodcf.models.BatchDCF` over the grid.
+
+        Args:
+            row_values (Iterable): Values of row assumption.
+            column_values (Iterable): Values of column assumption.
+            row (str, optional): Name of assumption to vary across rows. Defaults to discount_rate.
+            column (str, optional): Name of assumption to vary across columns. Defaults to terminal_growth_rate.
+            value (str, optional): Valuation to tabulate. One of enterprise_value, equity_value,
+                equity_value_per_share, absolute_upside_per_share and percent_upside_per_share. Defaults to
+                equity_value_per_share.
+
+        Returns:
+            table (pd.DataFrame): Valuations with row_values as index (named row) and column_values as columns
+                (named column).
+        """
+        row_values = np.asarray(row_values, dtype=float)
+        column_values = np.asarray(column_values, dtype=float)
+        if row == column:
+            raise ValueError("Row and column must be different assumptions. Given {0} for both.".format(row))
+        pair = {row, column}
+        if pair == {'discount_rate', 'terminal_growth_rate'} and isinstance(self.terminal_value, PerpetuityGrowth):
+            rates, growths = (row_values, column_values) if row == 'discount_rate' else (column_values, row_values)
+            enterprise_value = self._rate_growth_grid(rates, growths)
+            if row != 'discount_rate':
+                enterprise_value = enterprise_value.T
+        else:
+            assumptions = self.batch_assumptions()
+            fixed = {'window', 'terminal_value', 'mid_year'}
+            if pair & fixed or not pair <= set(assumptions):
+                raise ValueError("Cannot vary {0} in sensitivity table.".format(
+                    sorted(pair - set(assumptions)) or sorted(pair & fixed)))
+            grid_rows, grid_columns = np.meshgrid(row_values, column_values, indexing='ij')
+            assumptions[row] = grid_rows.ravel()
+            assumptions[column] = grid_columns.ravel()
+            batch = BatchDCF(company=self.company, **assumptions)
+            enterprise_value = batch.enterprise_value.reshape(grid_rows.shape)
+        table = _valuation_from_enterprise_value(self.company, enterprise_value, value)
+        import pandas as pd
+        return pd.DataFrame(table,
+                            index=pd.Index(row_values, name=row),
+                            columns=pd.Index(column_values, name=column))
+
+    def _rate_growth_grid(self, rates, growths):
+        """Enterprise value over grid of discount rates (rows) and terminal growth rates (columns).
+
+        Free cash flows do not depend on either assumption, so only discounting and terminal value are computed,
+        broadcast across the grid.
+        """
+        fcf = self.forecast_array()[1:, _kernel.FCF]
+        discount_factors = _kernel.discount_factors(rates[:, None],
+                                                    self.window,
+                                                    mid_year=self.discount_curve.mid_year)
+        window_cash_flow = (fcf * discount_factors).sum(axis=1)
+        last_fcf = fcf[-1] * discount_factors[:, -1]
+        terminal_discount_rate = rates if self._terminal_discount_rate is None else self._terminal_discount_rate
+        terminal_discount_minus_growth = np.subtract.outer(terminal_discount_rate * np.ones_like(rates), growths)
+        tv_discounted_to_window = last_fcf[:, None] * (1 + growths) / terminal_discount_minus_growth
+        terminal_cash_flow = tv_discounted_to_window / ((1 + rates) ** self.window)[:, None]
+        return window_cash_flow[:, None] + terminal_cash_flow
@@ -0,0 +1,122 @@
+from functools import lru_cache
+
+import numpy as np
+
+from autodcf.models import _kernel
+
+
+class DiscountCurve:
+    """Discount rates over the forecast window, with memoized discount factors.
+
+    A curve is either flat (one rate for every period) or a vector with one rate per forecasted period, in which case
+    the discount factor of period t compounds the rates of periods 1 through t. Period 0 is never discounted.
+
+    Discount factors are computed once per window and shared by every DCF given the same curve. DCFs given a plain
+    discount rate use :meth:`flat`, which returns the same curve object for the same rate, so many DCFs in a batch
+    with the same discount rate share their discount factors too.
+
+    Args:
+        rates (Union[float, Iterable]): Flat discount rate, or discount rates of periods 1 through window (or beyond).
+        mid_year (bool, optional): Discount cash flows of periods 1 through window from the middle of the period
+            instead of its end. Terminal value is still discounted from the end of the window. Defaults to False.
+    """
+
+    def __init__(self, rates, mid_year=False):
+        rates = np.array(rates, dtype=float)
+        if rates.ndim > 1:
+            raise ValueError("Rates must be a single rate or one rate per period. Given shape {0}.".format(
+                rates.shape))
+        rates.flags.writeable = False
+        self._rates = rates
+        self._mid_year = bool(mid_year)
+        self._factors = {}
+        self._compounding = {}
+
+    @classmethod
+    def flat(cls, rate, mid_year=False):
+        """Get shared flat curve for rate.
+
+        Args:
+            rate (float): Discount rate.
+            mid_year (bool, optional): Use mid-year convention. Defaults to False.
+
+        Returns:
+            curve (DiscountCurve): The same curve object for the same rate and convention.
+        """
+        return _flat_curve(float(rate), bool(mid_year))
+
+    @property
+    def rates(self):
+        """Read-only numpy array of rates. 0-d for flat curves."""
+        return self._rates
+
+    @property
+    def mid_year(self):
+        """Whether cash flows are discounted from the middle of each period."""
+        return self._mid_year
+
+    @property
+    def is_flat(self):
+        return self._rates.ndim == 0
+
+    @property
+    def terminal_rate(self):
+        """Rate of the last period, used after the terminal year unless a terminal discount rate is given."""
+        return float(self._rates) if self.is_flat else float(self._rates[-1])
+
+    def _check_window(self, window):
+        if not self.is_flat and len(self._rates) < window:
+            raise ValueError("Curve has rates for {0} periods, but window is {1}.".format(len(self._rates), window))
+
+    def factors(self, window):
+        """Discount factors for periods 0 through window.
+
+        Args:
+            window (int): Number of periods until terminal year.
+
+        Returns:
+            Read-only numpy array with shape (window + 1,).
+        """
+        try:
+            return self._factors[window]
+        except KeyError:
+            self._check_window(window)
+            if self.is_flat:
+                factors = _kernel.discount_factors(self._rates, window, mid_year=self._mid_year)
+            else:
+                growth = 1 + self._rates[:window]
+                factors = np.concatenate(([1.0], 1 / np.cumprod(growth)))
+                if self._mid_year:
+                    factors[1:] *= np.sqrt(growth)
+            factors.flags.writeable = False
+            self._factors[window] = factors
+            return factors
+
+    def compounding(self, window):
+        """Growth of one unit over periods 1 through window, used to discount terminal value.
+
+        Args:
+            window (int): Number of periods until terminal year.
+
+        Returns:
+            compounding (float): (1 + rate) ** window for flat curves, otherwise product of 1 + rate over the window.
+        """
+        try:
+            return self._compounding[window]
+        except KeyError:
+            self._check_window(window)
+            if self.is_flat:
+                compounding = (1 + float(self._rates)) ** window
+            else:
+                compounding = float(np.prod(1 + self._rates[:window]))
+            self._compounding[window] = compounding
+            return compounding
+
+    def __repr__(self):
+        rates = float(self._rates) if self.is_flat else self._rates.tolist()
+        return '{0}({1!r}, mid_year={2!r})'.format(type(self).__name__, rates, self._mid_year)
+
+
+@lru_cache(maxsize=1024)
+def _flat_curve(rate, mid_year):
+    return DiscountCurve(rate, mid_year=mid_year)
@@ -0,0 +1,119 @@
+import threading
+import time
+
+_local = threading.local()
+_lock = threading.Lock()
+
+# Number of instrumentations active in any thread, so DCFs can skip the thread-local lookup when there are none.
+enabled = 0
+
+
+def current():
+    """Get innermost active :class:`Instrumentation` of this thread, or None if instrumentation is off."""
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+class _Timer:
+    """Context manager that records time spent in its block under name."""
+
+    __slots__ = ('_instrumentation', '_name', '_start')
+
+    def __init__(self, instrumentation, name):
+        self._instrumentation = instrumentation
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._instrumentation.record(self._name, time.perf_counter() - self._start)
+
+
+class Instrumentation:
+    """Per-stage timings and call counts of DCF forecasts and valuations.
+
+    Instrumentation is off by default. It is turned on for every DCF valued in a with block, or for a single DCF by
+    setting :attr:`autodcf.models.DCF.instrumentation`. Stages are recorded under the name of the DCF method that
+    runs them (e.g. _calculate_sales, _discount_cash_flows, _calculate_discounted_terminal_cash_flow and
+    _build_forecast). When off, the only cost is a check of a counter of active instrumentations each time a
+    cached result is missing.
+
+    Example:
+        >>> with Instrumentation() as instrumentation:
+        ...     dcf.enterprise_value
+        >>> print(instrumentation.report())
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._seconds = {}
+
+    def __enter__(self):
+        global enabled
+        if getattr(_local, 'stack', None) is None:
+            _local.stack = []
+        _local.stack.append(self)
+        with _lock:
+            enabled += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        global enabled
+        _local.stack.remove(self)
+        with _lock:
+            enabled -= 1
+
+    def timer(self, name):
+        """Context manager that records time spent in its block as one call of name."""
+        return _Timer(self, name)
+
+    def record(self, name, seconds):
+        """Record one call of name taking seconds."""
+        self._calls[name] = self._calls.get(name, 0) + 1
+        self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+
+    def reset(self):
+        """Drop all recorded timings."""
+        self._calls = {}
+        self._seconds = {}
+
+    def as_dict(self):
+        """Get recorded timings.
+
+        Returns:
+            Dictionary mapping stage name to dictionary with calls, seconds (total) and mean_seconds.
+        """
+        return {name: {'calls': calls,
+                       'seconds': self._seconds[name],
+                       'mean_seconds': self._seconds[name] / calls}
+                for name, calls in self._calls.items()}
+
+    def to_prometheus(self, prefix='autodcf_stage'):
+        """Get recorded timings in Prometheus text exposition format.
+
+        Args:
+            prefix (str, optional): Prefix of metric names. Defaults to autodcf_stage.
+
+        Returns:
+            text (str): Counters prefix_calls_total and prefix_seconds_total labelled by stage.
+        """
+        lines = []
+        for metric, values, help_text in (('calls_total', self._calls, 'Number of times stage ran.'),
+                                          ('seconds_total', self._seconds, 'Total seconds spent in stage.')):
+            name = '{0}_{1}'.format(prefix, metric)
+            lines.append('# HELP {0} {1}'.format(name, help_text))
+            lines.append('# TYPE {0} counter'.format(name))
+            for stage in sorted(values):
+                lines.append('{0}{{stage="{1}"}} {2!r}'.format(name, stage, values[stage]))
+        return '\n'.join(lines) + '\n'
+
+    def report(self):
+        """Get recorded timings as a table sorted by total time, slowest first."""
+        lines = ['{0:<45} {1:>8} {2:>12} {3:>12}'.format('stage', 'calls', 'total ms', 'mean us')]
+        for name in sorted(self._seconds, key=self._seconds.get, reverse=True):
+            lines.append('{0:<45} {1:>8} {2:>12.3f} {3:>12.3f}'.format(name,
+                                                                       self._calls[name],
+                                                                       self._seconds[name] * 1e3,
+                                                                       self._seconds[name] / self._calls[name] * 1e6))
+        return '\n'.join(lines)
@@ -0,0 +1,329 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from autodcf.models.batch_dcf import BatchDCF
+
+SAMPLED_ASSUMPTIONS = ('sales_growth',
+                       'discount_rate',
+                       'terminal_growth_rate',
+                       'cogs_to_sales',
+                       'sga_to_sales',
+                       'rd_to_sales',
+                       'da_to_sales',
+                       'interest_to_sales',
+                       'tax_rate',
+                       'capex_to_sales',
+                       'change_in_nwc_to_change_in_sales',
+                       'terminal_discount_rate')
+
+
+class Distribution(ABC):
+    """Abstract base class for distributions assumptions can be drawn from."""
+
+    @abstractmethod
+    def sample(self, rng, size):
+        """Draw samples from distribution.
+
+        Args:
+            rng (np.random.Generator): Random number generator to draw with.
+            size (int): Number of samples to draw.
+
+        Returns:
+            Numpy array of samples.
+        """
+        pass
+
+
+class Normal(Distribution):
+    """Normal distribution.
+
+    Args:
+        mean (float): Mean of distribution.
+        std (float): Standard deviation of distribution.
+    """
+
+    def __init__(self, mean, std):
+        self._mean = mean
+        self._std = std
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def std(self):
+        return self._std
+
+    def sample(self, rng, size):
+        return rng.normal(self.mean, self.std, size)
+
+
+class Uniform(Distribution):
+    """Uniform distribution over [low, high).
+
+    Args:
+        low (float): Lower bound of distribution.
+        high (float): Upper bound of distribution.
+    """
+
+    def __init__(self, low, high):
+        self._low = low
+        self._high = high
+
+    @property
+    def low(self):
+        return self._low
+
+    @property
+    def high(self):
+        return self._high
+
+    def sample(self, rng, size):
+        return rng.uniform(self.low, self.high, size)
+
+
+class Triangular(Distribution):
+    """Triangular distribution.
+
+    Args:
+        low (float): Lower bound of distribution.
+        mode (float): Most likely value.
+        high (float): Upper bound of distribution.
+    """
+
+    def __init__(self, low, mode, high):
+        self._low = low
+        self._mode = mode
+        self._high = high
+
+    @property
+    def low(self):
+        return self._low
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def high(self):
+        return self._high
+
+    def sample(self, rng, size):
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+
+class StreamingStats:
+    """Running summary statistics of a stream of values using bounded memory.
+
+    Mean and variance are merged chunk by chunk with Chan's parallel update. Quantiles are estimated from a
+    fixed-bin histogram, so they are accurate to within one bin width. Values below or above the histogram range are
+    counted in underflow and overflow bins that stretch to the running minimum and maximum. Non-finite values are
+    counted separately and left out of every other statistic.
+
+    Args:
+        bins (int, optional): Number of histogram bins. Defaults to 1,000.
+        hist_range (tuple, optional): (low, high) range of histogram. If not given, it is set from the first chunk of
+            values to three times their spread, centered on them.
+    """
+
+    def __init__(self, bins=1000, hist_range=None):
+        self._bins = bins
+        self._edges = None if hist_range is None else np.linspace(hist_range[0], hist_range[1], bins + 1)
+        self._counts = np.zeros(bins + 2, dtype=np.int64)
+        self._n = 0
+        self._n_nonfinite = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+
+    def update(self, values):
+        """Add chunk of values to statistics.
+
+        Args:
+            values (np.ndarray): Values to add.
+        """
+        values = np.ravel(values)
+        finite = np.isfinite(values)
+        self._n_nonfinite += values.size - np.count_nonzero(finite)
+        values = values[finite]
+        n = values.size
+        if n == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self._n + n
+        delta = chunk_mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += chunk_m2 + delta ** 2 * self._n * n / total
+        self._n = total
+        self._min = min(self._min, values.min())
+        self._max = max(self._max, values.max())
+
+        if self._edges is None:
+            low, high = values.min(), values.max()
+            spread = high - low if high > low else max(abs(low), 1.0)
+            self._edges = np.linspace(low - spread, high + spread, self._bins + 1)
+        # Bin 0 is underflow and bin bins + 1 is overflow.
+        idx = np.searchsorted(self._edges, values, side='right')
+        idx[values == self._edges[-1]] = self._bins
+        self._counts += np.bincount(idx, minlength=self._bins + 2)
+
+    @property
+    def n(self):
+        """Number of finite values seen."""
+        return self._n
+
+    @property
+    def n_nonfinite(self):
+        """Number of NaN or infinite values seen."""
+        return self._n_nonfinite
+
+    @property
+    def mean(self):
+        return self._mean if self._n else np.nan
+
+    @property
+    def var(self):
+        """Sample variance."""
+        return self._m2 / (self._n - 1) if self._n > 1 else np.nan
+
+    @property
+    def std(self):
+        """Sample standard deviation."""
+        return np.sqrt(self.var)
+
+    @property
+    def min(self):
+        return self._min if self._n else np.nan
+
+    @property
+    def max(self):
+        return self._max if self._n else np.nan
+
+    @property
+    def histogram(self):
+        """Tuple of histogram counts and bin edges, excluding underflow and overflow.
+
+        Raises:
+            ValueError: If no hist_range was given and no finite values have been seen, so bins are not yet set.
+        """
+        if self._edges is None:
+            raise ValueError("Histogram bins are set from the first finite values. Update with values or give "
+                             "hist_range first.")
+        return self._counts[1:-1].copy(), self._edges.copy()
+
+    @property
+    def underflow(self):
+        """Number of values below histogram range."""
+        return int(self._counts[0])
+
+    @property
+    def overflow(self):
+        """Number of values above histogram range."""
+        return int(self._counts[-1])
+
+    def quantile(self, q):
+        """Estimate quantiles from histogram.
+
+        Args:
+            q (Union[float, Iterable]): Quantile or quantiles to estimate, each between 0 and 1.
+
+        Returns:
+            Estimated quantile as float, or numpy array of estimates if q is iterable.
+        """
+        q = np.asarray(q, dtype=float)
+        if self._n == 0:
+            return np.full(q.shape, np.nan)[()]
+        edges = np.concatenate(([min(self._min, self._edges[0])], self._edges,
+                                [max(self._max, self._edges[-1])]))
+        cdf = np.cumsum(self._counts)
+        target = q * self._n
+        idx = np.minimum(np.searchsorted(cdf, target, side='right'), self._counts.size - 1)
+        below = np.where(idx > 0, cdf[idx - 1], 0)
+        fraction = (target - below) / np.maximum(self._counts[idx], 1)
+        estimate = edges[idx] + np.clip(fraction, 0, 1) * (edges[idx + 1] - edges[idx])
+        return np.clip(estimate, self._min, self._max)[()]
+
+
+class MonteCarloDCF:
+    """Monte Carlo simulation of DCF valuation.
+
+    Draws each assumption given in distributions from its distribution, keeping all other assumptions at the values
+    of dcf. Samples are drawn and valued in chunks with :class:`autodcf.models.BatchDCF`, and equity value per share is
+    summarized with :class:`StreamingStats`, so memory use depends on chunk_size rather than n_samples. Each sample
+    uses one value of each sampled assumption for every period in the forecast.
+
+    Runs with the same seed, chunk_size and distributions give identical results.
+
+    Args:
+        dcf (autodcf.models.DCF): DCF (or SimpleDCF) giving company and base assumptions.
+        distributions (dict): Mapping of assumption name to :class:`Distribution`. Names may be any of
+            sales_growth, discount_rate, terminal_growth_rate, terminal_discount_rate, tax_rate,
+            change_in_nwc_to_change_in_sales and the _to_sales assumptions.
+        seed (int, optional): Seed for random number generator.
+        chunk_size (int, optional): Number of samples to value at once. Defaults to 10,000.
+        bins (int, optional): Number of histogram bins. Defaults to 1,000.
+        hist_range (tuple, optional): (low, high) range of histogram. Defaults to range set from first chunk.
+    """
+
+    def __init__(self, dcf, distributions, seed=None, chunk_size=10000, bins=1000, hist_range=None):
+        for name in distributions:
+            if name not in SAMPLED_ASSUMPTIONS:
+                raise ValueError("Cannot sample {0}. Assumption must be one of {1}.".format(name,
+                                                                                            SAMPLED_ASSUMPTIONS))
+        self._dcf = dcf
+        self._distributions = distributions
+        self._seed = seed
+        self._chunk_size = chunk_size
+        self._bins = bins
+        self._hist_range = hist_range
+
+    @property
+    def dcf(self):
+        """DCF giving company and base assumptions."""
+        return self._dcf
+
+    @property
+    def distributions(self):
+        """Mapping of assumption name to distribution it is drawn from."""
+        return self._distributions
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    def _draw(self, rng, size):
+        """Draw size samples of each sampled assumption in a fixed order."""
+        return {name: self.distributions[name].sample(rng, size) for name in sorted(self.distributions)}
+
+    def run(self, n_samples, store=None):
+        """Run simulation.
+
+        Args:
+            n_samples (int): Number of samples to draw.
+            store (autodcf.models.ScenarioStore, optional): Store with room for n_samples scenarios to also write the
+                forecast and valuation of every sample to, e.g. from :meth:`autodcf.models.ScenarioStore.create`.
+
+        Returns:
+            stats (StreamingStats): Summary statistics of equity value per share.
+        """
+        rng = np.random.default_rng(self.seed)
+        stats = StreamingStats(bins=self._bins, hist_range=self._hist_range)
+        base = self.dcf.batch_assumptions()
+        remaining = n_samples
+        while remaining > 0:
+            size = min(self.chunk_size, remaining)
+            assumptions = dict(base)
+            assumptions.update(self._draw(rng, size))
+            batch = BatchDCF(company=self.dcf.company, **assumptions)
+            stats.update(batch.equity_value_per_share)
+            if store is not None:
+                store.write(n_samples - remaining, batch)
+            remaining -= size
+        return stats
@@ -0,0 +1,296 @@
+import numpy as np
+
+from autodcf.models import _kernel
+from autodcf.models._base import AbstractDCF
+from autodcf.models.dcf import DCF, PER_PERIOD_ASSUMPTIONS
+from autodcf.models.discount_curve import DiscountCurve
+
+# Assumptions that may be given a level to fade to. Sales growth always fades to the terminal growth rate.
+FADED_ASSUMPTIONS = tuple(name for name in PER_PERIOD_ASSUMPTIONS if name != 'sales_growth')
+
+
+class MultiStageDCF(AbstractDCF):
+    """Three-stage DCF with explicit years, a fade period and a perpetuity.
+
+    Assumptions are given for the explicit years. Over the fade period, sales growth moves linearly from its value in
+    the last explicit year to the terminal growth rate, and every assumption given a level in terminal_levels moves
+    linearly to that level. Cash flows after the fade grow at the terminal growth rate forever.
+
+    The path of each assumption is built as one array over every period, and the forecast and valuation are computed
+    by :class:`autodcf.models.DCF` with those paths as per-period assumptions, so horizons of 50 to 100 years cost
+    little more than the 5-year default.
+
+    Args:
+        company (autodcf.company.Company): Company to do DCF analysis for.
+        sales_growth (Union[Iterable, float]): Sales growth in each of years 0 through explicit_years, or constant
+            growth rate over the explicit years.
+        discount_rate (Union[float, autodcf.models.DiscountCurve]): Rate at which cash flow should be discounted, or
+            curve of discount rates with rates for every year of the explicit and fade periods.
+        terminal_growth_rate (float): Rate at which sales grow at the end of the fade and forever after.
+        explicit_years (int): Number of years after year 0 with explicitly given assumptions.
+        fade_years (int): Number of years over which assumptions fade to their terminal levels.
+        cogs_to_sales (Union[Iterable, float]): COGS as % of sales in the explicit years.
+        sga_to_sales (Union[Iterable, float]): SGA as % of sales in the explicit years.
+        rd_to_sales (Union[Iterable, float]): R&D as % of sales in the explicit years.
+        da_to_sales (Union[Iterable, float]): Depreciation & amortization as % of sales in the explicit years.
+        interest_to_sales (Union[Iterable, float]): Interest as % of sales in the explicit years.
+        tax_rate (Union[Iterable, float]): Tax rate in the explicit years.
+        capex_to_sales (Union[Iterable, float]): Capex as % of sales in the explicit years.
+        change_in_nwc_to_change_in_sales (Union[Iterable, float]): Ratio of how much net working capital must change
+            to increase sales by 1 unit in the explicit years.
+        terminal_levels (dict, optional): Mapping of any of FADED_ASSUMPTIONS to the level it reaches at the end of the
+            fade (e.g. {'cogs_to_sales': 0.55}). Assumptions not given stay at their value in the last explicit year.
+        terminal_discount_rate (float, optional): Rate at which cash flows after the fade should be discounted.
+            Defaults to discount_rate (or the last rate of a discount curve).
+        terminal_value (autodcf.models.terminal_value.TerminalValue, optional): Method of valuing cash flows after
+            the fade. Defaults to perpetuity growth.
+
+    Note:
+        Iterable assumptions hold one value for each of years 0 through explicit_years. Assumptions are read-only,
+        so build a new model to change them.
+    """
+
+    def __init__(self,
+                 company,
+                 sales_growth,
+                 discount_rate,
+                 terminal_growth_rate,
+                 explicit_years,
+                 fade_years,
+                 cogs_to_sales,
+                 sga_to_sales,
+                 rd_to_sales,
+                 da_to_sales,
+                 interest_to_sales,
+                 tax_rate,
+                 capex_to_sales,
+                 change_in_nwc_to_change_in_sales,
+                 terminal_levels=None,
+                 terminal_discount_rate=None,
+                 terminal_value=None):
+        terminal_levels = dict(terminal_levels or {})
+        for name in terminal_levels:
+            if name not in FADED_ASSUMPTIONS:
+                raise ValueError("Cannot fade {0}. Assumption must be one of {1}.".format(name, FADED_ASSUMPTIONS))
+        self._company = company
+        self._sales_growth = sales_growth
+        self._discount_rate = discount_rate
+        self._terminal_growth_rate = terminal_growth_rate
+        self._explicit_years = explicit_years
+        self._fade_years = fade_years
+        self._cogs_to_sales = cogs_to_sales
+        self._sga_to_sales = sga_to_sales
+        self._rd_to_sales = rd_to_sales
+        self._da_to_sales = da_to_sales
+        self._interest_to_sales = interest_to_sales
+        self._tax_rate = tax_rate
+        self._capex_to_sales = capex_to_sales
+        self._change_in_nwc_to_change_in_sales = change_in_nwc_to_change_in_sales
+        self._terminal_levels = terminal_levels
+        self._terminal_discount_rate = terminal_discount_rate
+        self._terminal_value = terminal_value
+        self._dcf = None
+
+    @property
+    def company(self):
+        """Company object to do DCF for."""
+        return self._company
+
+    @property
+    def sales_growth(self):
+        """Sales growth in the explicit years."""
+        return self._sales_growth
+
+    @property
+    def discount_rate(self):
+        """Discount rate to discount cash flow at."""
+        return self._discount_rate
+
+    @property
+    def discount_curve(self):
+        """:class:`autodcf.models.DiscountCurve` of discount rate."""
+        if isinstance(self.discount_rate, DiscountCurve):
+            return self.discount_rate
+        return DiscountCurve.flat(self.discount_rate)
+
+    @property
+    def terminal_discount_rate(self):
+        """Discount rate after the fade. Defaults to the discount rate (or last rate of a discount curve)."""
+        if self._terminal_discount_rate is None:
+            return self.discount_curve.terminal_rate
+        return self._terminal_discount_rate
+
+    @property
+    def terminal_value(self):
+        """Method of valuing cash flows after the fade, or None for perpetuity growth."""
+        return self._terminal_value
+
+    @property
+    def terminal_growth_rate(self):
+        """Rate at which sales grow at the end of the fade and forever after."""
+        return self._terminal_growth_rate
+
+    @property
+    def explicit_years(self):
+        """Number of years after year 0 with explicitly given assumptions."""
+        return self._explicit_years
+
+    @property
+    def fade_years(self):
+        """Number of years over which assumptions fade to their terminal levels."""
+        return self._fade_years
+
+    @property
+    def window(self):
+        """Number of years until terminal year, at the end of the fade."""
+        return self.explicit_years + self.fade_years
+
+    @property
+    def cogs_to_sales(self):
+        """Cost of goods sold as a percentage of sales in the explicit years."""
+        return self._cogs_to_sales
+
+    @property
+    def sga_to_sales(self):
+        """Selling, general, and administrative costs as a percentage of sales in the explicit years."""
+        return self._sga_to_sales
+
+    @property
+    def rd_to_sales(self):
+        """Research and development costs as a percentage of sales in the explicit years."""
+        return self._rd_to_sales
+
+    @property
+    def da_to_sales(self):
+        """Depreciation and amortization as a percentage of sales in the explicit years."""
+        return self._da_to_sales
+
+    @property
+    def interest_to_sales(self):
+        """Interest expense as a percentage of sales in the explicit years."""
+        return self._interest_to_sales
+
+    @property
+    def tax_rate(self):
+        """Effective tax rate in the explicit years."""
+        return self._tax_rate
+
+    @property
+    def capex_to_sales(self):
+        """Capital expenditures as a percentage of sales in the explicit years."""
+        return self._capex_to_sales
+
+    @property
+    def change_in_nwc_to_change_in_sales(self):
+        """Change in net working capital per change in sales in the explicit years."""
+        return self._change_in_nwc_to_change_in_sales
+
+    @property
+    def terminal_levels(self):
+        """Mapping of faded assumptions to the levels they reach at the end of the fade."""
+        return dict(self._terminal_levels)
+
+    def paths(self):
+        """Get value of every per-period assumption in every year of the explicit and fade periods.
+
+        Every assumption is faded at once, as one row of a single array.
+
+        Returns:
+            Dictionary mapping sales_growth and FADED_ASSUMPTIONS to numpy arrays with one value for each of years 0
+            through window.
+        """
+        explicit = np.empty((len(PER_PERIOD_ASSUMPTIONS), self.explicit_years + 1))
+        for i, name in enumerate(PER_PERIOD_ASSUMPTIONS):
+            values = np.asarray(getattr(self, name), dtype=float)
+            if values.ndim and values.shape != (self.explicit_years + 1,):
+                raise ValueError("{0} must be a single value or have one value for each of years 0 through {1}. "
+                                 "Given {2} values.".format(name, self.explicit_years, values.size))
+            explicit[i] = values
+        targets = explicit[:, -1].copy()
+        targets[PER_PERIOD_ASSUMPTIONS.index('sales_growth')] = self.terminal_growth_rate
+        for name, level in self._terminal_levels.items():
+            targets[PER_PERIOD_ASSUMPTIONS.index(name)] = level
+        paths = _kernel.fade(explicit, targets[:, None], self.fade_years)
+        return dict(zip(PER_PERIOD_ASSUMPTIONS, paths))
+
+    def path(self, assumption):
+        """Get value of assumption in every year of the explicit and fade periods.
+
+        Args:
+            assumption (str): One of sales_growth and FADED_ASSUMPTIONS.
+
+        Returns:
+            Numpy array with one value for each of years 0 through window.
+        """
+        if assumption not in PER_PERIOD_ASSUMPTIONS:
+            raise ValueError("Assumption must be one of {0}. Given {1}.".format(PER_PERIOD_ASSUMPTIONS, assumption))
+        return self.paths()[assumption]
+
+    def as_dcf(self):
+        """Get :class:`autodcf.models.DCF` with the path of every assumption as its per-period assumptions.
+
+        The DCF is built once and used for every forecast and valuation of this model. Use it for anything else DCF
+        offers, e.g. :meth:`autodcf.models.DCF.gradient` gives sensitivities to the value in each year of the
+        explicit and fade periods.
+        """
+        if self._dcf is None:
+            paths = self.paths()
+            ratios = {}
+            for name in FADED_ASSUMPTIONS:
+                path = paths[name]
+                # Ratios to sales and tax rate also cover the most recent historical period, which only feeds the
+                # historical row of the forecast and is given the value of year 0.
+                ratios[name] = path if name == 'change_in_nwc_to_change_in_sales' else np.concatenate((path[:1], path))
+            self._dcf = DCF(company=self.company,
+                            sales_growth=paths['sales_growth'],
+                            discount_rate=self.discount_rate,
+                            terminal_growth_rate=self.terminal_growth_rate,
+                            window=self.window,
+                            terminal_discount_rate=self._terminal_discount_rate,
+                            terminal_value=self._terminal_value,
+                            **ratios)
+        return self._dcf
+
+    def forecast_array(self):
+        """Get forecast as a float64 numpy array with shape (window + 2, len(LINE_ITEMS)).
+
+        See :meth:`autodcf.models.DCF.forecast_array`.
+        """
+        return self.as_dcf().forecast_array()
+
+    def forecast(self):
+        """Get pandas dataframe with forecasted future income statements and discounted free cash flows."""
+        return self.as_dcf().forecast()
+
+    @property
+    def discounted_window_cash_flow(self):
+        """Sum of discounted cash flows over the explicit and fade periods."""
+        return self.as_dcf().discounted_window_cash_flow
+
+    @property
+    def discounted_terminal_cash_flow(self):
+        """Sum of discounted cash flows after the fade."""
+        return self.as_dcf().discounted_terminal_cash_flow
+
+    @property
+    def enterprise_value(self):
+        """Enterprise value given by discounted cash flow analysis."""
+        return self.as_dcf().enterprise_value
+
+    @property
+    def equity_value(self):
+        """Total equity value of firm."""
+        return self.as_dcf().equity_value
+
+    @property
+    def equity_value_per_share(self):
+        """Equity value divided by total number of shares outstanding."""
+        return self.as_dcf().equity_value_per_share
+
+    @property
+    def absolute_upside_per_share(self):
+        return self.as_dcf().absolute_upside_per_share
+
+    @property
+    def percent_upside_per_share(self):
+        return self.as_dcf().percent_upside_per_share
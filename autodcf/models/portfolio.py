@@ -0,0 +1,277 @@
+import os
+from collections.abc import Mapping
+
+import numpy as np
+
+from autodcf.company.company_table import CompanyTable
+from autodcf.models import _kernel
+
+COMPANY_FIELDS = ('sales',
+                  'tax',
+                  'cogs_to_sales',
+                  'sga_to_sales',
+                  'rd_to_sales',
+                  'da_to_sales',
+                  'interest_to_sales',
+                  'capex_to_sales',
+                  'net_debt',
+                  'fully_diluted_shares',
+                  'price_per_share')
+
+SCENARIO_FIELDS = ('sales_growth',
+                   'discount_rate',
+                   'terminal_growth_rate',
+                   'change_in_nwc_to_change_in_sales',
+                   'tax_rate')
+
+RESULT_FIELDS = ('enterprise_value',
+                 'equity_value',
+                 'equity_value_per_share',
+                 'percent_upside_per_share')
+
+
+def company_arrays(companies):
+    """Collect values needed for valuation from companies into flat arrays.
+
+    Ratios to sales are taken from each company's most recent statements, as in :class:`autodcf.models.SimpleDCF`.
+
+    Args:
+        companies (Union[autodcf.company.CompanyTable, Iterable[autodcf.company.Company]]): Companies to collect
+            values from. Values are read straight from the columns of a CompanyTable.
+
+    Returns:
+        Dictionary mapping each of COMPANY_FIELDS to a float64 numpy array with one value per company.
+    """
+    if isinstance(companies, CompanyTable):
+        income_statements = companies.income_statements
+        sales = income_statements['sales']
+        return {'sales': sales,
+                'tax': income_statements['tax'],
+                'cogs_to_sales': income_statements['cogs'] / sales,
+                'sga_to_sales': income_statements['sga'] / sales,
+                'rd_to_sales': income_statements['rd'] / sales,
+                'da_to_sales': income_statements.da / sales,
+                'interest_to_sales': income_statements['interest'] / sales,
+                'capex_to_sales': companies.cash_flows['capex'] / sales,
+                'net_debt': companies.balance_sheets.net_debt,
+                'fully_diluted_shares': companies.fully_diluted_shares,
+                'price_per_share': companies.price_per_share}
+    values = np.array([company_values(company) for company in companies], dtype=float).reshape(-1, len(COMPANY_FIELDS))
+    return {field: np.ascontiguousarray(values[:, i]) for i, field in enumerate(COMPANY_FIELDS)}
+
+
+def company_values(company):
+    """Get values needed for valuation from company.
+
+    Args:
+        company (autodcf.company.Company): Company to get values from.
+
+    Returns:
+        Tuple of values in the order of COMPANY_FIELDS.
+    """
+    income_statement = company.income_statement
+    sales = income_statement.sales
+    return (sales,
+            income_statement.tax,
+            income_statement.cogs / sales,
+            income_statement.sga / sales,
+            income_statement.rd / sales,
+            income_statement.da / sales,
+            income_statement.interest / sales,
+            company.cash_flows.capex / sales,
+            company.balance_sheet.net_debt,
+            company.fully_diluted_shares,
+            company.price_per_share)
+
+
+def value_pairs(companies, scenarios, window, scenario_chunk_size=None):
+    """Value every company under every scenario.
+
+    Args:
+        companies (dict): Mapping of COMPANY_FIELDS to arrays with one value per company.
+        scenarios (dict): Mapping of SCENARIO_FIELDS to arrays with one value per scenario.
+        window (int): Number of years until terminal year.
+        scenario_chunk_size (int, optional): Number of scenarios to value every company under at once, bounding
+            the forecast held in memory to companies times scenario_chunk_size rows. Defaults to all scenarios.
+
+    Returns:
+        Dictionary mapping RESULT_FIELDS to arrays with one value per company and scenario pair, ordered by company
+        and then by scenario.
+    """
+    n_companies = len(companies['sales'])
+    n_scenarios = len(scenarios['discount_rate'])
+    scenario_chunk_size = scenario_chunk_size or max(n_scenarios, 1)
+    results = {field: np.empty((n_companies, n_scenarios)) for field in RESULT_FIELDS}
+    for start in range(0, n_scenarios, scenario_chunk_size):
+        stop = min(start + scenario_chunk_size, n_scenarios)
+        valued = value_rows({field: np.repeat(arr, stop - start) for field, arr in companies.items()},
+                            {field: np.tile(arr[start:stop], n_companies) for field, arr in scenarios.items()},
+                            window)
+        for field in RESULT_FIELDS:
+            results[field][:, start:stop] = valued[field].reshape(n_companies, stop - start)
+    return {field: values.ravel() for field, values in results.items()}
+
+
+def forecast_rows(companies, scenarios, window):
+    """Forecast each company under the scenario in the same position.
+
+    Args:
+        companies (dict): Mapping of COMPANY_FIELDS to arrays with one value per row.
+        scenarios (dict): Mapping of SCENARIO_FIELDS to arrays with one value per row.
+        window (int): Number of years until terminal year.
+
+    Returns:
+        Numpy array with shape (rows, window + 2, len(LINE_ITEMS)), laid out as in :mod:`autodcf.models._kernel`.
+    """
+    def per_company(field):
+        return _kernel.as_column(companies[field])
+
+    def per_scenario(field):
+        return _kernel.as_column(scenarios[field])
+
+    return _kernel.forecast_array(sales=per_company('sales'),
+                                  tax=per_company('tax'),
+                                  sales_growth=per_scenario('sales_growth'),
+                                  discount_factors=_kernel.discount_factors(per_scenario('discount_rate'), window),
+                                  window=window,
+                                  cogs_to_sales=per_company('cogs_to_sales'),
+                                  sga_to_sales=per_company('sga_to_sales'),
+                                  rd_to_sales=per_company('rd_to_sales'),
+                                  da_to_sales=per_company('da_to_sales'),
+                                  interest_to_sales=per_company('interest_to_sales'),
+                                  tax_rate=per_scenario('tax_rate'),
+                                  capex_to_sales=per_company('capex_to_sales'),
+                                  change_in_nwc_to_change_in_sales=per_scenario('change_in_nwc_to_change_in_sales'))
+
+
+def value_rows(companies, scenarios, window):
+    """Value each company under the scenario in the same position.
+
+    Args:
+        companies (dict): Mapping of COMPANY_FIELDS to arrays with one value per row.
+        scenarios (dict): Mapping of SCENARIO_FIELDS to arrays with one value per row.
+        window (int): Number of years until terminal year.
+
+    Returns:
+        Dictionary mapping RESULT_FIELDS to arrays with one value per row.
+    """
+    forecast = forecast_rows(companies, scenarios, window)
+    discount_rate = _kernel.as_column(scenarios['discount_rate'])
+    terminal_growth_rate = _kernel.as_column(scenarios['terminal_growth_rate'])
+    enterprise_value = (_kernel.discounted_window_cash_flow(forecast)
+                        + _kernel.discounted_terminal_cash_flow(forecast,  # noqa: W503
+                                                                discount_rate,
+                                                                terminal_growth_rate,
+                                                                (1 + discount_rate[:, 0]) ** window))
+    equity_value = enterprise_value - companies['net_debt']
+    equity_value_per_share = equity_value / companies['fully_diluted_shares']
+    price_per_share = companies['price_per_share']
+    return {'enterprise_value': enterprise_value,
+            'equity_value': equity_value,
+            'equity_value_per_share': equity_value_per_share,
+            'percent_upside_per_share': (equity_value_per_share - price_per_share) / price_per_share}
+
+
+def _value_shard(payload):
+    """Value one shard of companies. Runs in worker processes."""
+    companies, scenarios, window, scenario_chunk_size = payload
+    return value_pairs(companies, scenarios, window, scenario_chunk_size)
+
+
+class PortfolioRunner:
+    """Value many companies under many scenarios across a pool of processes.
+
+    Companies are valued as in :class:`autodcf.models.SimpleDCF`, with ratios to sales taken from their most recent
+    statements. Companies are split into shards of chunk_size companies and only flat arrays of the values needed
+    for valuation are sent to workers. Each shard is valued scenario_chunk_size scenarios at a time, so peak memory
+    depends on chunk_size and scenario_chunk_size rather than on the number of scenarios. Results are merged in the
+    order companies and scenarios were given, no matter which worker finishes first.
+
+    Args:
+        companies (Union[autodcf.company.CompanyTable, Mapping, Iterable]): Companies to value. Companies in a
+            CompanyTable keep their labels. If a mapping, keys are used as company labels in results. Otherwise
+            companies are labelled by position.
+        scenarios (dict): Mapping of sales_growth, discount_rate, terminal_growth_rate,
+            change_in_nwc_to_change_in_sales and tax_rate to arrays (or scalars) with one value per scenario.
+        window (int, optional): Number of years until terminal year. Defaults to 5.
+        workers (int, optional): Number of worker processes. Defaults to number of CPUs. If 1, shards are valued in
+            the calling process.
+        chunk_size (int, optional): Number of companies per shard. Defaults to 256.
+        scenario_chunk_size (int, optional): Number of scenarios to value each shard under at once. Defaults to 64.
+    """
+
+    def __init__(self, companies, scenarios, window=5, workers=None, chunk_size=256, scenario_chunk_size=64):
+        if isinstance(companies, CompanyTable):
+            labels = list(companies.labels)
+        elif isinstance(companies, Mapping):
+            labels, companies = list(companies.keys()), list(companies.values())
+        else:
+            companies = list(companies)
+            labels = list(range(len(companies)))
+        missing = [field for field in SCENARIO_FIELDS if field not in scenarios]
+        if missing:
+            raise ValueError("Scenarios missing assumptions {0}.".format(missing))
+        scenario_arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(scenarios[field], dtype=float))
+                                                for field in SCENARIO_FIELDS])
+        self._labels = labels
+        self._companies = company_arrays(companies)
+        self._scenarios = {field: np.ascontiguousarray(arr) for field, arr in zip(SCENARIO_FIELDS, scenario_arrays)}
+        self._window = window
+        self._workers = os.cpu_count() if workers is None else workers
+        self._chunk_size = chunk_size
+        self._scenario_chunk_size = scenario_chunk_size
+
+    @property
+    def labels(self):
+        """Labels of companies in order they are valued."""
+        return self._labels
+
+    @property
+    def scenarios(self):
+        """Mapping of assumption name to array with one value per scenario."""
+        return self._scenarios
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @property
+    def scenario_chunk_size(self):
+        return self._scenario_chunk_size
+
+    def _payloads(self):
+        """Yield arrays for each shard of companies."""
+        n_companies = len(self.labels)
+        for start in range(0, n_companies, self.chunk_size):
+            stop = start + self.chunk_size
+            shard = {field: arr[start:stop] for field, arr in self._companies.items()}
+            yield shard, self.scenarios, self.window, self.scenario_chunk_size
+
+    def run(self):
+        """Value all companies under all scenarios.
+
+        Returns:
+            results (pd.DataFrame): One row per company and scenario pair with columns company, scenario and
+                RESULT_FIELDS, ordered by company and then by scenario.
+        """
+        if self.workers == 1:
+            shards = [_value_shard(payload) for payload in self._payloads()]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                shards = list(executor.map(_value_shard, self._payloads()))
+        import pandas as pd
+        n_scenarios = len(self.scenarios['discount_rate'])
+        results = pd.DataFrame({'company': np.repeat(np.asarray(self.labels, dtype=object), n_scenarios),
+                                'scenario': np.tile(np.arange(n_scenarios), len(self.labels))})
+        for field in RESULT_FIELDS:
+            results[field] = np.concatenate([shard[field] for shard in shards]) if shards else np.empty(0)
+        return results
@@ -0,0 +1,212 @@
+import numpy as np
+
+from autodcf.company.company import Company
+from autodcf.models import _kernel
+from autodcf.models.portfolio import SCENARIO_FIELDS, company_arrays, forecast_rows
+
+# Default (low, high) brackets to search for each assumption. None is replaced by a bound just inside the region
+# where the terminal value is defined, i.e. just above the terminal growth rate for discount_rate and just below the
+# discount rate for terminal_growth_rate.
+BRACKETS = {'sales_growth': (-0.9, 2.0),
+            'discount_rate': (None, 2.0),
+            'terminal_growth_rate': (-0.9, None),
+            'change_in_nwc_to_change_in_sales': (-10.0, 10.0),
+            'tax_rate': (-1.0, 2.0)}
+
+# Distance kept from the pole of the terminal value, where discount_rate equals terminal_growth_rate.
+_POLE_MARGIN = 1e-6
+
+
+def value_per_share_and_derivative(companies, scenarios, window, solve_for):
+    """Equity value per share of each row and its derivative with respect to one assumption.
+
+    Values are computed by the array kernel exactly as in :func:`autodcf.models.portfolio.value_rows`. Derivatives
+    are exact, using that every forecasted line is linear in sales and every cash flow is linear in the tax rate and
+    in change_in_nwc_to_change_in_sales.
+
+    Args:
+        companies (dict): Mapping of COMPANY_FIELDS to arrays with one value per row.
+        scenarios (dict): Mapping of SCENARIO_FIELDS to arrays with one value per row.
+        window (int): Number of years until terminal year.
+        solve_for (str): Assumption in SCENARIO_FIELDS to differentiate with respect to.
+
+    Returns:
+        Tuple of arrays with one equity value per share and one derivative per row.
+    """
+    forecast = forecast_rows(companies, scenarios, window)
+    discount_rate = _kernel.as_column(scenarios['discount_rate'])
+    terminal_growth_rate = _kernel.as_column(scenarios['terminal_growth_rate'])
+    compounding = (1 + discount_rate[:, 0]) ** window
+    terminal = _kernel.discounted_terminal_cash_flow(forecast, discount_rate, terminal_growth_rate, compounding)
+    enterprise_value = _kernel.discounted_window_cash_flow(forecast) + terminal
+
+    r = discount_rate[:, 0]
+    spread = r - terminal_growth_rate[:, 0]
+    discounted = forecast[:, 1:, _kernel.DISCOUNTED_FCF]
+    if solve_for == 'discount_rate':
+        # Cash flow of period t is discounted by (1 + r) ** -t, and the terminal value is discounted by
+        # (1 + r) ** -window twice (once with the last cash flow and once more for compounding) and divided by spread.
+        periods = np.arange(window + 1)
+        derivative = (-(discounted * periods).sum(axis=1) / (1 + r)
+                      + terminal * (-2 * window / (1 + r) - 1 / spread))  # noqa: W503
+    elif solve_for == 'terminal_growth_rate':
+        derivative = discounted[:, -1] * (1 + r) / (spread ** 2 * compounding)
+    else:
+        sales = forecast[:, :, _kernel.SALES]
+        if solve_for == 'sales_growth':
+            # Sales of row i are sales * (1 + sales_growth) ** i, and free cash flow of each forecasted row is
+            # margin * sales less change_in_nwc_to_change_in_sales times the change in sales.
+            sales_growth = _kernel.as_column(scenarios['sales_growth'])
+            d_sales = sales * np.arange(window + 2) / (1 + sales_growth)
+            da_to_sales = companies['da_to_sales']
+            operating_margin = (1 - companies['cogs_to_sales'] - companies['sga_to_sales'] - companies['rd_to_sales']
+                                - da_to_sales - companies['interest_to_sales'])  # noqa: W503
+            margin = _kernel.as_column(operating_margin * (1 - scenarios['tax_rate']) + da_to_sales
+                                       - companies['capex_to_sales'])  # noqa: W503
+            nwc = _kernel.as_column(scenarios['change_in_nwc_to_change_in_sales'])
+            d_fcf = margin * d_sales[:, 1:] - nwc * np.diff(d_sales, axis=1)
+        elif solve_for == 'tax_rate':
+            d_fcf = -forecast[:, 1:, _kernel.EBT]
+        elif solve_for == 'change_in_nwc_to_change_in_sales':
+            d_fcf = -np.diff(sales, axis=1)
+        else:
+            raise ValueError("Cannot solve for {0}. Choose one of {1}.".format(solve_for, SCENARIO_FIELDS))
+        d_discounted = d_fcf * _kernel.discount_factors(discount_rate, window)
+        # Terminal value is proportional to the last discounted cash flow.
+        derivative = (d_discounted.sum(axis=1)
+                      + d_discounted[:, -1] * (1 + terminal_growth_rate[:, 0]) / (spread * compounding))  # noqa: W503
+    shares = companies['fully_diluted_shares']
+    return (enterprise_value - companies['net_debt']) / shares, derivative / shares
+
+
+class ReverseDCF:
+    """Solve for the value of one assumption that makes equity value per share equal price per share.
+
+    Companies are valued as in :class:`autodcf.models.SimpleDCF`, with ratios to sales taken from their most recent
+    statements. Every company is solved for at once: each iteration values all companies that have not converged
+    in one pass of the array kernel. Each iteration takes a Newton step using the exact derivative of equity value
+    per share, and falls back to bisecting the bracket whenever the step would leave it, so every company with a
+    root in its bracket converges.
+
+    Args:
+        companies (Union[autodcf.company.Company, autodcf.company.CompanyTable, Iterable]): Company or companies to
+            solve for.
+        solve_for (str): Assumption to solve for. One of sales_growth, discount_rate, terminal_growth_rate,
+            change_in_nwc_to_change_in_sales and tax_rate.
+        assumptions (dict): Mapping of every other one of those assumptions to a single value or to one value per
+            company.
+        window (int, optional): Number of years until terminal year. Defaults to 5.
+        bracket (tuple, optional): (low, high) values of solve_for to search between, as single values or one value
+            per company. Defaults to the bracket in BRACKETS.
+        xtol (float, optional): Solutions are accurate to within xtol * (1 + abs(solution)). Defaults to 1e-10.
+        max_iter (int, optional): Maximum number of iterations. Defaults to 100.
+
+    Example:
+        >>> ReverseDCF(company, 'sales_growth', {'discount_rate': 0.1, 'terminal_growth_rate': 0.02,
+        ...                                      'change_in_nwc_to_change_in_sales': 0.1, 'tax_rate': 0.21}).solve()
+    """
+
+    def __init__(self, companies, solve_for, assumptions, window=5, bracket=None, xtol=1e-10, max_iter=100):
+        if solve_for not in SCENARIO_FIELDS:
+            raise ValueError("Cannot solve for {0}. Choose one of {1}.".format(solve_for, SCENARIO_FIELDS))
+        missing = [field for field in SCENARIO_FIELDS if field != solve_for and field not in assumptions]
+        if missing:
+            raise ValueError("Missing assumptions {0}.".format(missing))
+        if isinstance(companies, Company):
+            companies = [companies]
+        self._companies = company_arrays(companies)
+        n = len(self._companies['sales'])
+        self._assumptions = {field: np.broadcast_to(np.asarray(assumptions[field], dtype=float), (n,))
+                             for field in SCENARIO_FIELDS if field != solve_for}
+        self._solve_for = solve_for
+        self._window = window
+        self._bracket = bracket
+        self._xtol = xtol
+        self._max_iter = max_iter
+        self._iterations = None
+
+    @property
+    def solve_for(self):
+        return self._solve_for
+
+    @property
+    def assumptions(self):
+        """Mapping of every other assumption to an array with one value per company."""
+        return self._assumptions
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def iterations(self):
+        """Number of iterations the last call to solve took, or None before solving."""
+        return self._iterations
+
+    def brackets(self):
+        """Arrays of low and high values of solve_for to search between for each company."""
+        n = len(self._companies['sales'])
+        low, high = BRACKETS[self.solve_for] if self._bracket is None else self._bracket
+        if low is None:
+            low = self.assumptions['terminal_growth_rate'] + _POLE_MARGIN
+        if high is None:
+            high = self.assumptions['discount_rate'] - _POLE_MARGIN
+        return (np.broadcast_to(np.asarray(low, dtype=float), (n,)).copy(),
+                np.broadcast_to(np.asarray(high, dtype=float), (n,)).copy())
+
+    def residuals(self, values, rows=None):
+        """Equity value per share less price per share, and its derivative, with solve_for set to values.
+
+        Args:
+            values (np.ndarray): Value of solve_for for each company, or for each company in rows.
+            rows (np.ndarray, optional): Indices of companies to value. Defaults to every company.
+
+        Returns:
+            Tuple of arrays with one residual and one derivative per company valued.
+        """
+        companies, assumptions = self._companies, self.assumptions
+        if rows is not None:
+            companies = {field: arr[rows] for field, arr in companies.items()}
+            assumptions = {field: arr[rows] for field, arr in assumptions.items()}
+        scenarios = dict(assumptions)
+        scenarios[self.solve_for] = values
+        value, derivative = value_per_share_and_derivative(companies, scenarios, self.window, self.solve_for)
+        return value - companies['price_per_share'], derivative
+
+    def solve(self):
+        """Solve for the implied value of solve_for for each company.
+
+        Returns:
+            Numpy array with one implied value per company. Values are NaN for companies with no root in their
+            bracket (i.e. equity value per share minus price per share has the same sign at both ends) or that did
+            not converge within max_iter iterations.
+        """
+        low, high = self.brackets()
+        f_low, _ = self.residuals(low)
+        f_high, _ = self.residuals(high)
+        solution = np.full(len(low), np.nan)
+        solution[f_low == 0] = low[f_low == 0]
+        solution[f_high == 0] = high[f_high == 0]
+        bracketed = (f_low * f_high < 0) & np.isfinite(f_low) & np.isfinite(f_high)
+        # Orient brackets so the residual is negative at low and positive at high.
+        swap = bracketed & (f_low > 0)
+        low[swap], high[swap] = high[swap], low[swap]
+
+        rows = np.flatnonzero(bracketed)
+        low, high = low[rows], high[rows]
+        guess = (low + high) / 2
+        self._iterations = 0
+        while rows.size and self._iterations < self._max_iter:
+            self._iterations += 1
+            f, df = self.residuals(guess, rows)
+            negative = f < 0
+            low = np.where(negative, guess, low)
+            high = np.where(negative, high, guess)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = guess - f / df
+            inside = np.isfinite(newton) & (newton > np.minimum(low, high)) & (newton < np.maximum(low, high))
+            step = np.where(inside, newton, (low + high) / 2)
+            done = (f == 0) | (np.abs(step - guess) <= self._xtol * (1 + np.abs(guess)))
+            solution[rows[done]] = np.where(f == 0, guess, step)[done]
+            rows, low, high, guess = rows[~done], low[~done], high[~done], step[~done]
+        return solution
@@ -0,0 +1,222 @@
+import json
+import os
+
+import numpy as np
+
+from autodcf.models._kernel import LINE_ITEMS
+from autodcf.models.batch_dcf import BatchDCF
+from autodcf.models.monte_carlo import StreamingStats
+
+VALUATION_FIELDS = ('enterprise_value',
+                    'equity_value',
+                    'equity_value_per_share')
+
+STORE_VERSION = 1
+
+_META = 'meta.json'
+_FORECAST = 'forecast.npy'
+
+
+def _per_scenario(name, value):
+    """Whether assumption (or terminal value parameter) with name may hold one value per scenario."""
+    return name not in ('window', 'terminal_value') and not isinstance(value, str) and np.ndim(value) >= 1
+
+
+def _n_scenarios(assumptions):
+    """Number of scenarios given by assumptions in the layout taken by BatchDCF."""
+    values = list(assumptions.items())
+    if assumptions.get('terminal_value') is not None:
+        values.extend(assumptions['terminal_value'].parameters.items())
+    lengths = {np.shape(value)[0] for name, value in values
+               if _per_scenario(name, value) and np.shape(value)[0] > 1}
+    if len(lengths) > 1:
+        raise ValueError("Assumptions give different numbers of scenarios {0}.".format(sorted(lengths)))
+    return lengths.pop() if lengths else 1
+
+
+def _chunk_values(values, n_scenarios, start, stop):
+    """Values of scenarios start through stop. Values shared by every scenario are passed through."""
+    return {name: value[start:stop] if (_per_scenario(name, value)
+                                        and np.shape(value)[0] == n_scenarios > 1) else value  # noqa: W503
+            for name, value in values.items()}
+
+
+def _chunk(assumptions, n_scenarios, start, stop):
+    """Assumptions of scenarios start through stop, including per-scenario parameters of terminal value."""
+    chunk = _chunk_values(assumptions, n_scenarios, start, stop)
+    terminal_value = assumptions.get('terminal_value')
+    if terminal_value is not None:
+        chunk['terminal_value'] = type(terminal_value)(**_chunk_values(terminal_value.parameters, n_scenarios,
+                                                                       start, stop))
+    return chunk
+
+
+class ScenarioStore:
+    """Forecasts and valuations of many scenarios in memory-mapped files on disk.
+
+    A store is a directory holding forecast.npy, with shape (scenarios, window + 2, len(LINE_ITEMS)) laid out as
+    :meth:`autodcf.models.BatchDCF.forecast`, one .npy file per valuation in VALUATION_FIELDS with one value per
+    scenario, and meta.json. Sweeps are written and read a chunk at a time, so their size is limited by disk rather
+    than memory. Arrays read from a store are read-only memory maps of the files, not copies. Scenarios are written
+    with plain file writes rather than through the memory maps, so written pages do not stay in the memory of the
+    writing process. The files are standard NumPy .npy files, so they can also be read with
+    ``np.load(path, mmap_mode='r')``.
+
+    Args:
+        path (str): Directory of store made by :meth:`create` or :meth:`sweep`.
+
+    Example:
+        >>> store = ScenarioStore.sweep('sweep', company, assumptions)
+        >>> store.stats('equity_value_per_share').quantile([0.05, 0.5, 0.95])
+        >>> store.line('FCF')[:, -1].mean()
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, _META)) as f:
+            meta = json.load(f)
+        if meta['version'] != STORE_VERSION:
+            raise ValueError("Store {0} has version {1}, but only version {2} can be read.".format(
+                path, meta['version'], STORE_VERSION))
+        self._path = path
+        self._window = meta['window']
+        self._line_items = tuple(meta['line_items'])
+        self._forecast = np.load(os.path.join(path, _FORECAST), mmap_mode='r')
+        self._valuation = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+                           for name in VALUATION_FIELDS}
+
+    @classmethod
+    def create(cls, path, n_scenarios, window):
+        """Create empty store.
+
+        Files are created at full size, but disk space is only taken up as scenarios are written on file systems
+        that support sparse files.
+
+        Args:
+            path (str): Directory to create store in. Created if it does not exist.
+            n_scenarios (int): Number of scenarios to make room for.
+            window (int): Number of years until terminal year.
+
+        Returns:
+            store (ScenarioStore): Empty store.
+        """
+        os.makedirs(path, exist_ok=True)
+        files = [(_FORECAST, (n_scenarios, window + 2, len(LINE_ITEMS)))]
+        files.extend((name + '.npy', (n_scenarios,)) for name in VALUATION_FIELDS)
+        for name, shape in files:
+            np.lib.format.open_memmap(os.path.join(path, name), mode='w+', dtype=np.float64, shape=shape).flush()
+        # Metadata is written last, so a store only opens once all of its files exist.
+        with open(os.path.join(path, _META), 'w') as f:
+            json.dump({'version': STORE_VERSION, 'window': window, 'line_items': list(LINE_ITEMS)}, f)
+        return cls(path)
+
+    @classmethod
+    def sweep(cls, path, company, assumptions, chunk_size=100000):
+        """Value company under every scenario, writing forecasts and valuations to a new store chunk by chunk.
+
+        Only one chunk of scenarios is held in memory at a time.
+
+        Args:
+            path (str): Directory to create store in.
+            company (autodcf.company.Company): Company to value.
+            assumptions (dict): Keyword arguments of :class:`autodcf.models.BatchDCF` other than company, e.g. from
+                :meth:`autodcf.models.DCF.batch_assumptions` with some assumptions replaced by arrays with one value
+                (or row of values) per scenario.
+            chunk_size (int, optional): Number of scenarios to value at once. Defaults to 100,000.
+
+        Returns:
+            store (ScenarioStore): Store of scenarios.
+        """
+        n_scenarios = _n_scenarios(assumptions)
+        store = cls.create(path, n_scenarios, assumptions['window'])
+        for start in range(0, n_scenarios, chunk_size):
+            stop = min(start + chunk_size, n_scenarios)
+            store.write(start, BatchDCF(company=company, **_chunk(assumptions, n_scenarios, start, stop)))
+        return store
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def line_items(self):
+        """Names of line items along the last axis of forecast."""
+        return self._line_items
+
+    @property
+    def n_scenarios(self):
+        return self._forecast.shape[0]
+
+    @property
+    def forecast(self):
+        """Memory-mapped array of forecasts with shape (scenarios, window + 2, len(line_items))."""
+        return self._forecast
+
+    def line(self, name):
+        """Memory-mapped view of one line item with shape (scenarios, window + 2).
+
+        Args:
+            name (str): Name of line item (e.g. 'FCF').
+        """
+        return self._forecast[:, :, self._line_items.index(name)]
+
+    def valuation(self, name):
+        """Memory-mapped array of one valuation with one value per scenario.
+
+        Args:
+            name (str): One of VALUATION_FIELDS.
+        """
+        if name not in VALUATION_FIELDS:
+            raise ValueError("Valuation must be one of {0}. Given {1}.".format(VALUATION_FIELDS, name))
+        return self._valuation[name]
+
+    def write(self, start, batch):
+        """Write forecasts and valuations of every scenario of batch.
+
+        Args:
+            start (int): Position in store of first scenario of batch.
+            batch (autodcf.models.BatchDCF): Scenarios to write.
+
+        Returns:
+            stop (int): Position in store after last scenario written.
+        """
+        forecast = batch.forecast()
+        stop = start + len(forecast)
+        if stop > self.n_scenarios:
+            raise ValueError("Store has room for {0} scenarios, but scenarios {1} through {2} were written.".format(
+                self.n_scenarios, start, stop - 1))
+        arrays = [(_FORECAST, self._forecast, forecast)]
+        arrays.extend((name + '.npy', self._valuation[name], values) for name, values in batch.valuation().items())
+        for name, stored, values in arrays:
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            with open(os.path.join(self.path, name), 'r+b') as f:
+                # Offset of a memory map loaded from a .npy file is the length of its header.
+                f.seek(stored.offset + start * stored[:1].nbytes)
+                f.write(values.data)
+        return stop
+
+    def chunks(self, chunk_size=100000):
+        """Yield (start, stop) bounds of consecutive chunks of scenarios, to aggregate a store a chunk at a time."""
+        for start in range(0, self.n_scenarios, chunk_size):
+            yield start, min(start + chunk_size, self.n_scenarios)
+
+    def stats(self, name='equity_value_per_share', chunk_size=100000, bins=1000, hist_range=None):
+        """Summary statistics of one valuation across every scenario, read a chunk at a time.
+
+        Args:
+            name (str, optional): One of VALUATION_FIELDS. Defaults to equity_value_per_share.
+            chunk_size (int, optional): Number of scenarios to read at once. Defaults to 100,000.
+            bins (int, optional): Number of histogram bins. Defaults to 1,000.
+            hist_range (tuple, optional): (low, high) range of histogram. Defaults to range set from first chunk.
+
+        Returns:
+            stats (autodcf.models.monte_carlo.StreamingStats): Summary statistics.
+        """
+        values = self.valuation(name)
+        stats = StreamingStats(bins=bins, hist_range=hist_range)
+        for start, stop in self.chunks(chunk_size):
+            stats.update(values[start:stop])
+        return stats
@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from autodcf.models._kernel import DISCOUNTED_FCF, LINE_ITEMS
+
+
+class TerminalValue(ABC):
+    """Abstract base class for methods of valuing cash flows after the terminal year.
+
+    Parameters of methods may be single values, or arrays with one value per scenario when used with
+    :class:`autodcf.models.BatchDCF`.
+    """
+
+    @property
+    @abstractmethod
+    def parameters(self):
+        """Mapping of argument names to values, such that ``type(self)(**parameters)`` builds the same method."""
+        pass
+
+    @abstractmethod
+    def discounted_value(self, forecast, terminal_discount_rate, terminal_growth_rate, compounding):
+        """Value of cash flows after the terminal year, discounted to today.
+
+        Args:
+            forecast (np.ndarray): Forecast with shape (window + 2, len(LINE_ITEMS)), or (scenarios, window + 2,
+                len(LINE_ITEMS)) for many scenarios.
+            terminal_discount_rate (Union[float, np.ndarray]): Discount rate after terminal year, as a single value or
+                one value per scenario.
+            terminal_growth_rate (Union[float, np.ndarray]): Perpetual growth rate, as a single value or one value per
+                scenario.
+            compounding (Union[float, np.ndarray]): Growth of one unit over the window at the discount rate, as a
+                single value or one value per scenario.
+
+        Returns:
+            Discounted terminal value as a float, or numpy array with one value per scenario.
+        """
+        pass
+
+    def __repr__(self):
+        parameters = ', '.join('{0}={1!r}'.format(name, value) for name, value in self.parameters.items())
+        return '{0}({1})'.format(type(self).__name__, parameters)
+
+
+class PerpetuityGrowth(TerminalValue):
+    """Cash flow of the terminal year grows at the terminal growth rate forever (Gordon growth).
+
+    This is the terminal value of every DCF that is not given another method.
+    """
+
+    @property
+    def parameters(self):
+        return {}
+
+    def discounted_value(self, forecast, terminal_discount_rate, terminal_growth_rate, compounding):
+        last_fcf = forecast[..., -1, DISCOUNTED_FCF]
+        terminal_discount_minus_growth = terminal_discount_rate - terminal_growth_rate
+        tv_discounted_to_window = last_fcf * (1 + terminal_growth_rate) / terminal_discount_minus_growth
+        return tv_discounted_to_window / compounding
+
+
+class ExitMultiple(TerminalValue):
+    """Business is sold at the end of the terminal year for a multiple of a line item (EV/EBITDA by default).
+
+    Args:
+        multiple (Union[float, np.ndarray]): Multiple of line item the business is sold for.
+        line_item (str, optional): Line item of the terminal year the multiple applies to. One of LINE_ITEMS.
+            Defaults to EBITDA.
+    """
+
+    def __init__(self, multiple, line_item='EBITDA'):
+        if line_item not in LINE_ITEMS:
+            raise ValueError("Line item must be one of {0}. Given {1}.".format(LINE_ITEMS, line_item))
+        self._multiple = multiple
+        self._line_item = line_item
+
+    @property
+    def multiple(self):
+        return self._multiple
+
+    @property
+    def line_item(self):
+        return self._line_item
+
+    @property
+    def parameters(self):
+        return {'multiple': self.multiple, 'line_item': self.line_item}
+
+    def discounted_value(self, forecast, terminal_discount_rate, terminal_growth_rate, compounding):
+        terminal_line = forecast[..., -1, LINE_ITEMS.index(self.line_item)]
+        return np.asarray(self.multiple) * terminal_line / compounding
+
+
+class HModel(TerminalValue):
+    """Growth after the terminal year starts at high_growth_rate and declines linearly to the terminal growth rate.
+
+    Uses the H-model approximation, which adds half_life * (high_growth_rate - terminal_growth_rate) times the cash
+    flow of the terminal year to the perpetuity growth value. With high_growth_rate equal to the terminal growth rate,
+    this is the same as :class:`PerpetuityGrowth`.
+
+    Args:
+        high_growth_rate (Union[float, np.ndarray]): Growth rate just after the terminal year.
+        half_life (Union[float, np.ndarray]): Half of the number of years growth takes to decline to the terminal
+            growth rate.
+    """
+
+    def __init__(self, high_growth_rate, half_life):
+        self._high_growth_rate = high_growth_rate
+        self._half_life = half_life
+
+    @property
+    def high_growth_rate(self):
+        return self._high_growth_rate
+
+    @property
+    def half_life(self):
+        return self._half_life
+
+    @property
+    def parameters(self):
+        return {'high_growth_rate': self.high_growth_rate, 'half_life': self.half_life}
+
+    def discounted_value(self, forecast, terminal_discount_rate, terminal_growth_rate, compounding):
+        last_fcf = forecast[..., -1, DISCOUNTED_FCF]
+        terminal_discount_minus_growth = terminal_discount_rate - terminal_growth_rate
+        high_minus_growth = np.asarray(self.high_growth_rate) - terminal_growth_rate
+        growth = (1 + terminal_growth_rate) + np.asarray(self.half_life) * high_minus_growth
+        tv_discounted_to_window = last_fcf * growth / terminal_discount_minus_growth
+        return tv_discounted_to_window / compounding
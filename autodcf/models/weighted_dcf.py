@@ -0,0 +1,180 @@
+import numpy as np
+
+from autodcf.models import _kernel
+from autodcf.models.batch_dcf import BatchDCF
+from autodcf.models.dcf import PER_PERIOD_ASSUMPTIONS, VALUATIONS
+from autodcf.models.discount_curve import DiscountCurve
+from autodcf.models.terminal_value import PerpetuityGrowth
+
+# Weights must sum to 1 to within this tolerance.
+_WEIGHT_TOLERANCE = 1e-9
+
+
+def _stack_terminal_values(terminal_values):
+    """Combine terminal values of one class into one with an array of parameters per scenario."""
+    terminal_values = [PerpetuityGrowth() if terminal_value is None else terminal_value
+                       for terminal_value in terminal_values]
+    methods = {type(terminal_value) for terminal_value in terminal_values}
+    if len(methods) > 1:
+        raise ValueError("Cases must share one terminal value method. Given {0}.".format(
+            sorted(method.__name__ for method in methods)))
+    parameters = {}
+    for name, value in terminal_values[0].parameters.items():
+        values = [terminal_value.parameters[name] for terminal_value in terminal_values]
+        if isinstance(value, str):
+            if len(set(values)) > 1:
+                raise ValueError("Cases must share {0} of terminal value. Given {1}.".format(name, sorted(set(values))))
+            parameters[name] = value
+        else:
+            parameters[name] = np.array(values, dtype=float)
+    return methods.pop()(**parameters)
+
+
+class WeightedDCF:
+    """Probability-weighted valuation of a DCF under several named cases (e.g. bear, base and bull).
+
+    Each case overrides some assumptions of a DCF. Every case is valued together in one
+    :class:`autodcf.models.BatchDCF`, with one scenario per case, and the expected value is the weighted sum of the
+    case values.
+
+    Args:
+        dcf (autodcf.models.DCF): DCF giving the assumptions of every case that are not overridden.
+        cases (dict): Mapping of case names to dictionaries of assumptions to override, as taken by DCF (including
+            terminal_value). Window cannot be overridden. Cases with a discount curve must all share it.
+        weights (dict): Mapping of every case name to its probability. Weights must sum to 1.
+
+    Example:
+        >>> weighted = WeightedDCF(dcf,
+        ...                        cases={'bear': {'sales_growth': 0.0, 'terminal_value': ExitMultiple(6)},
+        ...                               'base': {'terminal_value': ExitMultiple(8)},
+        ...                               'bull': {'sales_growth': 0.2, 'terminal_value': ExitMultiple(11)}},
+        ...                        weights={'bear': 0.25, 'base': 0.5, 'bull': 0.25})
+        >>> weighted.expected('equity_value_per_share')
+    """
+
+    def __init__(self, dcf, cases, weights):
+        if set(cases) != set(weights):
+            raise ValueError("Weights must be given for exactly the cases given. Cases {0}, weights {1}.".format(
+                sorted(cases), sorted(weights)))
+        names = tuple(cases)
+        weight_values = np.array([weights[name] for name in names], dtype=float)
+        if (weight_values < 0).any() or abs(weight_values.sum() - 1) > _WEIGHT_TOLERANCE:
+            raise ValueError("Weights must be non-negative and sum to 1. Given {0}.".format(weights))
+        self._dcf = dcf
+        self._cases = {name: dict(cases[name]) for name in names}
+        self._names = names
+        self._weights = weight_values
+        self._batch = None
+
+    @property
+    def dcf(self):
+        return self._dcf
+
+    @property
+    def cases(self):
+        """Mapping of case names to assumptions they override."""
+        return self._cases
+
+    @property
+    def names(self):
+        """Names of cases, in the order of case values."""
+        return self._names
+
+    @property
+    def weights(self):
+        """Numpy array of weights of each case, in the order of names."""
+        return self._weights
+
+    def case_assumptions(self):
+        """Get keyword arguments of :class:`autodcf.models.BatchDCF` for each case, before stacking.
+
+        Returns:
+            Dictionary mapping case names to assumptions as given by :meth:`autodcf.models.DCF.batch_assumptions`.
+        """
+        base = self.dcf.batch_assumptions()
+        assumptions = {}
+        for name in self.names:
+            case = dict(base)
+            for assumption, value in self.cases[name].items():
+                if assumption == 'window' or assumption not in base:
+                    raise ValueError("Case {0} cannot override {1}.".format(name, assumption))
+                case[assumption] = _kernel.as_row(value) if assumption in PER_PERIOD_ASSUMPTIONS else value
+            assumptions[name] = case
+        return assumptions
+
+    def _stack(self):
+        """Stack assumptions of every case into keyword arguments of a BatchDCF with one scenario per case."""
+        case_assumptions = self.case_assumptions()
+        cases = [case_assumptions[name] for name in self.names]
+        stacked = {'window': self.dcf.window}
+        for assumption in PER_PERIOD_ASSUMPTIONS:
+            rows = [case[assumption] for case in cases]
+            width = max(row.shape[1] for row in rows)
+            stacked[assumption] = np.vstack([np.broadcast_to(row, (1, width)) for row in rows])
+        discount_rates = [case['discount_rate'] for case in cases]
+        curves = [rate for rate in discount_rates if isinstance(rate, DiscountCurve)]
+        if curves:
+            if len(curves) < len(cases) or any(curve is not curves[0] for curve in curves):
+                raise ValueError("Cases with a discount curve must all share the same curve.")
+            stacked['discount_rate'] = curves[0]
+            default_terminal = curves[0].terminal_rate
+        else:
+            stacked['discount_rate'] = np.array(discount_rates, dtype=float)
+            default_terminal = stacked['discount_rate']
+        terminal_discount_rates = [case['terminal_discount_rate'] for case in cases]
+        if all(rate is None for rate in terminal_discount_rates):
+            stacked['terminal_discount_rate'] = None
+        else:
+            defaults = np.broadcast_to(default_terminal, (len(cases),))
+            stacked['terminal_discount_rate'] = np.array([default if rate is None else rate
+                                                          for rate, default in zip(terminal_discount_rates, defaults)],
+                                                         dtype=float)
+        stacked['terminal_growth_rate'] = np.array([case['terminal_growth_rate'] for case in cases], dtype=float)
+        stacked['terminal_value'] = _stack_terminal_values([case['terminal_value'] for case in cases])
+        mid_years = {bool(case['mid_year']) for case in cases}
+        if len(mid_years) > 1:
+            raise ValueError("Cases must share one mid-year convention.")
+        stacked['mid_year'] = mid_years.pop()
+        return stacked
+
+    @property
+    def batch(self):
+        """:class:`autodcf.models.BatchDCF` valuing every case, with one scenario per case in the order of names."""
+        if self._batch is None:
+            self._batch = BatchDCF(company=self.dcf.company, **self._stack())
+        return self._batch
+
+    def case_values(self, value='equity_value_per_share'):
+        """Get valuation of each case.
+
+        Args:
+            value (str, optional): One of VALUATIONS. Defaults to equity_value_per_share.
+
+        Returns:
+            Numpy array with one value per case, in the order of names.
+        """
+        if value not in VALUATIONS:
+            raise ValueError("Value must be one of {0}. Given {1}.".format(VALUATIONS, value))
+        return np.broadcast_to(getattr(self.batch, value), (len(self.names),))
+
+    def expected(self, value='equity_value_per_share'):
+        """Get probability-weighted valuation across cases.
+
+        Args:
+            value (str, optional): One of VALUATIONS. Defaults to equity_value_per_share.
+        """
+        return float(self.weights @ self.case_values(value))
+
+    def table(self):
+        """Get valuations of every case and their weighted expectation.
+
+        Returns:
+            table (pd.DataFrame): One row per case plus an expected row, with a weight column and one column per
+                valuation in VALUATIONS.
+        """
+        import pandas as pd
+        table = pd.DataFrame({value: self.case_values(value) for value in VALUATIONS}, index=list(self.names))
+        table.insert(0, 'weight', self.weights)
+        table.loc['expected'] = self.weights @ table.values
+        table.loc['expected', 'weight'] = self.weights.sum()
+        return table
@@ -0,0 +1,267 @@
+"""Event-driven revaluation of many companies as new statements and prices arrive.
+
+Companies are valued as in :class:`autodcf.models.SimpleDCF`. Each update recomputes only what it affects:
+
+* a new income statement or cash flows statement changes the forecast, so the company is valued again in full,
+* a new balance sheet only changes net debt, so equity values are recomputed from the kept enterprise value,
+* a price tick only changes upside, so only absolute and percent upside are recomputed.
+
+Companies whose forecasts changed in the same batch of events are valued together in one vectorized evaluation.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from autodcf.company.balance_sheet import BalanceSheet
+from autodcf.company.cash_flows import CashFlows
+from autodcf.company.company import Company
+from autodcf.company.income_statement import IncomeStatement
+from autodcf.models.portfolio import COMPANY_FIELDS, SCENARIO_FIELDS, company_values, value_rows
+
+# Values kept for each company, in the order of ValuationChange.values.
+VALUES = ('enterprise_value',
+          'equity_value',
+          'equity_value_per_share',
+          'absolute_upside_per_share',
+          'percent_upside_per_share')
+
+# How much of a valuation each kind of update invalidates, from most to least.
+FORECAST, EQUITY, UPSIDE = range(3)
+
+StatementUpdate = namedtuple('StatementUpdate', ['label', 'statement'])
+StatementUpdate.__doc__ = """New income statement, balance sheet or cash flows statement of the company with label."""
+
+PriceTick = namedtuple('PriceTick', ['label', 'price_per_share'])
+PriceTick.__doc__ = """New price per share of the company with label."""
+
+ValuationChange = namedtuple('ValuationChange', ['label', 'causes', 'previous', 'values'])
+ValuationChange.__doc__ = """Change of valuation of the company with label.
+
+causes is a tuple of the kinds of updates that led to the change (any of 'company', 'income_statement',
+'balance_sheet', 'cash_flows' and 'price'). previous and values map VALUES to values before and after the change.
+previous is None for a company just added.
+"""
+
+_STATEMENTS = ((IncomeStatement, 'income_statement', FORECAST),
+               (CashFlows, 'cash_flows', FORECAST),
+               (BalanceSheet, 'balance_sheet', EQUITY))
+
+
+def _changed(previous, values):
+    """Whether values differ from previous values, counting NaN as equal to NaN."""
+    if previous is None:
+        return True
+    if previous == values:
+        return False
+    # NaN != NaN, so only unequal values that are not both NaN count as changed.
+    for name in VALUES:
+        old, new = previous[name], values[name]
+        if not (old == new or (old != old and new != new)):
+            return True
+    return False
+
+
+class RevaluationPipeline:
+    """Keep valuations of many companies up to date as statements and prices stream in.
+
+    Events are :class:`StatementUpdate` and :class:`PriceTick`. Each call to :meth:`process` applies a batch of
+    events, revalues every company they touched as little as needed, and returns one :class:`ValuationChange` per
+    company whose valuation changed. Several events for one company in a batch give a single change.
+
+    Args:
+        assumptions (dict): Mapping of sales_growth, discount_rate, terminal_growth_rate,
+            change_in_nwc_to_change_in_sales and tax_rate to values used for every company.
+        window (int, optional): Number of years until terminal year. Defaults to 5.
+        callback (callable, optional): Called with each change, after every change of its batch is computed.
+
+    Example:
+        >>> pipeline = RevaluationPipeline(assumptions)
+        >>> pipeline.add('ACME', company)
+        >>> for change in pipeline.stream(events):
+        ...     print(change.label, change.values['percent_upside_per_share'])
+    """
+
+    def __init__(self, assumptions, window=5, callback=None):
+        missing = [field for field in SCENARIO_FIELDS if field not in assumptions]
+        if missing:
+            raise ValueError("Missing assumptions {0}.".format(missing))
+        self._assumptions = {field: float(assumptions[field]) for field in SCENARIO_FIELDS}
+        self._window = window
+        self._callback = callback
+        self._companies = {}
+        self._values = {}
+        self._stats = {'events': 0, 'forecasts': 0, 'equity_updates': 0, 'upside_updates': 0, 'changes': 0}
+
+    @property
+    def assumptions(self):
+        return dict(self._assumptions)
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def labels(self):
+        """Labels of companies being kept up to date, in the order they were added."""
+        return list(self._companies)
+
+    @property
+    def stats(self):
+        """Counts of events applied, companies forecast, equity values and upsides recomputed, and changes emitted."""
+        return dict(self._stats)
+
+    def company(self, label):
+        """Company with label, with its latest statements and price."""
+        return self._companies[label]
+
+    def values(self, label):
+        """Latest valuation of company with label, as a dictionary mapping VALUES to values."""
+        return dict(self._values[label])
+
+    def add(self, label, company):
+        """Start keeping company up to date, valuing it at once.
+
+        Args:
+            label (Hashable): Label (e.g. ticker) that events refer to the company by.
+            company (autodcf.company.Company): Company to value. Its statements are kept, but the company object
+                itself is not changed by later events.
+
+        Returns:
+            change (ValuationChange): Valuation of company, with previous None.
+        """
+        if label in self._companies:
+            raise ValueError("Company {0} has already been added.".format(label))
+        self._companies[label] = Company(fully_diluted_shares=company.fully_diluted_shares,
+                                         price_per_share=company.price_per_share,
+                                         balance_sheet=company.balance_sheet,
+                                         cash_flows=company.cash_flows,
+                                         income_statement=company.income_statement)
+        return self._revalue({label: (FORECAST, ['company'])})[0]
+
+    def _apply(self, event):
+        """Apply event to its company.
+
+        Returns:
+            Tuple of how much of the valuation the event invalidates and the kind of update.
+        """
+        if isinstance(event, PriceTick):
+            level, name = UPSIDE, 'price'
+        elif isinstance(event, StatementUpdate):
+            for statement_class, name, level in _STATEMENTS:
+                if isinstance(event.statement, statement_class):
+                    break
+            else:
+                raise TypeError("Statement must be an IncomeStatement, BalanceSheet or CashFlows. Given {0}.".format(
+                    type(event.statement).__name__))
+        else:
+            raise TypeError("Event must be a StatementUpdate or PriceTick. Given {0}.".format(type(event).__name__))
+        if event.label not in self._companies:
+            raise KeyError("Unknown company {0}. Add it before sending events for it.".format(event.label))
+        company = self._companies[event.label]
+        if name == 'price':
+            company.price_per_share = event.price_per_share
+        else:
+            setattr(company, name, event.statement)
+        return level, name
+
+    def process(self, events):
+        """Apply a batch of events and revalue the companies they touched.
+
+        Args:
+            events (Iterable): StatementUpdate and PriceTick events, applied in order.
+
+        Returns:
+            List of ValuationChange, one for each company whose valuation changed, in the order companies were
+            first touched.
+
+        Raises:
+            TypeError, KeyError: If an event is not a known kind or refers to a company not added. Events before
+                it are still applied and their companies revalued, with the resulting list of ValuationChange
+                attached to the error as its changes attribute.
+        """
+        dirty = {}
+        try:
+            for event in events:
+                level, cause = self._apply(event)
+                self._stats['events'] += 1
+                previous_level, causes = dirty.setdefault(event.label, (level, []))
+                if cause not in causes:
+                    causes.append(cause)
+                dirty[event.label] = (min(level, previous_level), causes)
+        except Exception as error:
+            # Keep valuations in step with the events already applied before passing on the error.
+            error.changes = self._revalue(dirty)
+            raise
+        return self._revalue(dirty)
+
+    def stream(self, events, batch_size=1):
+        """Apply events as they arrive, yielding changes after each batch.
+
+        Args:
+            events (Iterable): Possibly unending iterable of StatementUpdate and PriceTick events.
+            batch_size (int, optional): Number of events to apply before revaluing. Larger batches forecast more
+                companies per vectorized evaluation, but hold back changes until the batch is full. Defaults to 1.
+
+        Yields:
+            change (ValuationChange): Change of one company's valuation.
+
+        Raises:
+            TypeError, KeyError: As :meth:`process`, with changes of the failed batch attached to the error.
+        """
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) >= batch_size:
+                yield from self.process(batch)
+                batch = []
+        if batch:
+            yield from self.process(batch)
+
+    def _revalue(self, dirty):
+        """Revalue companies, each from the stage its updates invalidated.
+
+        Args:
+            dirty (dict): Mapping of labels to tuples of invalidated level and list of causes.
+
+        Returns:
+            List of ValuationChange.
+        """
+        forecast = [label for label, (level, _) in dirty.items() if level == FORECAST]
+        enterprise_values = dict(zip(forecast, self._enterprise_values(forecast)))
+        changes = []
+        for label, (level, causes) in dirty.items():
+            company = self._companies[label]
+            previous = self._values.get(label)
+            values = dict(previous) if previous is not None else {}
+            if level <= EQUITY:
+                if level == FORECAST:
+                    values['enterprise_value'] = enterprise_values[label]
+                else:
+                    self._stats['equity_updates'] += 1
+                # Same operations as value_rows, so results match a full valuation exactly.
+                values['equity_value'] = values['enterprise_value'] - company.balance_sheet.net_debt
+                values['equity_value_per_share'] = values['equity_value'] / company.fully_diluted_shares
+            else:
+                self._stats['upside_updates'] += 1
+            price_per_share = company.price_per_share
+            values['absolute_upside_per_share'] = values['equity_value_per_share'] - price_per_share
+            values['percent_upside_per_share'] = values['absolute_upside_per_share'] / price_per_share
+            values = {name: values[name] for name in VALUES}
+            self._values[label] = values
+            if _changed(previous, values):
+                changes.append(ValuationChange(label, tuple(causes), previous, values))
+        self._stats['changes'] += len(changes)
+        if self._callback is not None:
+            for change in changes:
+                self._callback(change)
+        return changes
+
+    def _enterprise_values(self, labels):
+        """Forecast and value companies with labels together."""
+        if not labels:
+            return []
+        self._stats['forecasts'] += len(labels)
+        rows = np.array([company_values(self._companies[label]) for label in labels], dtype=float)
+        companies = {field: rows[:, i] for i, field in enumerate(COMPANY_FIELDS)}
+        scenarios = {field: np.full(len(labels), value) for field, value in self._assumptions.items()}
+        return value_rows(companies, scenarios, self.window)['enterprise_value'].tolist()
@@ -0,0 +1,365 @@
+"""Screening of many companies on fundamentals and DCF upside.
+
+Every metric is computed once for the whole universe, as one array over the columns of a
+:class:`autodcf.company.CompanyTable`, so filtering, ranking and sorting never touch per-company objects.
+
+Example:
+    >>> screen = Screen(table, sectors=sectors, assumptions={'sales_growth': 0.05, 'discount_rate': 0.1,
+    ...                                                       'terminal_growth_rate': 0.02,
+    ...                                                       'change_in_nwc_to_change_in_sales': 0.1,
+    ...                                                       'tax_rate': 0.21})
+    >>> screen.filter('net_debt < 0 and rank(operating_margin) > 0.75').top(20).table()
+"""
+import ast
+import copy
+import operator
+import sys
+
+import numpy as np
+
+from autodcf.company.balance_sheet import DERIVED_METRICS
+from autodcf.company.company_table import CompanyTable
+from autodcf.models.portfolio import RESULT_FIELDS, SCENARIO_FIELDS, company_arrays, value_rows
+
+
+def _margin(line):
+    return lambda table: line(table.income_statements) / table.income_statements['sales']
+
+
+def _gross_profit(income_statements):
+    return income_statements['sales'] - income_statements['cogs']
+
+
+def _operating_profit(income_statements):
+    return _gross_profit(income_statements) - income_statements['sga']
+
+
+def _ebitda(income_statements):
+    return _operating_profit(income_statements) - income_statements['rd']
+
+
+def _ebit(income_statements):
+    return _ebitda(income_statements) - income_statements.da
+
+
+def _net_income(income_statements):
+    return _ebit(income_statements) - income_statements['interest'] - income_statements['tax']
+
+
+# Metrics computed from the income statements and prices of a CompanyTable. Margins follow the lines of the DCF
+# forecast.
+_COLUMN_METRICS = {'sales': lambda table: table.income_statements['sales'],
+                   'gross_margin': _margin(_gross_profit),
+                   'operating_margin': _margin(_operating_profit),
+                   'ebitda_margin': _margin(_ebitda),
+                   'ebit_margin': _margin(_ebit),
+                   'net_margin': _margin(_net_income),
+                   'price_per_share': lambda table: table.price_per_share,
+                   'fully_diluted_shares': lambda table: table.fully_diluted_shares,
+                   'market_cap': lambda table: table.price_per_share * table.fully_diluted_shares}
+
+# Metrics computed from the statements of a CompanyTable. Balance sheet metrics are computed together by
+# BalanceSheetTable.derived_metrics.
+STATEMENT_METRICS = tuple(_COLUMN_METRICS) + DERIVED_METRICS
+
+_COMPARISONS = {ast.Lt: operator.lt,
+                ast.LtE: operator.le,
+                ast.Gt: operator.gt,
+                ast.GtE: operator.ge,
+                ast.Eq: operator.eq,
+                ast.NotEq: operator.ne}
+
+# Numeric literals are ast.Num before Python 3.8 and ast.Constant from then on. Empty tuples match no node on
+# versions without either class.
+_CONSTANT = getattr(ast, 'Constant', ())
+_NUM = getattr(ast, 'Num', ()) if sys.version_info < (3, 8) else ()
+
+_BINARY = {ast.Add: operator.add,
+           ast.Sub: operator.sub,
+           ast.Mult: operator.mul,
+           ast.Div: operator.truediv,
+           ast.Pow: operator.pow}
+
+
+def percentile_ranks(values, groups=None):
+    """Percentile rank of each value among the values of its group.
+
+    The rank of a value is the fraction of its group with values less than or equal to it, so the largest value of
+    each group has rank 1. NaN values are left out of every group and have NaN rank.
+
+    Args:
+        values (np.ndarray): Values to rank.
+        groups (np.ndarray, optional): Integer group code of each value. Defaults to one group.
+
+    Returns:
+        Numpy array with one rank per value.
+    """
+    values = np.asarray(values, dtype=float)
+    groups = np.zeros(len(values), dtype=np.intp) if groups is None else np.asarray(groups)
+    ranks = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if not valid.size:
+        return ranks
+    order = valid[np.lexsort((values[valid], groups[valid]))]
+    sorted_values, sorted_groups = values[order], groups[order]
+    positions = np.arange(len(order))
+    new_group = np.flatnonzero(np.diff(sorted_groups)) + 1
+    group_starts = np.concatenate(([0], new_group))
+    group_ends = np.concatenate((new_group, [len(order)]))
+    group = np.searchsorted(group_starts, positions, side='right') - 1
+    # Last position of each run of equal values, so ties share the rank of the last of them.
+    run_ends = np.flatnonzero((np.diff(sorted_values) != 0) | (np.diff(sorted_groups) != 0))
+    run_ends = np.concatenate((run_ends, [len(order) - 1]))
+    run_end = run_ends[np.searchsorted(run_ends, positions)]
+    ranks[order] = (run_end - group_starts[group] + 1) / (group_ends - group_starts)[group]
+    return ranks
+
+
+class Screen:
+    """Filter, rank and sort a universe of companies on fundamentals and DCF upside.
+
+    Metrics are the names in STATEMENT_METRICS, the valuations in RESULT_FIELDS (with assumptions given) and any
+    extra columns given. Each is computed for the whole universe the first time it is used and shared by every
+    screen derived from this one. :meth:`filter` and :meth:`top` return new screens holding a subset of the
+    companies, so they can be chained.
+
+    Valuations use :func:`autodcf.models.portfolio.value_rows`, with ratios to sales taken from each company's most
+    recent statements as in :class:`autodcf.models.SimpleDCF`.
+
+    Args:
+        companies (Union[autodcf.company.CompanyTable, Iterable[autodcf.company.Company]]): Universe of companies.
+        sectors (Iterable, optional): Sector (or any other peer group) of each company, used by
+            :meth:`percentile_rank`. Defaults to one group for every company.
+        assumptions (dict, optional): Mapping of SCENARIO_FIELDS to a single value or one value per company, used to
+            value every company. Valuation metrics are unavailable without it.
+        window (int, optional): Number of years until terminal year. Defaults to 5.
+        columns (dict, optional): Mapping of extra metric names to arrays with one value per company.
+        chunk_size (int, optional): Number of companies to value at once. Forecasts of small chunks stay in cache,
+            which is much faster than forecasting the whole universe at once. Defaults to 2048.
+    """
+
+    def __init__(self, companies, sectors=None, assumptions=None, window=5, columns=None, chunk_size=2048):
+        if not isinstance(companies, CompanyTable):
+            companies = CompanyTable.from_companies(companies)
+        n = len(companies)
+        if assumptions is not None:
+            missing = [field for field in SCENARIO_FIELDS if field not in assumptions]
+            if missing:
+                raise ValueError("Missing assumptions {0}.".format(missing))
+        columns = {name: np.asarray(values) for name, values in (columns or {}).items()}
+        for name, values in columns.items():
+            if name in STATEMENT_METRICS or name in RESULT_FIELDS:
+                raise ValueError("Column {0} has the name of a built-in metric.".format(name))
+            if values.shape != (n,):
+                raise ValueError("Column {0} must have one value per company. Given shape {1}.".format(
+                    name, values.shape))
+        if sectors is None:
+            self._sectors, self._sector_codes = np.array([None]), np.zeros(n, dtype=np.intp)
+        else:
+            self._sectors, self._sector_codes = np.unique(np.asarray(sectors), return_inverse=True)
+            if len(self._sector_codes) != n:
+                raise ValueError("Sectors must have one value per company. Given {0} for {1} companies.".format(
+                    len(self._sector_codes), n))
+        self._companies = companies
+        self._assumptions = assumptions
+        self._window = window
+        self._chunk_size = chunk_size
+        self._columns = tuple(columns)
+        self._metrics = columns
+        self._rows = np.arange(n)
+
+    @property
+    def companies(self):
+        """CompanyTable of the whole universe."""
+        return self._companies
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def rows(self):
+        """Positions in the universe of the companies in this screen, in order."""
+        return self._rows
+
+    @property
+    def labels(self):
+        """Labels of the companies in this screen, in order."""
+        return self._companies.labels[self._rows]
+
+    @property
+    def sectors(self):
+        """Sector of each company in this screen, in order."""
+        return self._sectors[self._sector_codes[self._rows]]
+
+    @property
+    def metric_names(self):
+        """Names of every metric available to this screen."""
+        names = list(STATEMENT_METRICS)
+        if self._assumptions is not None:
+            names.extend(RESULT_FIELDS)
+        return tuple(names) + self._columns
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _universe_metric(self, name):
+        """Array of metric over the whole universe, computed on first use."""
+        try:
+            return self._metrics[name]
+        except KeyError:
+            pass
+        if name in _COLUMN_METRICS:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._metrics[name] = _COLUMN_METRICS[name](self._companies)
+        elif name in DERIVED_METRICS:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self._metrics.update(self._companies.balance_sheets.derived_metrics())
+        elif name in RESULT_FIELDS and self._assumptions is not None:
+            self._metrics.update(self._value())
+        else:
+            raise ValueError("Unknown metric {0}. Choose one of {1}.".format(name, self.metric_names))
+        return self._metrics[name]
+
+    def _value(self):
+        """Value every company in the universe, a chunk of companies at a time."""
+        n = len(self._companies)
+        companies = company_arrays(self._companies)
+        scenarios = {field: np.broadcast_to(np.asarray(self._assumptions[field], dtype=float), (n,))
+                     for field in SCENARIO_FIELDS}
+        results = {field: np.empty(n) for field in RESULT_FIELDS}
+        for start in range(0, n, self._chunk_size):
+            stop = start + self._chunk_size
+            with np.errstate(divide='ignore', invalid='ignore'):
+                chunk = value_rows({field: arr[start:stop] for field, arr in companies.items()},
+                                   {field: arr[start:stop] for field, arr in scenarios.items()},
+                                   self.window)
+            for field in RESULT_FIELDS:
+                results[field][start:stop] = chunk[field]
+        return results
+
+    def metric(self, name):
+        """Get metric for each company in this screen, in order.
+
+        Args:
+            name (str): One of metric_names.
+
+        Returns:
+            Numpy array with one value per company.
+        """
+        return self._universe_metric(name)[self._rows]
+
+    def percentile_rank(self, name, by_sector=True):
+        """Get percentile rank of metric for each company among its peers in this screen.
+
+        See :func:`percentile_ranks`. Companies are ranked against the other companies of this screen, so rank
+        the universe before filtering to rank against every company.
+
+        Args:
+            name (str): One of metric_names.
+            by_sector (bool, optional): Rank within sectors rather than across every company. Defaults to True.
+
+        Returns:
+            Numpy array with one rank per company, between 0 and 1.
+        """
+        return percentile_ranks(self.metric(name), self._sector_codes[self._rows] if by_sector else None)
+
+    def _select(self, rows):
+        """New screen of the companies at positions rows of the universe, sharing computed metrics."""
+        screen = copy.copy(self)
+        screen._rows = rows
+        return screen
+
+    def filter(self, expression):
+        """Keep companies for which expression is true.
+
+        Expressions are strings combining metric names and numbers with arithmetic, comparisons, ``and``, ``or``
+        and ``not`` (e.g. ``'net_debt < 0 and debt_to_equity < 1.5'``), and ``rank(metric)`` for the
+        :meth:`percentile_rank` of a metric within sectors. Each operation is evaluated on whole arrays. A callable
+        taking this screen and returning a boolean array with one value per company may be given instead.
+        Companies with NaN metrics fail any comparison.
+
+        Args:
+            expression (Union[str, callable]): Condition to keep companies by.
+
+        Returns:
+            screen (Screen): Screen of the companies kept, in their current order.
+        """
+        if callable(expression):
+            mask = np.asarray(expression(self), dtype=bool)
+        else:
+            mask = np.asarray(self._evaluate(ast.parse(expression, mode='eval').body), dtype=bool)
+        mask = np.broadcast_to(mask, self._rows.shape)
+        return self._select(self._rows[mask])
+
+    def _evaluate(self, node):
+        """Evaluate parsed filter expression on arrays of metrics."""
+        if isinstance(node, ast.BoolOp):
+            values = [self._evaluate(value) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce(values)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+            value = self._evaluate(node.operand)
+            return np.logical_not(value) if isinstance(node.op, ast.Not) else -value
+        if isinstance(node, ast.Compare):
+            result, left = True, self._evaluate(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                if type(op) not in _COMPARISONS:
+                    break
+                right = self._evaluate(comparator)
+                result = result & _COMPARISONS[type(op)](left, right)
+                left = right
+            else:
+                return result
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return _BINARY[type(node.op)](self._evaluate(node.left), self._evaluate(node.right))
+        elif isinstance(node, ast.Name):
+            return self.metric(node.id)
+        elif isinstance(node, _CONSTANT) and isinstance(node.value, (int, float)):
+            return node.value
+        elif isinstance(node, _NUM) and isinstance(node.n, (int, float)):
+            return node.n
+        elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'rank'
+              and len(node.args) == 1 and isinstance(node.args[0], ast.Name) and not node.keywords):  # noqa: W503
+            return self.percentile_rank(node.args[0].id)
+        raise ValueError("Unsupported {0} in filter expression.".format(type(node).__name__))
+
+    def top(self, k, by='percent_upside_per_share', ascending=False):
+        """Keep the k companies with the largest (or smallest) values of a metric, in order.
+
+        Only the k best companies are sorted. Companies with NaN values are never kept.
+
+        Args:
+            k (int): Number of companies to keep.
+            by (str, optional): Metric to rank by. Defaults to percent_upside_per_share.
+            ascending (bool, optional): Keep smallest values rather than largest. Defaults to False.
+
+        Returns:
+            screen (Screen): Screen of at most k companies, best first.
+        """
+        values = self.metric(by)
+        keys = values if ascending else -values
+        valid = np.flatnonzero(~np.isnan(keys))
+        k = min(k, len(valid))
+        if k == 0:
+            return self._select(self._rows[:0])
+        best = valid[np.argpartition(keys[valid], k - 1)[:k]] if k < len(valid) else valid
+        best = best[np.argsort(keys[best], kind='stable')]
+        return self._select(self._rows[best])
+
+    def table(self, metrics=None):
+        """Get pandas data frame of metrics for each company in this screen.
+
+        Args:
+            metrics (Iterable, optional): Names of metrics to include. Defaults to every metric.
+
+        Returns:
+            table (pd.DataFrame): One row per company indexed by label, with a sector column and one column per
+                metric.
+        """
+        import pandas as pd
+        metrics = self.metric_names if metrics is None else metrics
+        table = pd.DataFrame({name: self.metric(name) for name in metrics}, index=self.labels)
+        table.insert(0, 'sector', self.sectors)
+        return table
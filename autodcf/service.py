@@ -0,0 +1,231 @@
+"""Asyncio service layer for answering many concurrent valuation requests.
+
+Requests value a :class:`autodcf.company.Company` under one set of assumptions, as in
+:class:`autodcf.models.SimpleDCF`. Requests are keyed on the company values the valuation reads (sales, tax, ratios
+to sales, net debt, shares and price) and the assumptions, so identical requests share work no matter which
+Company object they were made with.
+"""
+import asyncio
+import functools
+import json
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from autodcf.company.company_table import CompanyTable
+from autodcf.models.portfolio import COMPANY_FIELDS, RESULT_FIELDS, SCENARIO_FIELDS, company_values, value_rows
+
+Response = namedtuple('Response', ['status', 'body'])
+
+
+def value_keys(keys):
+    """Value requests given by keys in one vectorized evaluation per window.
+
+    Args:
+        keys (list): Keys of requests, as built by :meth:`ValuationService.key`.
+
+    Returns:
+        List with one dictionary mapping RESULT_FIELDS to values for each key.
+    """
+    companies = np.array([key[0] for key in keys], dtype=float).reshape(-1, len(COMPANY_FIELDS))
+    scenarios = np.array([key[1] for key in keys], dtype=float).reshape(-1, len(SCENARIO_FIELDS))
+    windows = np.array([key[2] for key in keys])
+    values = np.empty((len(keys), len(RESULT_FIELDS)))
+    for window in np.unique(windows):
+        rows = windows == window
+        valued = value_rows({field: companies[rows, i] for i, field in enumerate(COMPANY_FIELDS)},
+                            {field: scenarios[rows, i] for i, field in enumerate(SCENARIO_FIELDS)},
+                            int(window))
+        for i, field in enumerate(RESULT_FIELDS):
+            values[rows, i] = valued[field]
+    return [dict(zip(RESULT_FIELDS, row)) for row in values.tolist()]
+
+
+class ValuationService:
+    """Answer valuation requests from many coroutines at once.
+
+    * Requests identical to one already being valued wait for its result instead of being valued again.
+    * Distinct requests made before the event loop next runs its callbacks (or within batch_delay seconds) are
+      valued together in one vectorized evaluation.
+    * Results are kept in a least recently used cache of cache_size results.
+
+    Args:
+        window (int, optional): Window of requests that do not give one. Defaults to 5.
+        cache_size (int, optional): Maximum number of results to cache. Defaults to 10,000.
+        max_batch_size (int, optional): Value batch as soon as it has this many requests. Defaults to 4,096.
+        batch_delay (float, optional): Seconds to wait for more requests before valuing a batch. Defaults to 0,
+            which values requests made in the same pass of the event loop together.
+        executor (concurrent.futures.Executor, optional): Executor to value batches in, keeping large batches from
+            blocking the event loop. Defaults to valuing batches in the event loop.
+    """
+
+    def __init__(self, window=5, cache_size=10000, max_batch_size=4096, batch_delay=0.0, executor=None):
+        self._window = window
+        self._cache_size = cache_size
+        self._max_batch_size = max_batch_size
+        self._batch_delay = batch_delay
+        self._executor = executor
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self._pending = []
+        self._flush_handle = None
+        # Bumped by invalidate, so results of requests made before it are not cached.
+        self._generation = 0
+        self._stats = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'batches': 0, 'valued': 0}
+
+    @property
+    def stats(self):
+        """Counts of requests, cache hits, coalesced requests, batches valued and requests valued."""
+        return dict(self._stats)
+
+    @property
+    def cache_size(self):
+        return self._cache_size
+
+    def key(self, company, sales_growth, discount_rate, terminal_growth_rate, change_in_nwc_to_change_in_sales,
+            tax_rate, window=None):
+        """Key of request, made of the company values and assumptions it is valued with."""
+        assumptions = (sales_growth, discount_rate, terminal_growth_rate, change_in_nwc_to_change_in_sales, tax_rate)
+        if any(np.ndim(assumption) != 0 for assumption in assumptions):
+            raise ValueError("Assumptions must be single values.")
+        return (tuple(float(value) for value in company_values(company)),
+                tuple(float(assumption) for assumption in assumptions),
+                int(self._window if window is None else window))
+
+    async def value(self, company, **assumptions):
+        """Value company.
+
+        Args:
+            company (autodcf.company.Company): Company to value.
+            **assumptions: sales_growth, discount_rate, terminal_growth_rate, change_in_nwc_to_change_in_sales and
+                tax_rate as single values, and optionally window.
+
+        Returns:
+            Dictionary mapping enterprise_value, equity_value, equity_value_per_share and percent_upside_per_share
+            to values.
+        """
+        key = self.key(company, **assumptions)
+        self._stats['requests'] += 1
+        try:
+            result = self._cache[key]
+        except KeyError:
+            pass
+        else:
+            self._cache.move_to_end(key)
+            self._stats['cache_hits'] += 1
+            return dict(result)
+        future = self._in_flight.get(key)
+        if future is None:
+            future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+            self._enqueue(key, future)
+        else:
+            self._stats['coalesced'] += 1
+        # Shield so a cancelled request does not cancel other requests waiting on the same result.
+        return dict(await asyncio.shield(future))
+
+    def _enqueue(self, key, future):
+        loop = asyncio.get_running_loop()
+        self._pending.append((key, future, self._generation))
+        if len(self._pending) >= self._max_batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush_handle = None
+            self._flush()
+        elif self._flush_handle is None:
+            if self._batch_delay > 0:
+                self._flush_handle = loop.call_later(self._batch_delay, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+    def _flush(self):
+        """Value pending requests as one batch."""
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._stats['batches'] += 1
+        self._stats['valued'] += len(batch)
+        keys = [key for key, _, _ in batch]
+        if self._executor is None:
+            try:
+                results = value_keys(keys)
+            except Exception as e:
+                self._finish(batch, error=e)
+            else:
+                self._finish(batch, results=results)
+        else:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, value_keys, keys)
+            future.add_done_callback(functools.partial(self._finish_from_future, batch))
+
+    def _finish_from_future(self, batch, future):
+        error = future.exception()
+        if error is not None:
+            self._finish(batch, error=error)
+        else:
+            self._finish(batch, results=future.result())
+
+    def _finish(self, batch, results=None, error=None):
+        """Cache results of batch and hand them (or error) to waiting requests.
+
+        Results of requests made before the last :meth:`invalidate` are handed to their waiting requests, but not
+        cached.
+        """
+        for i, (key, future, generation) in enumerate(batch):
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            if error is not None:
+                future.set_exception(error)
+                continue
+            if generation == self._generation:
+                self._cache[key] = results[i]
+            future.set_result(results[i])
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all cached results.
+
+        Requests already being valued still get their results, but those results are not cached, and later
+        identical requests are valued again rather than waiting on them.
+        """
+        self._generation += 1
+        self._cache.clear()
+        self._in_flight.clear()
+
+
+def company_from_dict(values):
+    """Build company from flat mapping of the args of Company and of the statement classes (e.g. cash, sales)."""
+    return CompanyTable.from_columns({name: [value] for name, value in values.items()})[0]
+
+
+class LocalClient:
+    """In-process stand-in for an HTTP client of :class:`ValuationService`.
+
+    Request and response bodies are JSON-compatible dictionaries and are passed through JSON encoding as they would
+    be over the wire, so tests exercise the same payloads a real client sends.
+
+    Args:
+        service (ValuationService): Service to send requests to.
+    """
+
+    def __init__(self, service):
+        self._service = service
+
+    async def post(self, payload):
+        """Send valuation request.
+
+        Args:
+            payload (dict): Request body with company (flat mapping of company and statement values) and
+                assumptions (mapping of assumption name to value).
+
+        Returns:
+            response (Response): Status 200 with valuation, or status 400 with error message if the request is
+                invalid.
+        """
+        body = json.loads(json.dumps(payload))
+        try:
+            company = company_from_dict(body['company'])
+            result = await self._service.value(company, **body['assumptions'])
+        except (KeyError, TypeError, ValueError) as e:
+            return Response(400, {'error': str(e)})
+        return Response(200, json.loads(json.dumps(result)))
@@ -1,6 +1,7 @@
 import pytest
 
 from autodcf.company import BalanceSheet
+from autodcf.company.balance_sheet import DERIVED_METRICS
 
 
 class TestBalanceSheet:
@@ -43,3 +44,18 @@ class TestBalanceSheet:
 
     def test_net_debt(self, balance_sheet):
         assert balance_sheet.net_debt == 2
+
+    def test_totals_summed_once(self, balance_sheet):
+        assert balance_sheet._totals is None
+        assert balance_sheet.debt_to_equity == 1.0
+        totals = balance_sheet._totals
+        assert totals['liabilities'] == 50
+        balance_sheet.equity
+        balance_sheet.current_assets
+        assert balance_sheet._totals is totals
+
+    def test_derived_metrics(self, balance_sheet):
+        metrics = balance_sheet.derived_metrics()
+        assert tuple(metrics) == DERIVED_METRICS
+        for name, value in metrics.items():
+            assert value == getattr(balance_sheet, name)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from autodcf.company import Company, CompanyTable
+
+
+@pytest.fixture
+def company_table(company):
+    return CompanyTable.from_companies([company, company], labels=['A', 'B'])
+
+
+class TestCompanyTable:
+
+    def test_len(self, company_table):
+        assert len(company_table) == 2
+
+    def test_columns(self, company_table):
+        np.testing.assert_array_equal(company_table.fully_diluted_shares, [10, 10])
+        np.testing.assert_array_equal(company_table.income_statements['sales'], [100, 100])
+        np.testing.assert_array_equal(company_table.cash_flows['capex'], [3, 3])
+        np.testing.assert_array_equal(company_table.balance_sheets.assets, [100, 100])
+
+    def test_company(self, company_table, company):
+        built = company_table[1]
+        assert isinstance(built, Company)
+        assert built.price_per_share == company.price_per_share
+        assert built.balance_sheet.net_debt == company.balance_sheet.net_debt
+        assert built.income_statement.tax == company.income_statement.tax
+
+    def test_select(self, company_table):
+        selected = company_table[np.array([False, True])]
+        assert len(selected) == 1
+        assert list(selected.labels) == ['B']
+
+    def test_from_columns(self, company_table):
+        columns = {'fully_diluted_shares': [1], 'price_per_share': [2], 'ignored': [3]}
+        for name, _ in CompanyTable.tables:
+            columns.update({field: getattr(company_table, name)[field][:1] for field in getattr(company_table,
+                                                                                               name).fields})
+        table = CompanyTable.from_columns(columns)
+        assert list(table.labels) == [0]
+        assert table[0].price_per_share == 2
+
+    def test_mismatched_lengths(self, company_table):
+        with pytest.raises(ValueError):
+            CompanyTable(fully_diluted_shares=[1],
+                         price_per_share=[1],
+                         balance_sheets=company_table.balance_sheets,
+                         cash_flows=company_table.cash_flows,
+                         income_statements=company_table.income_statements)
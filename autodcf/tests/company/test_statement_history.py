@@ -0,0 +1,71 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from autodcf.company import CashFlows, IncomeStatement, StatementHistory
+
+
+@pytest.fixture
+def income_statements():
+    return [IncomeStatement(sales=100 + 10 * i,
+                            cogs=50 + i,
+                            sga=20,
+                            rd=2,
+                            depreciation=3,
+                            amortization=1,
+                            nonrecurring_cost=0,
+                            interest=1,
+                            tax=4,
+                            start_date=datetime(2015 + i, 1, 1),
+                            end_date=datetime(2015 + i, 12, 31))
+            for i in (3, 0, 2, 1)]
+
+
+@pytest.fixture
+def history(income_statements):
+    return StatementHistory.from_statements(income_statements)
+
+
+class TestStatementHistory:
+
+    def test_sorted(self, history):
+        assert len(history) == 4
+        np.testing.assert_array_equal(history['sales'], [100, 110, 120, 130])
+        assert history.dates[0] == np.datetime64('2015-12-31')
+
+    def test_latest(self, history):
+        assert history.latest.sales == 130
+        assert history.latest.end_date == datetime(2018, 12, 31)
+
+    def test_asof(self, history):
+        assert history.asof(datetime(2018, 6, 30)).sales == 120
+        assert history.asof('2016-12-31').sales == 110
+        assert history.asof(datetime(2030, 1, 1)).sales == 130
+        with pytest.raises(KeyError):
+            history.asof(datetime(2015, 6, 30))
+
+    def test_between(self, history):
+        window = history.between('2016-01-01', '2017-12-31')
+        np.testing.assert_array_equal(window['sales'], [110, 120])
+        assert len(history.between(end='2016-12-31')) == 2
+
+    def test_ratio(self, history):
+        np.testing.assert_allclose(history.ratio('cogs', 'sales'), np.array([50, 51, 52, 53]) / [100, 110, 120, 130])
+        np.testing.assert_allclose(history.ratio('da', 'sales'), np.array([4, 4, 4, 4]) / [100, 110, 120, 130])
+
+    def test_balance_sheet_history(self, balance_sheet):
+        balance_sheet.date = datetime(2019, 12, 31)
+        history = StatementHistory.from_statements([balance_sheet])
+        assert history.values('net_debt')[0] == balance_sheet.net_debt
+
+    def test_cash_flows_need_dates(self):
+        with pytest.raises(ValueError):
+            StatementHistory.from_statements([CashFlows(capex=1)])
+        history = StatementHistory.from_statements([CashFlows(capex=2), CashFlows(capex=1)],
+                                                   dates=['2019-12-31', '2018-12-31'])
+        np.testing.assert_array_equal(history['capex'], [1, 2])
+
+    def test_missing_date(self, balance_sheet):
+        with pytest.raises(ValueError):
+            StatementHistory.from_statements([balance_sheet])
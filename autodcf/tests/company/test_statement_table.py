@@ -0,0 +1,120 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from autodcf.company import (BalanceSheet, BalanceSheetTable, CashFlows, CashFlowsTable, IncomeStatement,
+                             IncomeStatementTable)
+
+
+@pytest.fixture
+def replacement_balance_sheet():
+    return BalanceSheet(cash=1000,
+                        short_term_investments=1000,
+                        net_receivables=2000,
+                        inventory=500,
+                        other_current_assets=500,
+                        ppe=3000,
+                        goodwill=1000,
+                        intangible_assets=2000,
+                        other_lt_assets=0,
+                        accounts_payable=500,
+                        accrued_liabilities=900,
+                        short_term_debt=600,
+                        current_part_lt_debt=400,
+                        other_current_liabilities=1600,
+                        long_term_debt=0,
+                        other_lt_liabilities=200,
+                        deferred_lt_liabilities=300,
+                        minority_interest=500,
+                        date=datetime(2020, 1, 1))
+
+
+@pytest.fixture
+def balance_sheet_table(balance_sheet, replacement_balance_sheet):
+    return BalanceSheetTable.from_statements([balance_sheet, replacement_balance_sheet])
+
+
+class TestStatementTable:
+
+    def test_len(self, balance_sheet_table):
+        assert len(balance_sheet_table) == 2
+
+    def test_columns(self, balance_sheet_table):
+        np.testing.assert_array_equal(balance_sheet_table['cash'], [10, 1000])
+        assert balance_sheet_table['cash'].dtype == np.float64
+        assert balance_sheet_table['date'].dtype == np.dtype('datetime64[us]')
+
+    def test_derived_metrics(self, balance_sheet_table, balance_sheet, replacement_balance_sheet):
+        for name in ('current_assets', 'long_term_assets', 'assets', 'current_liabilites', 'long_term_liabilities',
+                     'liabilities', 'net_debt', 'equity', 'debt_to_equity'):
+            expected = [getattr(balance_sheet, name), getattr(replacement_balance_sheet, name)]
+            np.testing.assert_allclose(getattr(balance_sheet_table, name), expected)
+
+    def test_derived_metrics_export(self, balance_sheet_table, balance_sheet, replacement_balance_sheet):
+        metrics = balance_sheet_table.derived_metrics()
+        for name, values in metrics.items():
+            np.testing.assert_array_equal(values, getattr(balance_sheet_table, name))
+            assert values[1] == getattr(replacement_balance_sheet, name)
+
+    def test_from_statements_dates(self, income_statement):
+        from datetime import date
+        statements = [IncomeStatement(100, 50, 25, 2, 4, 2, 3, 1, 4, start_date=datetime(2019, 3, 4, 5, 6, 7, 8),
+                                      end_date=datetime(2020, 1, 1)),
+                      income_statement]
+        table = IncomeStatementTable.from_statements(statements)
+        expected = np.array([datetime(2019, 3, 4, 5, 6, 7, 8), income_statement.start_date], dtype='datetime64[us]')
+        np.testing.assert_array_equal(table['start_date'], expected)
+        assert table[0].end_date == datetime(2020, 1, 1)
+        balance_sheets = BalanceSheetTable.from_statements([BalanceSheet(*[1] * 18, date=date(2020, 1, 1)),
+                                                            BalanceSheet(*[1] * 18)])
+        np.testing.assert_array_equal(balance_sheets['date'], np.array(['2020-01-01', 'NaT'], dtype='datetime64[us]'))
+
+    def test_statement(self, balance_sheet_table):
+        first, second = list(balance_sheet_table)
+        assert isinstance(first, BalanceSheet)
+        assert first.assets == 100
+        assert first.date is None
+        assert second.date == datetime(2020, 1, 1)
+        assert balance_sheet_table[1].assets == 11000
+
+    def test_select(self, balance_sheet_table):
+        selected = balance_sheet_table[balance_sheet_table['cash'] > 100]
+        assert len(selected) == 1
+        assert selected[0].cash == 1000
+
+    def test_income_statement_table(self, income_statement):
+        table = IncomeStatementTable.from_statements([income_statement] * 3)
+        np.testing.assert_array_equal(table.da, [6, 6, 6])
+        statement = table[0]
+        assert isinstance(statement, IncomeStatement)
+        assert statement.sales == 100
+        assert statement.start_date == income_statement.start_date
+
+    def test_cash_flows_table(self):
+        table = CashFlowsTable(capex=[1, 2, 3])
+        assert isinstance(table[2], CashFlows)
+        assert table[2].capex == 3
+
+    def test_defaults(self):
+        columns = {field: [1.0] for field in BalanceSheetTable.fields[:-1]}
+        table = BalanceSheetTable(**columns)
+        assert table['other_lt_liability_debt_multiplier'][0] == 0
+        assert np.isnat(table['date'][0])
+
+    def test_bad_columns(self):
+        with pytest.raises(ValueError):
+            CashFlowsTable(capex=[1, 2], cash=[1, 2])
+        with pytest.raises(ValueError):
+            IncomeStatementTable(sales=[1])
+        with pytest.raises(ValueError):
+            BalanceSheetTable(**{field: [1.0] * (2 if field == 'cash' else 1) for field in BalanceSheetTable.fields})
+
+
+class TestSlots:
+
+    def test_no_instance_dict(self, balance_sheet, income_statement, cash_flows, company):
+        for obj in (balance_sheet, income_statement, cash_flows, company):
+            assert not hasattr(obj, '__dict__')
+            with pytest.raises(AttributeError):
+                obj.unknown_attribute = 1
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from autodcf.models import BatchDCF, SimpleDCF
+
+
+@pytest.fixture
+def batch_dcf(company, simple_dcf):
+    return BatchDCF(company=company,
+                    sales_growth=np.array([0.03, 0.05, 0.03]),
+                    discount_rate=np.array([0.14, 0.14, 0.10]),
+                    terminal_growth_rate=0.03,
+                    window=5,
+                    cogs_to_sales=simple_dcf.cogs_to_sales,
+                    sga_to_sales=simple_dcf.sga_to_sales,
+                    rd_to_sales=simple_dcf.rd_to_sales,
+                    da_to_sales=simple_dcf.da_to_sales,
+                    interest_to_sales=simple_dcf.interest_to_sales,
+                    tax_rate=0.21,
+                    capex_to_sales=simple_dcf.capex_to_sales,
+                    change_in_nwc_to_change_in_sales=0.1)
+
+
+class TestBatchDCF:
+
+    def test_n_scenarios(self, batch_dcf):
+        assert batch_dcf.n_scenarios == 3
+
+    def test_forecast_shape(self, batch_dcf):
+        assert batch_dcf.forecast().shape == (3, 7, len(BatchDCF.line_items))
+
+    def test_forecast_matches_dcf(self, batch_dcf, simple_dcf):
+        expected = simple_dcf.forecast()[list(BatchDCF.line_items)].values
+        np.testing.assert_allclose(batch_dcf.forecast()[0], expected, rtol=1e-12)
+
+    def test_matches_simple_dcf(self, batch_dcf, company):
+        for i, (growth, rate) in enumerate([(0.03, 0.14), (0.05, 0.14), (0.03, 0.10)]):
+            dcf = SimpleDCF(company=company,
+                            sales_growth=growth,
+                            discount_rate=rate,
+                            terminal_growth_rate=0.03,
+                            change_in_nwc_to_change_in_sales=0.1,
+                            tax_rate=0.21)
+            assert batch_dcf.enterprise_value[i] == pytest.approx(dcf.enterprise_value)
+            assert batch_dcf.equity_value[i] == pytest.approx(dcf.equity_value)
+            assert batch_dcf.equity_value_per_share[i] == pytest.approx(dcf.equity_value_per_share)
+            assert batch_dcf.percent_upside_per_share[i] == pytest.approx(dcf.percent_upside_per_share)
+
+    def test_per_period_assumptions(self, company, simple_dcf):
+        growth = np.array([[0.03] * 6, [0.01, 0.02, 0.03, 0.04, 0.05, 0.06]])
+        cogs = np.array([[simple_dcf.cogs_to_sales] * 7, [0.5, 0.5, 0.49, 0.48, 0.47, 0.46, 0.45]])
+        batch_dcf = BatchDCF(company=company,
+                             sales_growth=growth,
+                             discount_rate=0.14,
+                             terminal_growth_rate=0.03,
+                             window=5,
+                             cogs_to_sales=cogs,
+                             sga_to_sales=simple_dcf.sga_to_sales,
+                             rd_to_sales=simple_dcf.rd_to_sales,
+                             da_to_sales=simple_dcf.da_to_sales,
+                             interest_to_sales=simple_dcf.interest_to_sales,
+                             tax_rate=0.21,
+                             capex_to_sales=simple_dcf.capex_to_sales,
+                             change_in_nwc_to_change_in_sales=0.1)
+        assert batch_dcf.enterprise_value[0] == pytest.approx(simple_dcf.enterprise_value)
+        sales = batch_dcf.forecast()[1, :, BatchDCF.line_items.index('Sales')]
+        np.testing.assert_allclose(sales, 100 * np.cumprod([1, 1.01, 1.02, 1.03, 1.04, 1.05, 1.06]))
+
+    def test_valuation(self, batch_dcf):
+        valuation = batch_dcf.valuation()
+        np.testing.assert_array_equal(valuation['enterprise_value'], batch_dcf.enterprise_value)
+        np.testing.assert_array_equal(valuation['equity_value'], batch_dcf.equity_value)
+        np.testing.assert_array_equal(valuation['equity_value_per_share'], batch_dcf.equity_value_per_share)
@@ -3,7 +3,8 @@ import pytest
 import numpy as np
 import pandas as pd
 
-from autodcf.models import SimpleDCF
+from autodcf.models import DiscountCurve, SimpleDCF
+from autodcf.models.terminal_value import ExitMultiple
 from autodcf.tests.utils import datapath
 
 
@@ -54,3 +55,205 @@ class TestDCF:
 
     def test_percent_upside(self, simple_dcf, expected_dcf_results):
         assert expected_dcf_results['percent_upside_per_share'] == simple_dcf.percent_upside_per_share
+
+    def test_forecast_cached(self, simple_dcf, monkeypatch):
+        forecast = simple_dcf.forecast()
+        monkeypatch.setattr(simple_dcf, '_build_forecast', lambda: pytest.fail("Forecast was rebuilt."))
+        enterprise_value = simple_dcf.enterprise_value
+        assert simple_dcf.forecast().equals(forecast)
+        assert simple_dcf.enterprise_value == enterprise_value
+
+    def test_forecast_copy(self, simple_dcf):
+        forecast = simple_dcf.forecast()
+        expected = forecast.copy()
+        forecast['Sales'].values[:] = 0
+        assert simple_dcf.forecast().equals(expected)
+
+    def test_setter_invalidates_forecast(self, simple_dcf):
+        forecast = simple_dcf.forecast()
+        enterprise_value = simple_dcf.enterprise_value
+        simple_dcf.discount_rate = 0.1
+        assert simple_dcf.forecast() is not forecast
+        assert simple_dcf.enterprise_value > enterprise_value
+
+    def test_terminal_discount_rate_follows_discount_rate(self, simple_dcf):
+        assert simple_dcf.terminal_discount_rate == 0.14
+        simple_dcf.discount_rate = 0.1
+        assert simple_dcf.terminal_discount_rate == 0.1
+        simple_dcf.terminal_discount_rate = 0.12
+        assert simple_dcf.terminal_discount_rate == 0.12
+
+    def test_company_change_invalidates_forecast(self, simple_dcf, company):
+        forecast = simple_dcf.forecast()
+        enterprise_value = simple_dcf.enterprise_value
+        company.income_statement.sales = 200
+        assert simple_dcf.forecast() is not forecast
+        assert simple_dcf.forecast().loc[-1, 'Sales'] == 200
+        assert simple_dcf.enterprise_value != enterprise_value
+
+    def test_forecast_array(self, simple_dcf):
+        forecast_array = simple_dcf.forecast_array()
+        assert forecast_array.shape == (7, 17)
+        assert forecast_array.dtype == np.float64
+        assert forecast_array.flags['C_CONTIGUOUS']
+        np.testing.assert_array_equal(forecast_array, simple_dcf.forecast().iloc[:, 1:].values)
+
+    def test_valuation_does_not_build_dataframe(self, simple_dcf):
+        simple_dcf.equity_value_per_share
+        assert 'forecast' not in simple_dcf._cache
+
+    def test_sensitivity_table(self, simple_dcf, company):
+        rates = [0.1, 0.12, 0.14]
+        growths = [0.01, 0.02, 0.03, 0.04]
+        table = simple_dcf.sensitivity_table(rates, growths)
+        assert table.shape == (3, 4)
+        assert table.index.name == 'discount_rate'
+        assert table.columns.name == 'terminal_growth_rate'
+        assert table.loc[0.14, 0.03] == pytest.approx(simple_dcf.equity_value_per_share)
+        for rate in rates:
+            for growth in growths:
+                dcf = SimpleDCF(company=company,
+                                sales_growth=0.03,
+                                discount_rate=rate,
+                                terminal_growth_rate=growth,
+                                change_in_nwc_to_change_in_sales=0.1,
+                                tax_rate=0.21)
+                assert table.loc[rate, growth] == pytest.approx(dcf.equity_value_per_share)
+
+    def test_sensitivity_table_transposed(self, simple_dcf):
+        table = simple_dcf.sensitivity_table([0.12, 0.14], [0.02, 0.03], value='enterprise_value')
+        transposed = simple_dcf.sensitivity_table([0.02, 0.03], [0.12, 0.14],
+                                                  row='terminal_growth_rate',
+                                                  column='discount_rate',
+                                                  value='enterprise_value')
+        pd.testing.assert_frame_equal(table.T, transposed)
+        assert table.loc[0.14, 0.03] == pytest.approx(simple_dcf.enterprise_value)
+
+    def test_sensitivity_table_other_pair(self, simple_dcf, company):
+        table = simple_dcf.sensitivity_table([0.45, 0.5], [0.01, 0.03],
+                                             row='cogs_to_sales',
+                                             column='sales_growth',
+                                             value='percent_upside_per_share')
+        assert table.loc[0.5, 0.03] == pytest.approx(simple_dcf.percent_upside_per_share)
+        simple_dcf.cogs_to_sales = 0.45
+        simple_dcf.sales_growth = 0.01
+        assert table.loc[0.45, 0.01] == pytest.approx(simple_dcf.percent_upside_per_share)
+
+    def test_sensitivity_table_bad_args(self, simple_dcf):
+        with pytest.raises(ValueError):
+            simple_dcf.sensitivity_table([5, 6], [0.1, 0.2], row='window', column='discount_rate')
+        with pytest.raises(ValueError):
+            simple_dcf.sensitivity_table([0.1], [0.2], row='discount_rate', column='discount_rate')
+        with pytest.raises(ValueError):
+            simple_dcf.sensitivity_table([0.1], [0.02], value='price')
+
+    @pytest.mark.parametrize('assumption, value, first_stage', [
+        ('sales_growth', 0.05, '_calculate_sales'),
+        ('cogs_to_sales', 0.4, '_calculate_operating_lines'),
+        ('tax_rate', 0.3, '_calculate_taxes'),
+        ('capex_to_sales', 0.05, '_calculate_cash_flows'),
+        ('discount_rate', 0.1, '_discount_cash_flows'),
+        ('terminal_growth_rate', 0.02, None),
+        ('terminal_value', ExitMultiple(8), None),
+    ])
+    def test_incremental_recompute(self, simple_dcf, company, monkeypatch, assumption, value, first_stage):
+        from autodcf.models.dcf import STAGES
+        simple_dcf.enterprise_value
+        calls = []
+        for stage in STAGES:
+            method = getattr(simple_dcf, stage)
+            monkeypatch.setattr(simple_dcf, stage,
+                                lambda f, stage=stage, method=method: calls.append(stage) or method(f))
+        setattr(simple_dcf, assumption, value)
+        enterprise_value = simple_dcf.enterprise_value
+        expected = list(STAGES[STAGES.index(first_stage):]) if first_stage else []
+        assert calls == expected
+        fresh = SimpleDCF(company=company,
+                          sales_growth=0.03,
+                          discount_rate=0.14,
+                          terminal_growth_rate=0.03,
+                          change_in_nwc_to_change_in_sales=0.1,
+                          tax_rate=0.21)
+        setattr(fresh, assumption, value)
+        assert enterprise_value == fresh.enterprise_value
+
+    def test_company_tax_change_recomputes_from_taxes(self, simple_dcf, company):
+        simple_dcf.forecast_array()
+        company.income_statement.tax = 10
+        simple_dcf._check_company()
+        assert simple_dcf._valid_stages == 2
+        assert simple_dcf.forecast_array()[0, 11] == 10
+
+    def test_forecast_array_read_only(self, simple_dcf):
+        with pytest.raises(ValueError):
+            simple_dcf.forecast_array()[0, 0] = 1
+
+
+def bumped_enterprise_value(dcf, assumption, value):
+    h = 1e-6
+    setattr(dcf, assumption, value + h)
+    up = dcf.enterprise_value
+    setattr(dcf, assumption, value - h)
+    down = dcf.enterprise_value
+    setattr(dcf, assumption, value)
+    return (up - down) / (2 * h)
+
+
+class TestGradient:
+
+    @pytest.mark.parametrize('assumption', ['sales_growth', 'discount_rate', 'terminal_growth_rate', 'cogs_to_sales',
+                                            'sga_to_sales', 'rd_to_sales', 'da_to_sales', 'interest_to_sales',
+                                            'tax_rate', 'capex_to_sales', 'change_in_nwc_to_change_in_sales'])
+    def test_matches_finite_differences(self, simple_dcf, assumption):
+        expected = bumped_enterprise_value(simple_dcf, assumption, getattr(simple_dcf, assumption))
+        assert np.sum(simple_dcf.gradient()[assumption]) == pytest.approx(expected, rel=1e-6)
+
+    def test_per_period(self, simple_dcf):
+        sales_growth = np.array([0.05, 0.04, 0.03, 0.03, 0.02, 0.02])
+        simple_dcf.sales_growth = sales_growth
+        gradient = simple_dcf.gradient()['sales_growth']
+        assert gradient.shape == (6,)
+        for period in (0, 3, 5):
+            bump = np.zeros(6)
+            bump[period] = 1e-6
+            simple_dcf.sales_growth = sales_growth + bump
+            up = simple_dcf.enterprise_value
+            simple_dcf.sales_growth = sales_growth - bump
+            down = simple_dcf.enterprise_value
+            assert gradient[period] == pytest.approx((up - down) / 2e-6, rel=1e-6)
+
+    def test_terminal_discount_rate(self, simple_dcf):
+        follows = simple_dcf.gradient()
+        simple_dcf.terminal_discount_rate = 0.14
+        gradient = simple_dcf.gradient()
+        expected = bumped_enterprise_value(simple_dcf, 'terminal_discount_rate', 0.14)
+        assert gradient['terminal_discount_rate'] == pytest.approx(expected, rel=1e-6)
+        assert follows['discount_rate'] == pytest.approx(gradient['discount_rate']
+                                                         + gradient['terminal_discount_rate'])  # noqa: W503
+
+    def test_discount_curve(self, simple_dcf):
+        rates = np.array([0.1, 0.11, 0.12, 0.13, 0.14])
+        simple_dcf.discount_rate = DiscountCurve(rates, mid_year=True)
+        gradient = simple_dcf.gradient()['discount_rate']
+        for period in range(5):
+            bump = np.zeros(5)
+            bump[period] = 1e-6
+            simple_dcf.discount_rate = DiscountCurve(rates + bump, mid_year=True)
+            up = simple_dcf.enterprise_value
+            simple_dcf.discount_rate = DiscountCurve(rates - bump, mid_year=True)
+            down = simple_dcf.enterprise_value
+            assert gradient[period] == pytest.approx((up - down) / 2e-6, rel=1e-6)
+
+    def test_valuations(self, simple_dcf, company):
+        enterprise_value = simple_dcf.gradient()
+        per_share = simple_dcf.gradient('equity_value_per_share')
+        assert per_share['tax_rate'] == pytest.approx(enterprise_value['tax_rate'] / company.fully_diluted_shares)
+        with pytest.raises(ValueError):
+            simple_dcf.gradient('price')
+
+    def test_cached_until_assumption_changes(self, simple_dcf):
+        gradient = simple_dcf.gradient()
+        assert simple_dcf._cache['gradient'] is simple_dcf._cached('gradient', None)
+        simple_dcf.terminal_growth_rate = 0.02
+        assert 'gradient' not in simple_dcf._cache
+        assert simple_dcf.gradient()['discount_rate'] != gradient['discount_rate']
@@ -0,0 +1,100 @@
+import pytest
+
+import numpy as np
+
+from autodcf.models import BatchDCF, DiscountCurve, SimpleDCF
+
+
+def _simple_dcf(company, discount_rate):
+    return SimpleDCF(company=company,
+                     sales_growth=0.03,
+                     discount_rate=discount_rate,
+                     terminal_growth_rate=0.03,
+                     change_in_nwc_to_change_in_sales=0.1,
+                     tax_rate=0.21,
+                     window=5)
+
+
+class TestDiscountCurve:
+
+    def test_flat_factors(self):
+        curve = DiscountCurve(0.1)
+        assert curve.is_flat
+        np.testing.assert_array_equal(curve.factors(3), 1 / 1.1 ** np.arange(4))
+        assert curve.compounding(3) == 1.1 ** 3
+        assert curve.terminal_rate == 0.1
+
+    def test_factors_memoized_and_read_only(self):
+        curve = DiscountCurve(0.1)
+        assert curve.factors(5) is curve.factors(5)
+        with pytest.raises(ValueError):
+            curve.factors(5)[0] = 2
+
+    def test_flat_shared(self):
+        assert DiscountCurve.flat(0.1) is DiscountCurve.flat(0.1)
+        assert DiscountCurve.flat(0.1) is not DiscountCurve.flat(0.1, mid_year=True)
+
+    def test_per_year_rates(self):
+        curve = DiscountCurve([0.1, 0.2, 0.3])
+        assert not curve.is_flat
+        np.testing.assert_allclose(curve.factors(3), [1, 1 / 1.1, 1 / (1.1 * 1.2), 1 / (1.1 * 1.2 * 1.3)])
+        np.testing.assert_allclose(curve.factors(2), [1, 1 / 1.1, 1 / (1.1 * 1.2)])
+        assert curve.compounding(3) == pytest.approx(1.1 * 1.2 * 1.3)
+        assert curve.terminal_rate == 0.3
+
+    def test_per_year_rates_too_short(self):
+        with pytest.raises(ValueError):
+            DiscountCurve([0.1, 0.2]).factors(3)
+        with pytest.raises(ValueError):
+            DiscountCurve([[0.1, 0.2]])
+
+    def test_mid_year(self):
+        np.testing.assert_allclose(DiscountCurve(0.1, mid_year=True).factors(2), [1, 1.1 ** -0.5, 1.1 ** -1.5])
+        np.testing.assert_allclose(DiscountCurve([0.1, 0.2], mid_year=True).factors(2),
+                                   [1, 1.1 ** -0.5, 1 / (1.1 * 1.2 ** 0.5)])
+        assert DiscountCurve(0.1, mid_year=True).compounding(2) == 1.1 ** 2
+
+
+class TestDCFWithDiscountCurve:
+
+    def test_flat_curve_matches_rate(self, company):
+        assert _simple_dcf(company, DiscountCurve(0.14)).enterprise_value == _simple_dcf(company,
+                                                                                         0.14).enterprise_value
+
+    def test_per_year_curve(self, company):
+        curve = _simple_dcf(company, DiscountCurve([0.14] * 5))
+        assert curve.enterprise_value == pytest.approx(_simple_dcf(company, 0.14).enterprise_value)
+        assert curve.terminal_discount_rate == 0.14
+        rising = _simple_dcf(company, DiscountCurve([0.14, 0.15, 0.16, 0.17, 0.18]))
+        assert rising.terminal_discount_rate == 0.18
+        assert rising.enterprise_value < _simple_dcf(company, 0.14).enterprise_value
+
+    def test_mid_year_curve(self, company):
+        mid_year = _simple_dcf(company, DiscountCurve(0.14, mid_year=True))
+        assert mid_year.enterprise_value > _simple_dcf(company, 0.14).enterprise_value
+
+    def test_discount_curve_shared(self, company):
+        assert _simple_dcf(company, 0.14).discount_curve is _simple_dcf(company, 0.14).discount_curve
+
+    def test_batch_dcf_with_curve(self, company):
+        curve = DiscountCurve([0.14, 0.15, 0.16, 0.17, 0.18], mid_year=True)
+        dcf = _simple_dcf(company, curve)
+        assumptions = dcf.batch_assumptions()
+        assumptions['terminal_growth_rate'] = np.array([0.02, 0.03])
+        batch = BatchDCF(company=company, **assumptions)
+        assert batch.enterprise_value[1] == pytest.approx(dcf.enterprise_value)
+        assert batch.enterprise_value[0] < batch.enterprise_value[1]
+
+    def test_mid_year_kept_when_rates_replace_curve(self, company):
+        dcf = _simple_dcf(company, DiscountCurve(0.14, mid_year=True))
+        table = dcf.sensitivity_table([0.14], [dcf.cogs_to_sales], row='discount_rate', column='cogs_to_sales')
+        assert table.iloc[0, 0] == pytest.approx(dcf.equity_value_per_share)
+        assumptions = dcf.batch_assumptions()
+        assumptions['discount_rate'] = np.array([0.14, 0.15])
+        assert BatchDCF(company=company, **assumptions).enterprise_value[0] == pytest.approx(dcf.enterprise_value)
+
+    def test_batch_dcf_mid_year_must_match_curve(self, company):
+        assumptions = _simple_dcf(company, DiscountCurve(0.14, mid_year=True)).batch_assumptions()
+        assumptions['mid_year'] = False
+        with pytest.raises(ValueError):
+            BatchDCF(company=company, **assumptions)
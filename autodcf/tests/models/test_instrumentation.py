@@ -0,0 +1,71 @@
+import pytest
+
+from autodcf.models import Instrumentation
+from autodcf.models.dcf import STAGES
+from autodcf.models.instrumentation import current
+
+
+class TestInstrumentation:
+
+    def test_off_by_default(self, simple_dcf):
+        assert current() is None
+        assert simple_dcf.instrumentation is None
+        assert simple_dcf._recorder() is None
+
+    def test_context_manager_records_stages(self, simple_dcf):
+        with Instrumentation() as instrumentation:
+            assert current() is instrumentation
+            simple_dcf.enterprise_value
+        assert current() is None
+        timings = instrumentation.as_dict()
+        for stage in STAGES + ('_calculate_discounted_window_cash_flow', '_calculate_discounted_terminal_cash_flow'):
+            assert timings[stage]['calls'] == 1
+            assert timings[stage]['seconds'] >= 0
+        assert '_build_forecast' not in timings
+
+    def test_only_recomputed_stages_recorded(self, simple_dcf):
+        simple_dcf.enterprise_value
+        with Instrumentation() as instrumentation:
+            simple_dcf.discount_rate = 0.1
+            simple_dcf.enterprise_value
+            simple_dcf.enterprise_value
+        timings = instrumentation.as_dict()
+        assert timings['_discount_cash_flows']['calls'] == 1
+        assert '_calculate_sales' not in timings
+
+    def test_nested(self, simple_dcf):
+        with Instrumentation() as outer:
+            with Instrumentation() as inner:
+                simple_dcf.forecast()
+            simple_dcf.terminal_growth_rate = 0.02
+            simple_dcf.enterprise_value
+        assert '_build_forecast' in inner.as_dict()
+        assert set(outer.as_dict()) == {'_calculate_discounted_window_cash_flow',
+                                        '_calculate_discounted_terminal_cash_flow'}
+
+    def test_per_dcf(self, simple_dcf):
+        instrumentation = Instrumentation()
+        simple_dcf.instrumentation = instrumentation
+        simple_dcf.forecast()
+        assert instrumentation.as_dict()['_build_forecast']['calls'] == 1
+        instrumentation.reset()
+        assert instrumentation.as_dict() == {}
+
+    def test_to_prometheus(self):
+        instrumentation = Instrumentation()
+        instrumentation.record('_calculate_sales', 0.5)
+        instrumentation.record('_calculate_sales', 0.25)
+        text = instrumentation.to_prometheus()
+        assert '# TYPE autodcf_stage_calls_total counter' in text
+        assert 'autodcf_stage_calls_total{stage="_calculate_sales"} 2' in text
+        assert 'autodcf_stage_seconds_total{stage="_calculate_sales"} 0.75' in text
+        assert text.endswith('\n')
+
+    def test_report(self):
+        instrumentation = Instrumentation()
+        instrumentation.record('_calculate_sales', 0.001)
+        instrumentation.record('_discount_cash_flows', 0.002)
+        lines = instrumentation.report().splitlines()
+        assert lines[0].split() == ['stage', 'calls', 'total', 'ms', 'mean', 'us']
+        assert lines[1].split()[0] == '_discount_cash_flows'
+        assert float(lines[2].split()[2]) == pytest.approx(1.0)
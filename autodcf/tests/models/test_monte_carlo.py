@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from autodcf.models.monte_carlo import MonteCarloDCF, Normal, StreamingStats, Triangular, Uniform
+
+
+@pytest.fixture
+def distributions():
+    return {'sales_growth': Normal(0.03, 0.01),
+            'discount_rate': Uniform(0.12, 0.16),
+            'cogs_to_sales': Triangular(0.45, 0.5, 0.55)}
+
+
+class TestStreamingStats:
+
+    def test_matches_numpy(self):
+        values = np.random.default_rng(0).normal(10, 2, 100000)
+        stats = StreamingStats(bins=2000)
+        for chunk in np.array_split(values, 7):
+            stats.update(chunk)
+        assert stats.n == values.size
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.std == pytest.approx(values.std(ddof=1))
+        assert stats.min == values.min()
+        assert stats.max == values.max()
+        bin_width = np.diff(stats.histogram[1])[0]
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            assert abs(stats.quantile(q) - np.quantile(values, q)) < bin_width
+
+    def test_out_of_range(self):
+        stats = StreamingStats(bins=10, hist_range=(0, 1))
+        stats.update(np.array([-5.0, 0.5, 0.5, 7.0, np.nan, np.inf]))
+        assert stats.n == 4
+        assert stats.n_nonfinite == 2
+        assert stats.underflow == 1
+        assert stats.overflow == 1
+        assert stats.histogram[0].sum() == 2
+        assert stats.quantile(0) == -5.0
+        assert stats.quantile(1) == 7.0
+
+    def test_histogram_before_update(self):
+        stats = StreamingStats(bins=10)
+        stats.update(np.array([np.nan]))
+        with pytest.raises(ValueError):
+            stats.histogram
+        counts, edges = StreamingStats(bins=10, hist_range=(0, 1)).histogram
+        assert counts.sum() == 0
+        assert edges.size == 11
+
+
+class TestMonteCarloDCF:
+
+    def test_reproducible(self, simple_dcf, distributions):
+        first = MonteCarloDCF(simple_dcf, distributions, seed=42, chunk_size=1000).run(5000)
+        second = MonteCarloDCF(simple_dcf, distributions, seed=42, chunk_size=1000).run(5000)
+        assert first.mean == second.mean
+        np.testing.assert_array_equal(first.histogram[0], second.histogram[0])
+        np.testing.assert_array_equal(first.quantile([0.05, 0.95]), second.quantile([0.05, 0.95]))
+
+    def test_degenerate_distribution(self, simple_dcf):
+        stats = MonteCarloDCF(simple_dcf, {'discount_rate': Uniform(0.14, 0.14)}, seed=0).run(100)
+        assert stats.n == 100
+        assert stats.mean == pytest.approx(simple_dcf.equity_value_per_share)
+
+    def test_spread(self, simple_dcf, distributions):
+        stats = MonteCarloDCF(simple_dcf, distributions, seed=1, chunk_size=2500).run(10000)
+        assert stats.n == 10000
+        assert stats.quantile(0.05) < simple_dcf.equity_value_per_share < stats.quantile(0.95)
+
+    def test_bad_assumption(self, simple_dcf):
+        with pytest.raises(ValueError):
+            MonteCarloDCF(simple_dcf, {'window': Uniform(1, 10)})
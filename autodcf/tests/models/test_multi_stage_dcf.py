@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from autodcf.models import DCF, MultiStageDCF
+
+RATIOS = {'cogs_to_sales': 0.5,
+          'sga_to_sales': 0.25,
+          'rd_to_sales': 0.02,
+          'da_to_sales': 0.06,
+          'interest_to_sales': 0.01,
+          'tax_rate': 0.21,
+          'capex_to_sales': 0.03,
+          'change_in_nwc_to_change_in_sales': 0.1}
+
+
+@pytest.fixture
+def multi_stage_dcf(company):
+    return MultiStageDCF(company=company,
+                         sales_growth=[0.2, 0.18, 0.15, 0.12, 0.1, 0.1],
+                         discount_rate=0.1,
+                         terminal_growth_rate=0.02,
+                         explicit_years=5,
+                         fade_years=10,
+                         terminal_levels={'cogs_to_sales': 0.6, 'capex_to_sales': 0.06},
+                         **RATIOS)
+
+
+class TestMultiStageDCF:
+
+    def test_window(self, multi_stage_dcf):
+        assert multi_stage_dcf.window == 15
+        assert multi_stage_dcf.forecast_array().shape == (17, 17)
+
+    def test_paths(self, multi_stage_dcf):
+        growth = multi_stage_dcf.path('sales_growth')
+        assert growth.shape == (16,)
+        np.testing.assert_array_equal(growth[:6], [0.2, 0.18, 0.15, 0.12, 0.1, 0.1])
+        np.testing.assert_allclose(growth[5:], np.linspace(0.1, 0.02, 11))
+        np.testing.assert_allclose(multi_stage_dcf.path('cogs_to_sales')[5:], np.linspace(0.5, 0.6, 11))
+        np.testing.assert_array_equal(multi_stage_dcf.path('tax_rate'), np.full(16, 0.21))
+
+    def test_no_fade_matches_dcf(self, company):
+        multi_stage_dcf = MultiStageDCF(company=company, sales_growth=0.05, discount_rate=0.1,
+                                        terminal_growth_rate=0.02, explicit_years=5, fade_years=0, **RATIOS)
+        dcf = DCF(company=company, sales_growth=0.05, discount_rate=0.1, terminal_growth_rate=0.02, window=5,
+                  **RATIOS)
+        assert multi_stage_dcf.enterprise_value == pytest.approx(dcf.enterprise_value)
+        assert multi_stage_dcf.equity_value_per_share == pytest.approx(dcf.equity_value_per_share)
+
+    def test_matches_dcf_with_paths(self, multi_stage_dcf, company):
+        sales = company.income_statement.sales * np.cumprod(1 + multi_stage_dcf.path('sales_growth'))
+        forecast = multi_stage_dcf.forecast_array()
+        np.testing.assert_allclose(forecast[1:, 0], sales)
+        cogs = multi_stage_dcf.path('cogs_to_sales') * sales
+        np.testing.assert_allclose(forecast[1:, 1], cogs)
+        assert multi_stage_dcf.enterprise_value == (multi_stage_dcf.discounted_window_cash_flow
+                                                    + multi_stage_dcf.discounted_terminal_cash_flow)  # noqa: W503
+
+    def test_long_horizon(self, company):
+        multi_stage_dcf = MultiStageDCF(company=company, sales_growth=0.1, discount_rate=0.1,
+                                        terminal_growth_rate=0.02, explicit_years=10, fade_years=90, **RATIOS)
+        assert multi_stage_dcf.forecast_array().shape == (102, 17)
+        assert np.isfinite(multi_stage_dcf.enterprise_value)
+        assert multi_stage_dcf.as_dcf().gradient()['sales_growth'].shape == (101,)
+
+    def test_bad_assumptions(self, company):
+        with pytest.raises(ValueError):
+            MultiStageDCF(company=company, sales_growth=0.1, discount_rate=0.1, terminal_growth_rate=0.02,
+                          explicit_years=5, fade_years=5, terminal_levels={'sales_growth': 0.03}, **RATIOS)
+        multi_stage_dcf = MultiStageDCF(company=company, sales_growth=[0.1, 0.1], discount_rate=0.1,
+                                        terminal_growth_rate=0.02, explicit_years=5, fade_years=5, **RATIOS)
+        with pytest.raises(ValueError):
+            multi_stage_dcf.enterprise_value
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from autodcf.company import CashFlows, Company, IncomeStatement
+from autodcf.models import PortfolioRunner, SimpleDCF
+
+
+@pytest.fixture
+def companies(company, balance_sheet):
+    companies = {'BASE': company}
+    for i in range(1, 5):
+        income_statement = IncomeStatement(sales=100 * i,
+                                           cogs=50 * i,
+                                           sga=20 * i,
+                                           rd=i,
+                                           depreciation=4,
+                                           amortization=2,
+                                           interest=1,
+                                           nonrecurring_cost=0,
+                                           tax=4 * i)
+        companies['CO{0}'.format(i)] = Company(fully_diluted_shares=10 * i,
+                                               price_per_share=5 + i,
+                                               balance_sheet=balance_sheet,
+                                               cash_flows=CashFlows(capex=3 * i),
+                                               income_statement=income_statement)
+    return companies
+
+
+@pytest.fixture
+def scenarios():
+    return {'sales_growth': np.array([0.03, 0.05, 0.0]),
+            'discount_rate': np.array([0.14, 0.1, 0.12]),
+            'terminal_growth_rate': 0.03,
+            'change_in_nwc_to_change_in_sales': 0.1,
+            'tax_rate': 0.21}
+
+
+class TestPortfolioRunner:
+
+    def test_matches_simple_dcf(self, companies, scenarios):
+        results = PortfolioRunner(companies, scenarios, workers=1, chunk_size=2).run()
+        assert len(results) == 15
+        for row in results.itertuples():
+            dcf = SimpleDCF(company=companies[row.company],
+                            sales_growth=scenarios['sales_growth'][row.scenario],
+                            discount_rate=scenarios['discount_rate'][row.scenario],
+                            terminal_growth_rate=0.03,
+                            change_in_nwc_to_change_in_sales=0.1,
+                            tax_rate=0.21)
+            assert row.enterprise_value == pytest.approx(dcf.enterprise_value)
+            assert row.equity_value_per_share == pytest.approx(dcf.equity_value_per_share)
+            assert row.percent_upside_per_share == pytest.approx(dcf.percent_upside_per_share)
+
+    def test_order(self, companies, scenarios):
+        results = PortfolioRunner(companies, scenarios, workers=1).run()
+        assert list(results['company']) == [label for label in companies for _ in range(3)]
+        assert list(results['scenario']) == [0, 1, 2] * 5
+
+    def test_process_pool_matches_serial(self, companies, scenarios):
+        serial = PortfolioRunner(companies, scenarios, workers=1).run()
+        pooled = PortfolioRunner(companies, scenarios, workers=2, chunk_size=1).run()
+        assert serial.equals(pooled)
+
+    def test_scenario_chunks_match(self, companies, scenarios):
+        whole = PortfolioRunner(companies, scenarios, workers=1).run()
+        chunked = PortfolioRunner(companies, scenarios, workers=1, chunk_size=2, scenario_chunk_size=2).run()
+        assert whole.equals(chunked)
+
+    def test_list_labels(self, companies, scenarios):
+        results = PortfolioRunner(list(companies.values()), scenarios, workers=1).run()
+        assert list(results['company'].unique()) == [0, 1, 2, 3, 4]
+
+    def test_missing_assumption(self, companies):
+        with pytest.raises(ValueError):
+            PortfolioRunner(companies, {'sales_growth': 0.03})
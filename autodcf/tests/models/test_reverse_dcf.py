@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from autodcf.company import CompanyTable
+from autodcf.models import ReverseDCF, SimpleDCF
+from autodcf.models.portfolio import SCENARIO_FIELDS, company_arrays
+from autodcf.models.reverse_dcf import value_per_share_and_derivative
+
+ASSUMPTIONS = {'sales_growth': 0.03,
+               'discount_rate': 0.14,
+               'terminal_growth_rate': 0.03,
+               'change_in_nwc_to_change_in_sales': 0.1,
+               'tax_rate': 0.21}
+
+
+def others(solve_for):
+    return {field: value for field, value in ASSUMPTIONS.items() if field != solve_for}
+
+
+@pytest.mark.parametrize('solve_for', SCENARIO_FIELDS)
+def test_derivative(company, solve_for):
+    companies = company_arrays([company])
+    scenarios = {field: np.array([value]) for field, value in ASSUMPTIONS.items()}
+    value, derivative = value_per_share_and_derivative(companies, scenarios, 5, solve_for)
+    h = 1e-6
+    up, down = dict(scenarios), dict(scenarios)
+    up[solve_for] = scenarios[solve_for] + h
+    down[solve_for] = scenarios[solve_for] - h
+    numerical = (value_per_share_and_derivative(companies, up, 5, solve_for)[0]
+                 - value_per_share_and_derivative(companies, down, 5, solve_for)[0]) / (2 * h)  # noqa: W503
+    assert derivative == pytest.approx(numerical, rel=1e-6)
+    assert value[0] == pytest.approx(SimpleDCF(company=company, **ASSUMPTIONS).equity_value_per_share)
+
+
+@pytest.mark.parametrize('solve_for', ['sales_growth', 'discount_rate', 'change_in_nwc_to_change_in_sales',
+                                       'tax_rate'])
+def test_solve(company, solve_for):
+    solver = ReverseDCF(company, solve_for, others(solve_for))
+    implied, = solver.solve()
+    assumptions = dict(ASSUMPTIONS, **{solve_for: implied})
+    assert SimpleDCF(company=company, **assumptions).equity_value_per_share == pytest.approx(company.price_per_share)
+    assert solver.iterations < 50
+
+
+def test_terminal_growth_rate(company):
+    company.price_per_share = 12.5
+    implied, = ReverseDCF(company, 'terminal_growth_rate', others('terminal_growth_rate')).solve()
+    assert implied < ASSUMPTIONS['discount_rate']
+    dcf = SimpleDCF(company=company, **dict(ASSUMPTIONS, terminal_growth_rate=implied))
+    assert dcf.equity_value_per_share == pytest.approx(12.5)
+
+
+def test_vectorized(company):
+    prices = np.linspace(4, 20, 1000)
+    table = CompanyTable.from_companies([company] * 1000)
+    table.price_per_share[:] = prices
+    discount_rates = np.linspace(0.1, 0.15, 1000)
+    assumptions = dict(others('sales_growth'), discount_rate=discount_rates)
+    implied = ReverseDCF(table, 'sales_growth', assumptions).solve()
+    for i in (0, 500, 999):
+        company.price_per_share = prices[i]
+        dcf = SimpleDCF(company=company, **dict(ASSUMPTIONS, sales_growth=implied[i], discount_rate=discount_rates[i]))
+        assert dcf.equity_value_per_share == pytest.approx(prices[i])
+
+
+def test_no_root_in_bracket(company):
+    implied, = ReverseDCF(company, 'tax_rate', others('tax_rate'), bracket=(0.0, 0.3)).solve()
+    assert np.isnan(implied)
+
+
+def test_bad_arguments(company):
+    with pytest.raises(ValueError):
+        ReverseDCF(company, 'window', ASSUMPTIONS)
+    with pytest.raises(ValueError):
+        ReverseDCF(company, 'tax_rate', {'discount_rate': 0.1})
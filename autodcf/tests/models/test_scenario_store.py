@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+
+from autodcf.models import BatchDCF, ScenarioStore
+from autodcf.models.monte_carlo import MonteCarloDCF, Uniform
+from autodcf.models.terminal_value import ExitMultiple
+
+
+@pytest.fixture
+def assumptions(simple_dcf):
+    assumptions = simple_dcf.batch_assumptions()
+    assumptions['discount_rate'] = np.linspace(0.1, 0.16, 25)
+    assumptions['sales_growth'] = np.linspace(0.0, 0.05, 25)[:, None] + np.zeros((1, 6))
+    return assumptions
+
+
+class TestScenarioStore:
+
+    def test_sweep(self, company, assumptions, tmp_path):
+        path = str(tmp_path / 'sweep')
+        store = ScenarioStore.sweep(path, company, assumptions, chunk_size=7)
+        batch = BatchDCF(company=company, **assumptions)
+        assert store.n_scenarios == 25
+        assert store.window == 5
+        np.testing.assert_array_equal(store.forecast, batch.forecast())
+        for name, values in batch.valuation().items():
+            np.testing.assert_array_equal(store.valuation(name), values)
+
+    def test_sweep_terminal_value_per_scenario(self, simple_dcf, tmp_path):
+        assumptions = simple_dcf.batch_assumptions()
+        assumptions['discount_rate'] = np.linspace(0.1, 0.16, 10)
+        assumptions['terminal_value'] = ExitMultiple(np.linspace(6, 10, 10))
+        store = ScenarioStore.sweep(str(tmp_path / 'sweep'), simple_dcf.company, assumptions, chunk_size=4)
+        batch = BatchDCF(company=simple_dcf.company, **assumptions)
+        np.testing.assert_array_equal(store.valuation('enterprise_value'), batch.enterprise_value)
+
+    def test_read_back_zero_copy(self, company, assumptions, tmp_path):
+        path = str(tmp_path / 'sweep')
+        ScenarioStore.sweep(path, company, assumptions, chunk_size=10)
+        store = ScenarioStore(path)
+        assert isinstance(store.forecast, np.memmap)
+        fcf = store.line('FCF')
+        assert np.shares_memory(fcf, store.forecast)
+        np.testing.assert_array_equal(fcf, store.forecast[:, :, store.line_items.index('FCF')])
+        with pytest.raises(ValueError):
+            store.forecast[0, 0, 0] = 1
+        on_disk = np.load(os.path.join(path, 'equity_value_per_share.npy'), mmap_mode='r')
+        np.testing.assert_array_equal(on_disk, store.valuation('equity_value_per_share'))
+
+    def test_stats(self, company, assumptions, tmp_path):
+        store = ScenarioStore.sweep(str(tmp_path / 'sweep'), company, assumptions)
+        stats = store.stats('enterprise_value', chunk_size=4)
+        values = np.asarray(store.valuation('enterprise_value'))
+        assert stats.n == 25
+        assert stats.mean == pytest.approx(values.mean())
+        assert stats.max == values.max()
+
+    def test_monte_carlo(self, simple_dcf, tmp_path):
+        store = ScenarioStore.create(str(tmp_path / 'simulation'), 1000, simple_dcf.window)
+        stats = MonteCarloDCF(simple_dcf, {'discount_rate': Uniform(0.12, 0.16)}, seed=0, chunk_size=300).run(
+            1000, store=store)
+        assert stats.mean == pytest.approx(np.mean(store.valuation('equity_value_per_share')))
+        assert np.all(store.forecast[:, 1:, -1] != 0)
+
+    def test_errors(self, company, assumptions, tmp_path):
+        store = ScenarioStore.create(str(tmp_path / 'small'), 10, 5)
+        with pytest.raises(ValueError):
+            store.write(0, BatchDCF(company=company, **assumptions))
+        with pytest.raises(ValueError):
+            store.valuation('price')
+        assumptions['tax_rate'] = np.full(3, 0.2)
+        with pytest.raises(ValueError):
+            ScenarioStore.sweep(str(tmp_path / 'bad'), company, assumptions)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from autodcf.models import BatchDCF
+from autodcf.models._kernel import LINE_ITEMS
+from autodcf.models.terminal_value import ExitMultiple, HModel, PerpetuityGrowth
+
+
+class TestTerminalValue:
+
+    def test_default_is_perpetuity_growth(self, simple_dcf):
+        assert isinstance(simple_dcf.terminal_value, PerpetuityGrowth)
+        last_fcf = simple_dcf.forecast_array()[-1, LINE_ITEMS.index('Discounted FCF')]
+        expected = last_fcf * 1.03 / (0.14 - 0.03) / 1.14 ** 5
+        assert simple_dcf.discounted_terminal_cash_flow == pytest.approx(expected)
+
+    def test_exit_multiple(self, simple_dcf):
+        simple_dcf.terminal_value = ExitMultiple(8)
+        ebitda = simple_dcf.forecast_array()[-1, LINE_ITEMS.index('EBITDA')]
+        assert simple_dcf.discounted_terminal_cash_flow == pytest.approx(8 * ebitda / 1.14 ** 5)
+        assert simple_dcf.enterprise_value == pytest.approx(simple_dcf.discounted_window_cash_flow
+                                                           + 8 * ebitda / 1.14 ** 5)  # noqa: W503
+
+    def test_exit_multiple_line_item(self, simple_dcf):
+        simple_dcf.terminal_value = ExitMultiple(2, line_item='Sales')
+        sales = simple_dcf.forecast_array()[-1, LINE_ITEMS.index('Sales')]
+        assert simple_dcf.discounted_terminal_cash_flow == pytest.approx(2 * sales / 1.14 ** 5)
+        with pytest.raises(ValueError):
+            ExitMultiple(8, line_item='Revenue')
+
+    def test_h_model(self, simple_dcf):
+        perpetuity = simple_dcf.discounted_terminal_cash_flow
+        simple_dcf.terminal_value = HModel(high_growth_rate=0.03, half_life=5)
+        assert simple_dcf.discounted_terminal_cash_flow == pytest.approx(perpetuity)
+        simple_dcf.terminal_value = HModel(high_growth_rate=0.13, half_life=5)
+        assert simple_dcf.discounted_terminal_cash_flow == pytest.approx(perpetuity * (1.03 + 0.5) / 1.03)
+
+    def test_gradient_needs_perpetuity_growth(self, simple_dcf):
+        simple_dcf.terminal_value = ExitMultiple(8)
+        with pytest.raises(ValueError):
+            simple_dcf.gradient()
+
+    def test_sensitivity_table(self, simple_dcf):
+        simple_dcf.terminal_value = ExitMultiple(8)
+        table = simple_dcf.sensitivity_table([0.1, 0.14], [0.02, 0.03])
+        simple_dcf.discount_rate = 0.1
+        simple_dcf.terminal_growth_rate = 0.02
+        assert table.loc[0.1, 0.02] == pytest.approx(simple_dcf.equity_value_per_share)
+
+    def test_batch_parameters_per_scenario(self, simple_dcf, company):
+        assumptions = simple_dcf.batch_assumptions()
+        assumptions['terminal_value'] = ExitMultiple(np.array([6.0, 8.0, 10.0]))
+        batch = BatchDCF(company=company, **assumptions)
+        for i, multiple in enumerate([6, 8, 10]):
+            simple_dcf.terminal_value = ExitMultiple(multiple)
+            assert batch.enterprise_value[i] == pytest.approx(simple_dcf.enterprise_value)
+
+    def test_repr(self):
+        assert repr(ExitMultiple(8)) == "ExitMultiple(multiple=8, line_item='EBITDA')"
+        assert repr(PerpetuityGrowth()) == 'PerpetuityGrowth()'
@@ -0,0 +1,81 @@
+import copy
+
+import numpy as np
+import pytest
+
+from autodcf.models import DiscountCurve, WeightedDCF
+from autodcf.models.terminal_value import ExitMultiple
+
+CASES = {'bear': {'sales_growth': 0.0, 'discount_rate': 0.16},
+         'base': {},
+         'bull': {'sales_growth': [0.1, 0.08, 0.06, 0.05, 0.04, 0.03], 'terminal_discount_rate': 0.12}}
+
+WEIGHTS = {'bear': 0.25, 'base': 0.5, 'bull': 0.25}
+
+
+@pytest.fixture
+def weighted_dcf(simple_dcf):
+    return WeightedDCF(simple_dcf, CASES, WEIGHTS)
+
+
+def case_value(dcf, overrides, value='equity_value_per_share'):
+    dcf = copy.deepcopy(dcf)
+    for assumption, override in overrides.items():
+        setattr(dcf, assumption, override)
+    return getattr(dcf, value)
+
+
+class TestWeightedDCF:
+
+    def test_case_values_match_dcf(self, weighted_dcf, simple_dcf):
+        values = weighted_dcf.case_values()
+        assert weighted_dcf.batch.n_scenarios == 3
+        for i, name in enumerate(weighted_dcf.names):
+            assert values[i] == pytest.approx(case_value(simple_dcf, CASES[name]))
+
+    def test_expected(self, weighted_dcf):
+        values = weighted_dcf.case_values('enterprise_value')
+        expected = 0.25 * values[0] + 0.5 * values[1] + 0.25 * values[2]
+        assert weighted_dcf.expected('enterprise_value') == pytest.approx(expected)
+
+    def test_terminal_values_per_case(self, simple_dcf):
+        cases = {name: dict(case, terminal_value=ExitMultiple(multiple))
+                 for (name, case), multiple in zip(CASES.items(), [6, 8, 11])}
+        weighted_dcf = WeightedDCF(simple_dcf, cases, WEIGHTS)
+        np.testing.assert_array_equal(weighted_dcf.batch.terminal_value.multiple, [6, 8, 11])
+        values = weighted_dcf.case_values('equity_value')
+        for i, name in enumerate(weighted_dcf.names):
+            assert values[i] == pytest.approx(case_value(simple_dcf, cases[name], 'equity_value'))
+
+    def test_mixed_terminal_values(self, simple_dcf):
+        cases = {'exit': {'terminal_value': ExitMultiple(8)}, 'perpetuity': {}}
+        with pytest.raises(ValueError):
+            WeightedDCF(simple_dcf, cases, {'exit': 0.5, 'perpetuity': 0.5}).batch
+
+    def test_shared_discount_curve(self, simple_dcf):
+        simple_dcf.discount_rate = DiscountCurve([0.1, 0.11, 0.12, 0.13, 0.14, 0.14])
+        weighted_dcf = WeightedDCF(simple_dcf, CASES_WITHOUT_RATE, {'low': 0.5, 'high': 0.5})
+        values = weighted_dcf.case_values()
+        for i, name in enumerate(weighted_dcf.names):
+            assert values[i] == pytest.approx(case_value(simple_dcf, CASES_WITHOUT_RATE[name]))
+        with pytest.raises(ValueError):
+            WeightedDCF(simple_dcf, {'a': {}, 'b': {'discount_rate': 0.1}}, {'a': 0.5, 'b': 0.5}).batch
+
+    def test_bad_weights(self, simple_dcf):
+        with pytest.raises(ValueError):
+            WeightedDCF(simple_dcf, CASES, {'bear': 0.5, 'base': 0.5, 'bull': 0.5})
+        with pytest.raises(ValueError):
+            WeightedDCF(simple_dcf, CASES, {'bear': 0.5, 'base': 0.5})
+
+    def test_bad_override(self, simple_dcf):
+        with pytest.raises(ValueError):
+            WeightedDCF(simple_dcf, {'a': {'window': 10}}, {'a': 1}).batch
+
+    def test_table(self, weighted_dcf):
+        table = weighted_dcf.table()
+        assert list(table.index) == ['bear', 'base', 'bull', 'expected']
+        assert table.loc['expected', 'weight'] == pytest.approx(1)
+        assert table.loc['expected', 'equity_value_per_share'] == pytest.approx(weighted_dcf.expected())
+
+
+CASES_WITHOUT_RATE = {'low': {'sales_growth': 0.01}, 'high': {'sales_growth': 0.06}}
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from autodcf.cache import ResultCache, company_fingerprint, fingerprint
+from autodcf.company import CompanyTable
+from autodcf.models import DiscountCurve, SimpleDCF
+
+
+def simple_dcf(company, **assumptions):
+    kwargs = dict(sales_growth=0.03,
+                  discount_rate=0.14,
+                  terminal_growth_rate=0.03,
+                  change_in_nwc_to_change_in_sales=0.1,
+                  tax_rate=0.21)
+    kwargs.update(assumptions)
+    return SimpleDCF(company=company, **kwargs)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with ResultCache(str(tmp_path / 'cache.sqlite')) as cache:
+        yield cache
+
+
+class TestFingerprint:
+
+    def test_equal_values(self, company):
+        copy = CompanyTable.from_companies([company])[0]
+        assert company_fingerprint(copy) == company_fingerprint(company)
+        assert fingerprint(simple_dcf(copy)) == fingerprint(simple_dcf(company))
+
+    def test_changed_values(self, company):
+        before = fingerprint(simple_dcf(company))
+        assert fingerprint(simple_dcf(company, discount_rate=0.1)) != before
+        assert fingerprint(simple_dcf(company, discount_rate=DiscountCurve(0.14, mid_year=True))) != before
+        dcf = simple_dcf(company)
+        dcf.terminal_discount_rate = 0.14
+        assert fingerprint(dcf) != before
+        company.income_statement.sales = 200
+        assert fingerprint(simple_dcf(company)) != before
+
+
+class TestResultCache:
+
+    def test_miss_then_hit(self, company, cache):
+        dcf = simple_dcf(company)
+        result = cache.valuation(dcf)
+        assert result['enterprise_value'] == dcf.enterprise_value
+        cached = cache.valuation(simple_dcf(CompanyTable.from_companies([company])[0]))
+        assert cached['equity_value_per_share'] == dcf.equity_value_per_share
+        np.testing.assert_array_equal(cached['forecast'], dcf.forecast_array())
+        stats = cache.stats
+        assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+        assert stats['bytes'] > dcf.forecast_array().nbytes
+
+    def test_persisted(self, company, tmp_path):
+        path = str(tmp_path / 'cache.sqlite')
+        with ResultCache(path) as cache:
+            cache.put(simple_dcf(company))
+        with ResultCache(path) as cache:
+            assert cache.get(simple_dcf(company)) is not None
+            assert cache.stats['entries'] == 1
+
+    def test_eviction(self, company, tmp_path):
+        cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_bytes=2500)
+        rates = [0.1, 0.11, 0.12]
+        for rate in rates:
+            cache.put(simple_dcf(company, discount_rate=rate))
+        assert cache.stats['evictions'] == 1
+        assert cache.stats['bytes'] <= 2500
+        assert cache.get(simple_dcf(company, discount_rate=0.1)) is None
+        assert cache.get(simple_dcf(company, discount_rate=0.12)) is not None
+
+    def test_put_replaces(self, company, cache):
+        cache.put(simple_dcf(company))
+        size = cache.stats['bytes']
+        cache.put(simple_dcf(company))
+        assert cache.stats['entries'] == 1
+        assert cache.stats['bytes'] == size
+
+    def test_invalidate(self, company, cache):
+        cache.put(simple_dcf(company))
+        cache.put(simple_dcf(company, discount_rate=0.1))
+        assert cache.invalidate(dcf=simple_dcf(company)) == 1
+        assert cache.get(simple_dcf(company)) is None
+        assert cache.invalidate(company=company) == 1
+        assert cache.stats['entries'] == 0
+        assert cache.stats['bytes'] == 0
+        cache.put(simple_dcf(company))
+        cache.clear()
+        assert cache.stats['entries'] == 0
+        with pytest.raises(ValueError):
+            cache.invalidate()
@@ -0,0 +1,168 @@
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from autodcf import cli
+from autodcf.company import CompanyTable
+from autodcf.models import DCF, SimpleDCF
+
+
+@pytest.fixture
+def rows(company):
+    table = CompanyTable.from_companies([company])
+    row = {'fully_diluted_shares': company.fully_diluted_shares, 'price_per_share': company.price_per_share}
+    for name, _ in CompanyTable.tables:
+        statements = getattr(table, name)
+        row.update({field: statements[field][0].item() for field in statements.fields})
+    rows = []
+    for i, discount_rate in enumerate([0.14, 0.1, 0.12]):
+        rows.append(dict(row,
+                         ticker='CO{0}'.format(i),
+                         sales_growth=0.03,
+                         discount_rate=discount_rate,
+                         terminal_growth_rate=0.03,
+                         change_in_nwc_to_change_in_sales=0.1,
+                         tax_rate=0.21))
+    return rows
+
+
+@pytest.fixture
+def jsonl_path(rows, tmp_path):
+    path = str(tmp_path / 'companies.jsonl')
+    with open(path, 'w') as f:
+        f.writelines(json.dumps(row) + '\n' for row in rows)
+    return path
+
+
+def simple_dcf(company, discount_rate, window=5):
+    return SimpleDCF(company=company,
+                     sales_growth=0.03,
+                     discount_rate=discount_rate,
+                     terminal_growth_rate=0.03,
+                     change_in_nwc_to_change_in_sales=0.1,
+                     tax_rate=0.21,
+                     window=window)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestCLI:
+
+    def test_jsonl(self, jsonl_path, company, tmp_path):
+        output = str(tmp_path / 'out.jsonl')
+        assert cli.main([jsonl_path, '--label', 'ticker', '-o', output, '--chunk-size', '2']) == 0
+        results = read_jsonl(output)
+        assert [row['ticker'] for row in results] == ['CO0', 'CO1', 'CO2']
+        for row, discount_rate in zip(results, [0.14, 0.1, 0.12]):
+            dcf = simple_dcf(company, discount_rate)
+            assert row['enterprise_value'] == pytest.approx(dcf.enterprise_value)
+            assert row['equity_value_per_share'] == pytest.approx(dcf.equity_value_per_share)
+            assert row['percent_upside_per_share'] == pytest.approx(dcf.percent_upside_per_share)
+
+    def test_csv_stdin_to_stdout(self, rows, company, monkeypatch, capsys):
+        buffer = io.StringIO()
+        pd.DataFrame(rows).to_csv(buffer, index=False)
+        buffer.seek(0)
+        monkeypatch.setattr('sys.stdin', buffer)
+        assert cli.main(['--format', 'csv', '--output-format', 'csv']) == 0
+        results = pd.read_csv(io.StringIO(capsys.readouterr().out))
+        assert list(results.columns) == ['row', 'enterprise_value', 'equity_value', 'equity_value_per_share',
+                                         'percent_upside_per_share']
+        assert list(results['row']) == [0, 1, 2]
+        assert results['enterprise_value'][1] == pytest.approx(simple_dcf(company, 0.1).enterprise_value)
+
+    def test_parquet(self, rows, tmp_path, company):
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / 'companies.parquet')
+        pd.DataFrame(rows).to_parquet(path)
+        output = str(tmp_path / 'out.csv')
+        assert cli.main([path, '--label', 'ticker', '-o', output, '--chunk-size', '1']) == 0
+        results = pd.read_csv(output)
+        assert list(results['ticker']) == ['CO0', 'CO1', 'CO2']
+        assert results['enterprise_value'][2] == pytest.approx(simple_dcf(company, 0.12).enterprise_value)
+
+    def test_jobs(self, jsonl_path, tmp_path):
+        serial, parallel = str(tmp_path / 'serial.jsonl'), str(tmp_path / 'parallel.jsonl')
+        assert cli.main([jsonl_path, jsonl_path, '-o', serial, '--chunk-size', '2']) == 0
+        assert cli.main([jsonl_path, jsonl_path, '-o', parallel, '--chunk-size', '2', '--jobs', '2']) == 0
+        assert read_jsonl(serial) == read_jsonl(parallel)
+        assert [row['row'] for row in read_jsonl(serial)] == list(range(6))
+
+    def test_window_and_ratio_columns(self, rows, company, tmp_path):
+        rows[0]['window'] = 10
+        rows[1]['cogs_to_sales'] = 0.4
+        path = str(tmp_path / 'companies.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+        output = str(tmp_path / 'out.jsonl')
+        assert cli.main([path, '-o', output]) == 0
+        results = read_jsonl(output)
+        assert results[0]['enterprise_value'] == pytest.approx(simple_dcf(company, 0.14, window=10).enterprise_value)
+        dcf = simple_dcf(company, 0.1)
+        dcf = DCF(company=company, sales_growth=0.03, discount_rate=0.1, terminal_growth_rate=0.03, window=5,
+                  cogs_to_sales=0.4, sga_to_sales=dcf.sga_to_sales, rd_to_sales=dcf.rd_to_sales,
+                  da_to_sales=dcf.da_to_sales, interest_to_sales=dcf.interest_to_sales, tax_rate=0.21,
+                  capex_to_sales=dcf.capex_to_sales, change_in_nwc_to_change_in_sales=0.1)
+        assert results[1]['enterprise_value'] == pytest.approx(dcf.enterprise_value)
+        assert results[2]['enterprise_value'] == pytest.approx(simple_dcf(company, 0.12).enterprise_value)
+
+    def test_optional_column_left_out_of_some_rows(self, rows, company, tmp_path):
+        del rows[1]['other_lt_liability_debt_multiplier']
+        path = str(tmp_path / 'companies.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+        one, three = str(tmp_path / 'one.jsonl'), str(tmp_path / 'three.jsonl')
+        assert cli.main([path, '-o', one, '--chunk-size', '1']) == 0
+        assert cli.main([path, '-o', three, '--chunk-size', '3']) == 0
+        results = read_jsonl(three)
+        assert [row['row'] for row in results] == [0, 1, 2]
+        assert [row['equity_value'] for row in results] == [row['equity_value'] for row in read_jsonl(one)]
+        # Row 1 takes the default multiplier of 0, so none of its other long-term liabilities count as debt.
+        expected = simple_dcf(company, 0.1).equity_value + company.balance_sheet.other_lt_liabilities
+        assert results[1]['equity_value'] == pytest.approx(expected)
+
+    def test_parquet_stdin(self, rows, company, monkeypatch, capsys):
+        pytest.importorskip('pyarrow')
+        buffer = io.BytesIO()
+        pd.DataFrame(rows).to_parquet(buffer)
+        read, write = os.pipe()
+        with os.fdopen(write, 'wb') as f:
+            f.write(buffer.getvalue())
+        with os.fdopen(read, 'rb') as pipe:
+            monkeypatch.setattr('sys.stdin', io.TextIOWrapper(pipe))
+            assert cli.main(['--format', 'parquet', '--output-format', 'csv', '--chunk-size', '2']) == 0
+        results = pd.read_csv(io.StringIO(capsys.readouterr().out))
+        assert results['enterprise_value'][2] == pytest.approx(simple_dcf(company, 0.12).enterprise_value)
+
+    def test_missing_assumption(self, rows, tmp_path, capsys):
+        path = str(tmp_path / 'companies.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps({k: v for k, v in row.items() if k != 'tax_rate'}) + '\n' for row in rows)
+        assert cli.main([path]) == 1
+        assert 'tax_rate' in capsys.readouterr().err
+
+    def test_fractional_window(self, rows, tmp_path, capsys):
+        rows[1]['window'] = 5.7
+        path = str(tmp_path / 'companies.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+        assert cli.main([path]) == 1
+        assert 'whole number' in capsys.readouterr().err
+
+    def test_missing_company_column(self, rows, tmp_path, capsys):
+        path = str(tmp_path / 'companies.jsonl')
+        with open(path, 'w') as f:
+            f.writelines(json.dumps({k: v for k, v in row.items() if k != 'fully_diluted_shares'}) + '\n'
+                         for row in rows)
+        assert cli.main([path]) == 1
+        assert 'Missing columns' in capsys.readouterr().err
+
+    def test_unknown_extension(self, capsys):
+        assert cli.main(['companies.txt']) == 1
+        assert '--format' in capsys.readouterr().err
@@ -0,0 +1,17 @@
+import subprocess
+import sys
+
+
+def test_pandas_not_imported_until_dataframe_requested():
+    code = '\n'.join(['import sys',
+                      'from autodcf.company import BalanceSheet, CashFlows, Company, IncomeStatement',
+                      'from autodcf.models import SimpleDCF',
+                      'balance_sheet = BalanceSheet(*[1] * 18)',
+                      'income_statement = IncomeStatement(100, 50, 25, 2, 4, 2, 3, 1, 4)',
+                      'company = Company(10, 5.75, balance_sheet, CashFlows(3), income_statement)',
+                      'dcf = SimpleDCF(company, 0.03, 0.14, 0.03, 0.1, 0.21)',
+                      'dcf.enterprise_value',
+                      "assert 'pandas' not in sys.modules",
+                      'dcf.forecast()',
+                      "assert 'pandas' in sys.modules"])
+    subprocess.run([sys.executable, '-c', code], check=True)
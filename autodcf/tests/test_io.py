@@ -0,0 +1,83 @@
+from datetime import datetime
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import autodcf.io
+from autodcf.company import CompanyTable
+from autodcf.models import PortfolioRunner
+
+
+@pytest.fixture
+def frame(company):
+    table = CompanyTable.from_companies([company, company, company], labels=['A', 'B', 'C'])
+    columns = {'ticker': table.labels,
+               'fully_diluted_shares': table.fully_diluted_shares,
+               'price_per_share': table.price_per_share * [1, 2, 3]}
+    for name, _ in CompanyTable.tables:
+        statements = getattr(table, name)
+        columns.update({field: statements[field] for field in statements.fields})
+    columns['end_date'] = ['2019-12-31', '2020-12-31', '2021-12-31']
+    columns['start_date'] = ['2019-01-01', '2020-01-01', '2021-01-01']
+    columns['unused'] = [1, 2, 3]
+    return pd.DataFrame(columns)
+
+
+@pytest.fixture
+def csv_path(frame, tmp_path):
+    path = str(tmp_path / 'companies.csv')
+    frame.to_csv(path, index=False)
+    return path
+
+
+def check_table(table, company):
+    assert isinstance(table, CompanyTable)
+    assert len(table) == 3
+    assert list(table.labels) == ['A', 'B', 'C']
+    np.testing.assert_array_equal(table.price_per_share, [5.75, 11.5, 17.25])
+    np.testing.assert_array_equal(table.balance_sheets.net_debt, [company.balance_sheet.net_debt] * 3)
+    loaded = table[1]
+    assert loaded.income_statement.sales == company.income_statement.sales
+    assert loaded.income_statement.end_date == datetime(2020, 12, 31)
+    assert loaded.cash_flows.capex == company.cash_flows.capex
+
+
+class TestIO:
+
+    def test_import_does_not_load_pyarrow(self):
+        code = 'import sys, autodcf.io; assert not any(name.startswith("pyarrow") for name in sys.modules)'
+        subprocess.run([sys.executable, '-c', code], check=True)
+
+    def test_read_csv(self, csv_path, company):
+        pytest.importorskip('pyarrow')
+        check_table(autodcf.io.read_csv(csv_path, label='ticker'), company)
+
+    def test_read_csv_without_pyarrow(self, csv_path, company, monkeypatch):
+        monkeypatch.setattr(autodcf.io, '_pyarrow', lambda: None)
+        check_table(autodcf.io.read_csv(csv_path, label='ticker'), company)
+
+    def test_read_parquet(self, frame, tmp_path, company):
+        pytest.importorskip('pyarrow')
+        path = str(tmp_path / 'companies.parquet')
+        frame.to_parquet(path)
+        check_table(autodcf.io.read_parquet(path, label='ticker'), company)
+
+    def test_read_parquet_without_pyarrow(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(autodcf.io, '_pyarrow', lambda: None)
+        with pytest.raises(ImportError):
+            autodcf.io.read_parquet(str(tmp_path / 'companies.parquet'))
+
+    def test_feeds_portfolio(self, csv_path, company):
+        table = autodcf.io.read_csv(csv_path, label='ticker')
+        scenarios = {'sales_growth': 0.03,
+                     'discount_rate': 0.14,
+                     'terminal_growth_rate': 0.03,
+                     'change_in_nwc_to_change_in_sales': 0.1,
+                     'tax_rate': 0.21}
+        from_table = PortfolioRunner(table, scenarios, workers=1).run()
+        from_objects = PortfolioRunner(list(table), scenarios, workers=1).run()
+        assert list(from_table['company']) == ['A', 'B', 'C']
+        np.testing.assert_allclose(from_table['equity_value_per_share'], from_objects['equity_value_per_share'])
@@ -0,0 +1,127 @@
+import pytest
+
+from autodcf.company import BalanceSheet, CashFlows, Company, IncomeStatement
+from autodcf.models import SimpleDCF
+from autodcf.pipeline import PriceTick, RevaluationPipeline, StatementUpdate, VALUES
+
+ASSUMPTIONS = {'sales_growth': 0.03,
+               'discount_rate': 0.14,
+               'terminal_growth_rate': 0.03,
+               'change_in_nwc_to_change_in_sales': 0.1,
+               'tax_rate': 0.21}
+
+
+@pytest.fixture
+def pipeline(company):
+    pipeline = RevaluationPipeline(ASSUMPTIONS)
+    pipeline.add('A', company)
+    return pipeline
+
+
+def expected_values(company):
+    dcf = SimpleDCF(company=company, **ASSUMPTIONS)
+    return {name: getattr(dcf, name) for name in VALUES}
+
+
+def new_income_statement(sales=120):
+    return IncomeStatement(sales=sales, cogs=55, sga=25, rd=2, depreciation=4, amortization=2, interest=1,
+                           nonrecurring_cost=3, tax=5)
+
+
+class TestRevaluationPipeline:
+
+    def test_add(self, pipeline, company):
+        assert pipeline.values('A') == pytest.approx(expected_values(company))
+        assert pipeline.company('A') is not company
+        with pytest.raises(ValueError):
+            pipeline.add('A', company)
+
+    def test_income_statement_update(self, pipeline, company):
+        previous = pipeline.values('A')
+        income_statement = new_income_statement()
+        change, = pipeline.process([StatementUpdate('A', income_statement)])
+        assert change.label == 'A'
+        assert change.causes == ('income_statement',)
+        assert change.previous == previous
+        company.income_statement = income_statement
+        assert change.values == pytest.approx(expected_values(company))
+        assert pipeline.stats['forecasts'] == 2
+
+    def test_balance_sheet_update_keeps_forecast(self, pipeline, company):
+        balance_sheet = BalanceSheet(*[1] * 18, other_lt_liability_debt_multiplier=0)
+        change, = pipeline.process([StatementUpdate('A', balance_sheet)])
+        assert change.values['enterprise_value'] == change.previous['enterprise_value']
+        company.balance_sheet = balance_sheet
+        assert change.values == pytest.approx(expected_values(company))
+        assert pipeline.stats['forecasts'] == 1
+        assert pipeline.stats['equity_updates'] == 1
+
+    def test_cash_flows_update(self, pipeline, company):
+        pipeline.process([StatementUpdate('A', CashFlows(capex=6))])
+        company.cash_flows = CashFlows(capex=6)
+        assert pipeline.values('A') == pytest.approx(expected_values(company))
+
+    def test_price_tick_only_updates_upside(self, pipeline, company, monkeypatch):
+        import autodcf.pipeline
+        monkeypatch.setattr(autodcf.pipeline, 'value_rows', None)
+        change, = pipeline.process([PriceTick('A', 8.0)])
+        assert change.causes == ('price',)
+        for name in ('enterprise_value', 'equity_value', 'equity_value_per_share'):
+            assert change.values[name] == change.previous[name]
+        company.price_per_share = 8.0
+        assert change.values == pytest.approx(expected_values(company))
+        assert pipeline.stats['upside_updates'] == 1
+        assert pipeline.stats['forecasts'] == 1
+
+    def test_coalesces_events(self, pipeline, company):
+        other = Company(fully_diluted_shares=20, price_per_share=3.0, balance_sheet=company.balance_sheet,
+                        cash_flows=company.cash_flows, income_statement=new_income_statement(200))
+        pipeline.add('B', other)
+        changes = pipeline.process([PriceTick('A', 6.0),
+                                    StatementUpdate('B', new_income_statement(210)),
+                                    StatementUpdate('A', new_income_statement()),
+                                    PriceTick('A', 7.0)])
+        assert [change.label for change in changes] == ['A', 'B']
+        assert changes[0].causes == ('price', 'income_statement')
+        company.income_statement = new_income_statement()
+        company.price_per_share = 7.0
+        assert changes[0].values == pytest.approx(expected_values(company))
+        other.income_statement = new_income_statement(210)
+        assert changes[1].values == pytest.approx(expected_values(other))
+        assert pipeline.stats['forecasts'] == 4
+
+    def test_unchanged_values_emit_nothing(self, pipeline, company):
+        assert pipeline.process([PriceTick('A', company.price_per_share)]) == []
+
+    def test_stream_and_callback(self, company):
+        received = []
+        pipeline = RevaluationPipeline(ASSUMPTIONS, callback=received.append)
+        pipeline.add('A', company)
+        events = (PriceTick('A', price) for price in (6.0, 7.0, 8.0))
+        changes = list(pipeline.stream(events, batch_size=2))
+        assert [change.values['percent_upside_per_share'] for change in changes] == pytest.approx(
+            [change.values['equity_value_per_share'] / price - 1 for change, price in zip(changes, (7.0, 8.0))])
+        assert received[1:] == changes
+        assert pipeline.stats['events'] == 3
+
+    def test_bad_events(self, pipeline):
+        with pytest.raises(KeyError):
+            pipeline.process([PriceTick('Z', 1.0)])
+        with pytest.raises(TypeError):
+            pipeline.process([StatementUpdate('A', 'statement')])
+        with pytest.raises(TypeError):
+            pipeline.process([('A', 1.0)])
+        with pytest.raises(ValueError):
+            RevaluationPipeline({'sales_growth': 0.03})
+
+    def test_error_keeps_applied_events(self, pipeline, company):
+        with pytest.raises(KeyError) as error:
+            pipeline.process([PriceTick('A', 8.0), PriceTick('Z', 1.0)])
+        company.price_per_share = 8.0
+        assert pipeline.values('A') == pytest.approx(expected_values(company))
+        assert [change.label for change in error.value.changes] == ['A']
+        assert error.value.changes[0].values == pipeline.values('A')
+
+    def test_nan_values_unchanged(self, pipeline):
+        assert len(pipeline.process([PriceTick('A', float('nan'))])) == 1
+        assert pipeline.process([PriceTick('A', float('nan'))]) == []
@@ -0,0 +1,155 @@
+import ast
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import autodcf.screen
+from autodcf.company import BalanceSheetTable, CashFlowsTable, CompanyTable, IncomeStatementTable
+from autodcf.models import SimpleDCF
+from autodcf.screen import Screen, percentile_ranks
+
+ASSUMPTIONS = {'sales_growth': 0.03,
+               'discount_rate': 0.14,
+               'terminal_growth_rate': 0.03,
+               'change_in_nwc_to_change_in_sales': 0.1,
+               'tax_rate': 0.21}
+
+SECTORS = ['energy', 'tech', 'utilities']
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    n = 60
+    columns = {name: rng.uniform(1, 20, n)
+               for table_class in (BalanceSheetTable, CashFlowsTable, IncomeStatementTable)
+               for name in table_class.fields}
+    columns['sales'] = rng.uniform(80, 120, n)
+    columns['fully_diluted_shares'] = rng.uniform(5, 15, n)
+    columns['price_per_share'] = rng.uniform(1, 20, n)
+    return CompanyTable.from_columns(columns, labels=['c{0}'.format(i) for i in range(n)])
+
+
+@pytest.fixture
+def sectors(table):
+    return np.array(SECTORS * (len(table) // len(SECTORS)))
+
+
+@pytest.fixture
+def screen(table, sectors):
+    return Screen(table, sectors=sectors, assumptions=ASSUMPTIONS)
+
+
+class TestPercentileRanks:
+
+    def test_matches_pandas(self):
+        values = np.array([3.0, 1.0, 2.0, 2.0, np.nan, 5.0, 4.0, 4.0])
+        groups = np.array([0, 0, 0, 0, 1, 1, 1, 1])
+        expected = pd.Series(values).groupby(groups).rank(pct=True, method='max')
+        np.testing.assert_array_equal(percentile_ranks(values, groups), expected.values)
+
+    def test_one_group(self):
+        np.testing.assert_array_equal(percentile_ranks([10.0, 30.0, 20.0, 40.0]), [0.25, 0.75, 0.5, 1.0])
+        assert np.isnan(percentile_ranks([np.nan])).all()
+
+
+class TestScreen:
+
+    def test_statement_metrics_match_objects(self, screen, table):
+        for i, company in enumerate(table):
+            income_statement = company.income_statement
+            assert screen.metric('net_debt')[i] == pytest.approx(company.balance_sheet.net_debt)
+            assert screen.metric('debt_to_equity')[i] == pytest.approx(company.balance_sheet.debt_to_equity)
+            assert screen.metric('gross_margin')[i] == pytest.approx(
+                (income_statement.sales - income_statement.cogs) / income_statement.sales)
+            assert screen.metric('ebit_margin')[i] == pytest.approx(
+                (income_statement.sales - income_statement.cogs - income_statement.sga - income_statement.rd
+                 - income_statement.da) / income_statement.sales)  # noqa: W503
+
+    def test_valuations_match_simple_dcf(self, screen, table):
+        for i in (0, 17, 59):
+            dcf = SimpleDCF(company=table[i], **ASSUMPTIONS)
+            assert screen.metric('percent_upside_per_share')[i] == pytest.approx(dcf.percent_upside_per_share)
+            assert screen.metric('equity_value')[i] == pytest.approx(dcf.equity_value)
+
+    def test_valuations_chunked(self, table, sectors, screen):
+        chunked = Screen(table, sectors=sectors, assumptions=ASSUMPTIONS, chunk_size=7)
+        np.testing.assert_array_equal(chunked.metric('enterprise_value'), screen.metric('enterprise_value'))
+
+    def test_valuations_need_assumptions(self, table):
+        screen = Screen(table)
+        assert 'percent_upside_per_share' not in screen.metric_names
+        with pytest.raises(ValueError):
+            screen.metric('percent_upside_per_share')
+        with pytest.raises(ValueError):
+            Screen(table, assumptions={'sales_growth': 0.03})
+
+    def test_filter(self, screen):
+        kept = screen.filter('net_debt < 0 and not debt_to_equity >= 1.5 or gross_margin * 100 > 95')
+        net_debt, debt_to_equity = screen.metric('net_debt'), screen.metric('debt_to_equity')
+        mask = ((net_debt < 0) & ~(debt_to_equity >= 1.5)) | (screen.metric('gross_margin') * 100 > 95)
+        np.testing.assert_array_equal(kept.rows, np.flatnonzero(mask))
+        np.testing.assert_array_equal(kept.metric('net_debt'), net_debt[mask])
+        chained = kept.filter(lambda s: s.metric('sales') > 100)
+        np.testing.assert_array_equal(chained.rows, np.flatnonzero(mask & (screen.metric('sales') > 100)))
+        assert len(screen) == 60
+
+    def test_chained_comparison(self, screen):
+        sales = screen.metric('sales')
+        kept = screen.filter('90 < sales <= 110')
+        np.testing.assert_array_equal(kept.rows, np.flatnonzero((sales > 90) & (sales <= 110)))
+
+    def test_filter_literal(self, screen, monkeypatch):
+        sales = screen.metric('sales')
+        expected = np.flatnonzero(sales > 100.5)
+        np.testing.assert_array_equal(screen.filter('sales > 100.5').rows, expected)
+        np.testing.assert_array_equal(screen.filter('1 > 0').rows, np.arange(len(screen)))
+        # Literals parse to ast.Num nodes, with the value in n, before Python 3.8.
+        monkeypatch.setattr(autodcf.screen, '_CONSTANT', ())
+        monkeypatch.setattr(autodcf.screen, '_NUM', ast.Constant)
+        np.testing.assert_array_equal(screen.filter('sales > 100.5').rows, expected)
+
+    def test_filter_rank(self, screen, sectors):
+        kept = screen.filter('rank(operating_margin) > 0.5')
+        ranks = pd.Series(screen.metric('operating_margin')).groupby(sectors).rank(pct=True, method='max')
+        np.testing.assert_array_equal(kept.rows, np.flatnonzero(ranks.values > 0.5))
+        np.testing.assert_array_equal(screen.percentile_rank('operating_margin'), ranks.values)
+
+    @pytest.mark.parametrize('expression', ['__import__("os")', 'sales.real > 0', 'sales in [1]', 'price'])
+    def test_bad_filter(self, screen, expression):
+        with pytest.raises(ValueError):
+            screen.filter(expression)
+
+    def test_top(self, screen):
+        upside = screen.metric('percent_upside_per_share')
+        top = screen.top(5)
+        np.testing.assert_array_equal(top.rows, np.argsort(-upside)[:5])
+        np.testing.assert_array_equal(top.labels, screen.labels[np.argsort(-upside)[:5]])
+        bottom = screen.top(3, by='net_debt', ascending=True)
+        np.testing.assert_array_equal(bottom.rows, np.argsort(screen.metric('net_debt'))[:3])
+        assert len(screen.top(100)) == 60
+
+    def test_top_after_filter(self, screen):
+        kept = screen.filter('net_debt < 10')
+        top = kept.top(3)
+        upside = kept.metric('percent_upside_per_share')
+        np.testing.assert_array_equal(top.rows, kept.rows[np.argsort(-upside)[:3]])
+
+    def test_columns(self, table):
+        screen = Screen(table, columns={'score': np.arange(len(table))})
+        assert screen.top(1, by='score').labels[0] == 'c59'
+        with pytest.raises(ValueError):
+            Screen(table, columns={'net_debt': np.arange(len(table))})
+        with pytest.raises(ValueError):
+            Screen(table, columns={'score': np.arange(3)})
+
+    def test_companies(self, table):
+        screen = Screen([table[i] for i in range(5)])
+        np.testing.assert_allclose(screen.metric('net_debt'), table.balance_sheets.net_debt[:5])
+
+    def test_table(self, screen):
+        table = screen.top(4).table(['net_debt', 'percent_upside_per_share'])
+        assert list(table.columns) == ['sector', 'net_debt', 'percent_upside_per_share']
+        assert list(table.index) == list(screen.top(4).labels)
+        assert set(table['sector']) <= set(SECTORS)
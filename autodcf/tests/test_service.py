@@ -0,0 +1,148 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from autodcf.company import CompanyTable
+from autodcf.models import SimpleDCF
+from autodcf.service import LocalClient, ValuationService
+
+ASSUMPTIONS = {'sales_growth': 0.03,
+               'discount_rate': 0.14,
+               'terminal_growth_rate': 0.03,
+               'change_in_nwc_to_change_in_sales': 0.1,
+               'tax_rate': 0.21}
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def check(result, company, **assumptions):
+    dcf = SimpleDCF(company=company, **dict(ASSUMPTIONS, **assumptions))
+    assert result['enterprise_value'] == pytest.approx(dcf.enterprise_value)
+    assert result['equity_value_per_share'] == pytest.approx(dcf.equity_value_per_share)
+    assert result['percent_upside_per_share'] == pytest.approx(dcf.percent_upside_per_share)
+
+
+class TestValuationService:
+
+    def test_value(self, company):
+        service = ValuationService()
+        check(run(service.value(company, **ASSUMPTIONS)), company)
+
+    def test_coalesces_identical_requests(self, company):
+        service = ValuationService()
+
+        async def requests():
+            return await asyncio.gather(*[service.value(company, **ASSUMPTIONS) for _ in range(10)])
+
+        results = run(requests())
+        assert all(result == results[0] for result in results)
+        assert service.stats == {'requests': 10, 'cache_hits': 0, 'coalesced': 9, 'batches': 1, 'valued': 1}
+
+    def test_batches_distinct_requests(self, company):
+        service = ValuationService()
+        rates = [0.1, 0.12, 0.14, 0.16]
+
+        async def requests():
+            return await asyncio.gather(*[service.value(company, **dict(ASSUMPTIONS, discount_rate=rate, window=w))
+                                          for rate in rates for w in (5, 10)])
+
+        results = run(requests())
+        assert service.stats['batches'] == 1
+        assert service.stats['valued'] == 8
+        for i, (rate, window) in enumerate([(rate, w) for rate in rates for w in (5, 10)]):
+            check(results[i], company, discount_rate=rate, window=window)
+
+    def test_max_batch_size(self, company):
+        service = ValuationService(max_batch_size=3)
+
+        async def requests():
+            return await asyncio.gather(*[service.value(company, **dict(ASSUMPTIONS, sales_growth=0.01 * i))
+                                          for i in range(7)])
+
+        run(requests())
+        assert service.stats['batches'] == 3
+
+    def test_lru_cache(self, company):
+        service = ValuationService(cache_size=2)
+
+        async def requests():
+            for rate in (0.1, 0.12, 0.1, 0.14, 0.12, 0.1):
+                await service.value(company, **dict(ASSUMPTIONS, discount_rate=rate))
+
+        run(requests())
+        # 0.1 hit once (second request), then 0.14 evicts 0.12 and 0.12 evicts 0.1.
+        assert service.stats['cache_hits'] == 1
+        assert service.stats['valued'] == 5
+        service.invalidate()
+        run(service.value(company, **ASSUMPTIONS))
+        assert service.stats['valued'] == 6
+
+    def test_invalidate_during_request(self, company):
+        service = ValuationService()
+
+        async def requests():
+            first = asyncio.ensure_future(service.value(company, **ASSUMPTIONS))
+            await asyncio.sleep(0)
+            service.invalidate()
+            second = asyncio.ensure_future(service.value(company, **ASSUMPTIONS))
+            return await asyncio.gather(first, second)
+
+        results = run(requests())
+        check(results[0], company)
+        # The request made after invalidate is valued again, and only its result is cached.
+        assert service.stats['valued'] == 2
+        run(service.value(company, **ASSUMPTIONS))
+        assert service.stats['cache_hits'] == 1
+
+    def test_cache_keyed_on_values(self, company):
+        service = ValuationService()
+        copy = CompanyTable.from_companies([company])[0]
+        run(service.value(company, **ASSUMPTIONS))
+        run(service.value(copy, **ASSUMPTIONS))
+        assert service.stats['cache_hits'] == 1
+        company.income_statement.sales = 200
+        check(run(service.value(company, **ASSUMPTIONS)), company)
+        assert service.stats['valued'] == 2
+
+    def test_executor(self, company):
+        with ThreadPoolExecutor(1) as executor:
+            service = ValuationService(executor=executor, batch_delay=0.001)
+
+            async def requests():
+                return await asyncio.gather(*[service.value(company, **dict(ASSUMPTIONS, tax_rate=rate))
+                                              for rate in (0.2, 0.3)])
+
+            results = run(requests())
+        check(results[1], company, tax_rate=0.3)
+        assert service.stats['batches'] == 1
+
+    def test_per_period_assumptions_rejected(self, company):
+        with pytest.raises(ValueError):
+            run(ValuationService().value(company, **dict(ASSUMPTIONS, sales_growth=[0.1, 0.2])))
+
+
+class TestLocalClient:
+
+    def test_post(self, company):
+        table = CompanyTable.from_companies([company])
+        values = {'fully_diluted_shares': company.fully_diluted_shares, 'price_per_share': company.price_per_share}
+        for name, _ in CompanyTable.tables:
+            statements = getattr(table, name)
+            values.update({field: statements[field][0].item() for field in statements.fields})
+        client = LocalClient(ValuationService())
+        response = run(client.post({'company': values, 'assumptions': ASSUMPTIONS}))
+        assert response.status == 200
+        check(response.body, company)
+
+    def test_bad_request(self):
+        client = LocalClient(ValuationService())
+        response = run(client.post({'company': {'sales': 100}, 'assumptions': ASSUMPTIONS}))
+        assert response.status == 400
+        assert 'error' in response.body
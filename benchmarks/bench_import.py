@@ -0,0 +1,69 @@
+"""Startup time of importing autodcf, measured with ``python -X importtime``.
+
+Each module is imported in fresh interpreters and the median cumulative import time reported by -X importtime is
+compared against a budget. Importing any of the modules must also not import pandas, which is only loaded when a
+DataFrame is requested. Run from the repository root with ``python -m benchmarks.bench_import``.
+
+Exits with status 1 if a module is over budget or imports pandas.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ('autodcf', 'autodcf.company', 'autodcf.models')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(module):
+    """Import module in a fresh interpreter.
+
+    Returns:
+        Tuple of cumulative import time of module in seconds and whether pandas was imported.
+    """
+    code = "import sys, {0}; sys.stdout.write(str('pandas' in sys.modules))".format(module)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, check=True,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    for line in process.stderr.splitlines():
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6, process.stdout == 'True'
+    raise RuntimeError("{0} was not imported.".format(module))
+
+
+def measure(modules=MODULES, runs=5):
+    """Median cumulative import time in seconds of each module over runs fresh interpreters.
+
+    Returns:
+        Dictionary mapping module to dictionary with seconds and imports_pandas.
+    """
+    results = {}
+    for module in modules:
+        timings = [import_time(module) for _ in range(runs)]
+        results[module] = {'seconds': statistics.median(seconds for seconds, _ in timings),
+                           'imports_pandas': any(imports_pandas for _, imports_pandas in timings)}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module. Defaults to 5.')
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                        help='Budget for cumulative import time of each module in milliseconds. Defaults to 250.')
+    args = parser.parse_args(argv)
+    results = measure(runs=args.runs)
+    failed = False
+    for module, result in results.items():
+        over_budget = result['seconds'] * 1e3 > args.budget_ms
+        result['within_budget'] = not over_budget
+        failed = failed or over_budget or result['imports_pandas']
+    print(json.dumps(results, indent=2, sort_keys=True))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""Throughput and peak memory of bulk loading companies with autodcf.io.
+
+Writes a synthetic file of random fundamentals, then loads it in a fresh process. Peak memory is the peak of
+allocations traced by tracemalloc (which include NumPy arrays) plus the peak of pyarrow's memory pool. Run from the
+repository root with ``python -m benchmarks.bench_io --rows 10000000 --format parquet``.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def _columns():
+    from autodcf.company import CompanyTable
+    names = list(CompanyTable.fields)
+    for _, table_class in CompanyTable.tables:
+        names.extend(table_class.fields)
+    return names
+
+
+def write_file(path, rows, fmt, chunk_size=1000000):
+    """Write rows of random fundamentals to path in chunks of chunk_size rows."""
+    rng = np.random.default_rng(0)
+    names = _columns()
+    writer = None
+    with open(path, 'w' if fmt == 'csv' else 'wb') as f:
+        for start in range(0, rows, chunk_size):
+            size = min(chunk_size, rows - start)
+            values = rng.uniform(1, 100, (size, len(names)))
+            if fmt == 'csv':
+                if start == 0:
+                    f.write(','.join(names) + '\n')
+                np.savetxt(f, values, delimiter=',', fmt='%.4f')
+            else:
+                import pyarrow
+                import pyarrow.parquet
+                table = pyarrow.table({name: values[:, i] for i, name in enumerate(names)})
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(f, table.schema)
+                writer.write_table(table)
+        if writer is not None:
+            writer.close()
+
+
+def _read(path, fmt):
+    import autodcf.io
+    return autodcf.io.read_csv(path) if fmt == 'csv' else autodcf.io.read_parquet(path)
+
+
+def _load(path, fmt, queue):
+    """Load path twice: once traced for peak memory, then untraced for throughput.
+
+    Peak memory is the peak of NumPy (traced) plus pyarrow (memory pool) allocations.
+    """
+    import autodcf.io
+    tracemalloc.start()
+    rows = len(_read(path, fmt))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    pyarrow = autodcf.io._pyarrow()
+    if pyarrow is not None:
+        peak += pyarrow.default_memory_pool().max_memory() or 0
+    start = time.perf_counter()
+    _read(path, fmt)
+    elapsed = time.perf_counter() - start
+    queue.put({'rows': rows, 'seconds': elapsed, 'peak_memory_bytes': peak})
+
+
+def measure(path, fmt):
+    """Load path in a fresh process and return rows, seconds and peak memory increase."""
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_load, args=(path, fmt, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    result['rows_per_second'] = result['rows'] / result['seconds']
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', choices=('csv', 'parquet'), default='parquet')
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'companies.' + args.format)
+        write_file(path, args.rows, args.format)
+        result = measure(path, args.format)
+    result['format'] = args.format
+    print(json.dumps(result))
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+"""Benchmarks of the valuation hot paths with a machine-readable baseline.
+
+Each benchmark times one call of a function after its fixtures are built. The median time per call over several
+repeats is recorded, and compared against a baseline JSON file. Run from the repository root:
+
+    python -m benchmarks.suite                   # compare against benchmarks/baseline.json
+    python -m benchmarks.suite --save            # record new baseline
+    python -m benchmarks.suite --threshold 0.2   # fail if 20% slower than baseline (default 50%)
+    python -m benchmarks.suite -k dcf            # only run benchmarks with "dcf" in their name
+
+Exits with status 1 if any benchmark is slower than its baseline by more than threshold, after rerunning slow
+benchmarks up to --retries times.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register function as benchmark.
+
+    The function builds its fixtures and returns a callable taking no args, which is what gets timed.
+    """
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def _balance_sheet():
+    from autodcf.company import BalanceSheet
+    return BalanceSheet(cash=10, short_term_investments=10, net_receivables=10, inventory=5, other_current_assets=5,
+                        ppe=30, goodwill=10, intangible_assets=20, other_lt_assets=0, accounts_payable=5,
+                        accrued_liabilities=9, short_term_debt=6, current_part_lt_debt=4, long_term_debt=14,
+                        other_current_liabilities=2, other_lt_liabilities=2, deferred_lt_liabilities=3,
+                        minority_interest=5, other_lt_liability_debt_multiplier=1)
+
+
+def _income_statement():
+    from autodcf.company import IncomeStatement
+    return IncomeStatement(sales=100, cogs=50, sga=25, rd=2, depreciation=4, amortization=2, interest=1,
+                           nonrecurring_cost=3, tax=4)
+
+
+def _company():
+    from autodcf.company import CashFlows, Company
+    return Company(fully_diluted_shares=10, price_per_share=5.75, balance_sheet=_balance_sheet(),
+                   cash_flows=CashFlows(capex=3), income_statement=_income_statement())
+
+
+def _simple_dcf(window=5, company=None):
+    from autodcf.models import SimpleDCF
+    return SimpleDCF(company=_company() if company is None else company, sales_growth=0.03, discount_rate=0.14,
+                     terminal_growth_rate=0.03, change_in_nwc_to_change_in_sales=0.1, tax_rate=0.21, window=window)
+
+
+def _companies(n):
+    from autodcf.company import BalanceSheetTable, CashFlowsTable, CompanyTable, IncomeStatementTable
+    rng = np.random.default_rng(0)
+    columns = {name: rng.uniform(1, 100, n)
+               for table_class in (BalanceSheetTable, CashFlowsTable, IncomeStatementTable)
+               for name in table_class.fields}
+    columns['sales'] = rng.uniform(500, 1000, n)
+    columns['fully_diluted_shares'] = rng.uniform(10, 100, n)
+    columns['price_per_share'] = rng.uniform(5, 50, n)
+    return CompanyTable.from_columns(columns)
+
+
+@benchmark('statement.income_statement_init')
+def bench_income_statement_init():
+    return _income_statement
+
+
+@benchmark('statement.balance_sheet_init')
+def bench_balance_sheet_init():
+    return _balance_sheet
+
+
+@benchmark('statement.balance_sheet_net_debt')
+def bench_balance_sheet_net_debt():
+    balance_sheet = _balance_sheet()
+    return lambda: balance_sheet.net_debt
+
+
+@benchmark('statement.balance_sheet_derived_metrics')
+def bench_balance_sheet_derived_metrics():
+    balance_sheet = _balance_sheet()
+    return lambda: (balance_sheet.current_assets, balance_sheet.assets, balance_sheet.liabilities,
+                    balance_sheet.equity, balance_sheet.debt_to_equity)
+
+
+@benchmark('statement_table.balance_sheet_derived_metrics_100k')
+def bench_balance_sheet_table_derived_metrics():
+    balance_sheets = _companies(100000).balance_sheets
+    return balance_sheets.derived_metrics
+
+
+@benchmark('statement_table.from_statements_10k')
+def bench_statement_table_from_statements():
+    from autodcf.company import IncomeStatementTable
+    statements = [_income_statement() for _ in range(10000)]
+    return lambda: IncomeStatementTable.from_statements(statements)
+
+
+@benchmark('simple_dcf.init')
+def bench_simple_dcf_init():
+    company = _company()
+    return lambda: _simple_dcf(company=company)
+
+
+@benchmark('dcf.forecast')
+def bench_forecast():
+    company = _company()
+    return lambda: _simple_dcf(company=company).forecast()
+
+
+@benchmark('dcf.enterprise_value')
+def bench_enterprise_value():
+    company = _company()
+    return lambda: _simple_dcf(company=company).enterprise_value
+
+
+@benchmark('dcf.enterprise_value_after_discount_rate_change')
+def bench_enterprise_value_update():
+    dcf = _simple_dcf()
+    rates = iter(np.tile([0.10, 0.12], 10 ** 8))
+
+    def update():
+        dcf.discount_rate = next(rates)
+        return dcf.enterprise_value
+    return update
+
+
+@benchmark('dcf.gradient_after_discount_rate_change')
+def bench_gradient():
+    dcf = _simple_dcf()
+    rates = iter(np.tile([0.10, 0.12], 10 ** 8))
+
+    def update():
+        dcf.discount_rate = next(rates)
+        return dcf.gradient()
+    return update
+
+
+@benchmark('dcf.forecast_window_50')
+def bench_forecast_window_50():
+    company = _company()
+    return lambda: _simple_dcf(window=50, company=company).forecast()
+
+
+@benchmark('dcf.enterprise_value_window_50')
+def bench_enterprise_value_window_50():
+    company = _company()
+    return lambda: _simple_dcf(window=50, company=company).enterprise_value
+
+
+@benchmark('multi_stage_dcf.enterprise_value_horizon_100')
+def bench_multi_stage_dcf():
+    from autodcf.models import MultiStageDCF
+    company = _company()
+    return lambda: MultiStageDCF(company=company, sales_growth=0.1, discount_rate=0.1, terminal_growth_rate=0.02,
+                                 explicit_years=10, fade_years=90, cogs_to_sales=0.5, sga_to_sales=0.25,
+                                 rd_to_sales=0.02, da_to_sales=0.06, interest_to_sales=0.01, tax_rate=0.21,
+                                 capex_to_sales=0.03, change_in_nwc_to_change_in_sales=0.1,
+                                 terminal_levels={'cogs_to_sales': 0.55}).enterprise_value
+
+
+@benchmark('dcf.sensitivity_table_50x50')
+def bench_sensitivity_table():
+    dcf = _simple_dcf()
+    discount_rates = np.linspace(0.08, 0.16, 50)
+    growth_rates = np.linspace(0.0, 0.04, 50)
+    return lambda: dcf.sensitivity_table(discount_rates, growth_rates)
+
+
+@benchmark('batch_dcf.sweep_10k')
+def bench_batch_sweep():
+    from autodcf.models import BatchDCF
+    dcf = _simple_dcf()
+    kwargs = dcf.batch_assumptions()
+    rng = np.random.default_rng(0)
+    kwargs['discount_rate'] = rng.uniform(0.08, 0.16, 10000)
+    kwargs['sales_growth'] = rng.uniform(0.0, 0.06, 10000)
+    return lambda: BatchDCF(company=dcf.company, **kwargs).equity_value_per_share
+
+
+@benchmark('monte_carlo.10k')
+def bench_monte_carlo():
+    from autodcf.models import MonteCarloDCF
+    from autodcf.models.monte_carlo import Normal, Uniform
+    dcf = _simple_dcf()
+    distributions = {'discount_rate': Uniform(0.08, 0.16), 'sales_growth': Normal(0.03, 0.01)}
+    return lambda: MonteCarloDCF(dcf, distributions, seed=0).run(10000)
+
+
+@benchmark('portfolio.1k_companies_x_10_scenarios')
+def bench_portfolio():
+    from autodcf.models import PortfolioRunner
+    companies = _companies(1000)
+    scenarios = {'sales_growth': np.linspace(0.0, 0.05, 10),
+                 'discount_rate': np.linspace(0.08, 0.14, 10),
+                 'terminal_growth_rate': 0.02,
+                 'change_in_nwc_to_change_in_sales': 0.1,
+                 'tax_rate': 0.21}
+    return lambda: PortfolioRunner(companies, scenarios, workers=1).run()
+
+
+@benchmark('reverse_dcf.discount_rate_10k')
+def bench_reverse_dcf():
+    from autodcf.models import ReverseDCF
+    companies = _companies(10000)
+    assumptions = {'sales_growth': 0.03,
+                   'terminal_growth_rate': 0.02,
+                   'change_in_nwc_to_change_in_sales': 0.1,
+                   'tax_rate': 0.21}
+    return lambda: ReverseDCF(companies, 'discount_rate', assumptions).solve()
+
+
+@benchmark('screen.100k_filter_rank_top')
+def bench_screen():
+    from autodcf.screen import Screen
+    companies = _companies(100000)
+    sectors = np.random.default_rng(0).choice(['energy', 'financials', 'health', 'tech', 'utilities'], 100000)
+    assumptions = {'sales_growth': 0.03,
+                   'discount_rate': 0.1,
+                   'terminal_growth_rate': 0.02,
+                   'change_in_nwc_to_change_in_sales': 0.1,
+                   'tax_rate': 0.21}
+    return lambda: Screen(companies, sectors=sectors, assumptions=assumptions).filter(
+        'net_debt < 0 and debt_to_equity < 2 and rank(operating_margin) > 0.5').top(50)
+
+
+def _pipeline(n):
+    from autodcf.pipeline import RevaluationPipeline
+    pipeline = RevaluationPipeline({'sales_growth': 0.03,
+                                    'discount_rate': 0.1,
+                                    'terminal_growth_rate': 0.02,
+                                    'change_in_nwc_to_change_in_sales': 0.1,
+                                    'tax_rate': 0.21})
+    for i in range(n):
+        pipeline.add(i, _company())
+    return pipeline
+
+
+@benchmark('pipeline.price_tick')
+def bench_pipeline_price_tick():
+    from autodcf.pipeline import PriceTick
+    pipeline = _pipeline(1)
+    ticks = [PriceTick(0, 5.0), PriceTick(0, 6.0)]
+    return lambda: pipeline.process(ticks)
+
+
+@benchmark('pipeline.income_statement_updates_1k')
+def bench_pipeline_income_statement_updates():
+    from autodcf.pipeline import StatementUpdate
+    pipeline = _pipeline(1000)
+    grown = _income_statement()
+    grown.sales = 110
+    # Alternate between two statements, so every update changes valuations.
+    batches = [[StatementUpdate(i, statement) for i in range(1000)] for statement in (grown, _income_statement())]
+    return lambda: [pipeline.process(batch) for batch in batches]
+
+
+def time_benchmark(name, repeat=5, min_time=0.2):
+    """Median time in seconds of one call of benchmark over repeat rounds of at least min_time seconds."""
+    func = BENCHMARKS[name]()
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return statistics.median(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(names=None, repeat=5, min_time=0.2):
+    """Time benchmarks.
+
+    Args:
+        names (Iterable[str], optional): Names of benchmarks to run. Defaults to all.
+        repeat (int, optional): Number of rounds to take median of. Defaults to 5.
+        min_time (float, optional): Minimum seconds per round. Defaults to 0.2.
+
+    Returns:
+        Dictionary mapping benchmark name to median seconds per call.
+    """
+    names = sorted(BENCHMARKS) if names is None else names
+    return {name: time_benchmark(name, repeat=repeat, min_time=min_time) for name in names}
+
+
+def compare(results, baseline, threshold):
+    """Compare results against baseline.
+
+    Args:
+        results (dict): Mapping of benchmark name to seconds per call.
+        baseline (dict): Mapping of benchmark name to baseline seconds per call.
+        threshold (float): Allowed slowdown as a fraction of baseline (e.g. 0.25 for 25%).
+
+    Returns:
+        Dictionary mapping benchmark name to ratio of result to baseline, for benchmarks slower than allowed.
+    """
+    ratios = {name: seconds / baseline[name] for name, seconds in results.items() if name in baseline}
+    return {name: ratio for name, ratio in ratios.items() if ratio > 1 + threshold}
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path, results):
+    data = {'machine': {'python': platform.python_version(),
+                        'numpy': np.__version__,
+                        'platform': platform.platform(),
+                        'processor': platform.processor()},
+            'results': results}
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='keyword', help='Only run benchmarks whose name contains keyword.')
+    parser.add_argument('--baseline', default=BASELINE, help='Path of baseline JSON file.')
+    parser.add_argument('--save', action='store_true', help='Save results as new baseline instead of comparing.')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='Allowed slowdown as a fraction of baseline. Defaults to 0.5.')
+    parser.add_argument('--repeat', type=int, default=5, help='Rounds to take median of. Defaults to 5.')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per round. Defaults to 0.2.')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Times to rerun benchmarks slower than threshold before failing. Defaults to 2.')
+    args = parser.parse_args(argv)
+
+    names = [name for name in sorted(BENCHMARKS) if args.keyword is None or args.keyword in name]
+    baseline = {} if args.save or not os.path.exists(args.baseline) else load_baseline(args.baseline)
+    results = {}
+    for name in names:
+        results[name] = time_benchmark(name, repeat=args.repeat, min_time=args.min_time)
+        line = '{0:<50} {1:>12.3f} us'.format(name, results[name] * 1e6)
+        if name in baseline:
+            line += '  {0:>6.2f}x baseline'.format(results[name] / baseline[name])
+        print(line)
+
+    if args.save:
+        if args.keyword is not None and os.path.exists(args.baseline):
+            results = dict(load_baseline(args.baseline), **results)
+        save_baseline(args.baseline, results)
+        print('Saved baseline to {0}'.format(args.baseline))
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        # Timings on shared machines are noisy, so only fail if slowdown holds when benchmark is timed again.
+        for name in regressions:
+            results[name] = min(results[name], time_benchmark(name, repeat=args.repeat, min_time=args.min_time))
+        regressions = compare(results, baseline, args.threshold)
+    for name, ratio in sorted(regressions.items()):
+        print('REGRESSION {0}: {1:.2f}x baseline (threshold {2:.2f}x)'.format(name, ratio, 1 + args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
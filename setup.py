@@ -55,6 +55,7 @@ setup(
         long_description_content_type='text/x-rst',
         entry_points="""
             [console_scripts]
+            autodcf=autodcf.cli:main
             """,
         cmdclass={
             'install': install,